@@ -19,7 +19,8 @@ def main():
     
     # 1. Fetch Data
     try:
-        df = fetch_data(ticker, config.START_DATE, config.END_DATE)
+        df = fetch_data(ticker, config.START_DATE, config.END_DATE,
+                        cache_dir=config.CACHE_DIR, offline=config.OFFLINE)
     except Exception as e:
         print(f"Data Error: {e}")
         return
@@ -36,7 +37,8 @@ def main():
     # 4. Generate AI Analysis
     print("Generating AI analysis...")
     prompt = generate_ai_prompt(ticker, metrics, df_res.iloc[-1], config)
-    ai_response = query_llm(prompt)
+    ai_response = query_llm(prompt, cache_dir=config.LLM_CACHE_DIR,
+                            ttl_hours=config.LLM_CACHE_TTL_HOURS, max_entries=config.LLM_CACHE_MAX_ENTRIES)
     
     # 5. Save Strategy Reports (Trade Note)
     print("Saving strategy reports...")
@@ -0,0 +1,77 @@
+# run_watchlist.py
+import sys
+import os
+import argparse
+
+# Ensure src path is visible
+sys.path.append(os.path.join(os.path.dirname(__file__), 'src'))
+
+from batch import fetch_many, run_many
+from backtest import run_backtest
+from report import save_reports, generate_ai_prompt, query_llm, save_trades_html
+from plotting import plot_results
+import config
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Run the Volatility Agent across a watchlist.")
+    parser.add_argument("tickers", nargs="*", help="Tickers to run (default: config.WATCHLIST)")
+    parser.add_argument("--file", help="Text file with one ticker per line")
+    parser.add_argument("--top", type=int, default=config.TOP_N, help="Generate full reports for the top N tickers")
+    parser.add_argument("--workers", type=int, default=None, help="Backtest worker processes (default: all cores)")
+    parser.add_argument("--sort", default=config.LEADERBOARD_SORT, help="Leaderboard metric (descending)")
+    parser.add_argument("--output", default="reports", help="Output folder")
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    tickers = list(args.tickers)
+    if args.file:
+        with open(args.file, "r", encoding='utf-8') as f:
+            tickers += [line.strip() for line in f if line.strip() and not line.startswith("#")]
+    if not tickers:
+        tickers = list(config.WATCHLIST)
+    tickers = list(dict.fromkeys(t.upper() for t in tickers))
+    print(f"--- Starting Volatility Agent for {len(tickers)} tickers ---")
+
+    # 1. Fetch Data (one grouped download, served from the local cache where possible)
+    data, fetch_errors = fetch_many(tickers, config.START_DATE, config.END_DATE,
+                                    cache_dir=config.CACHE_DIR, offline=config.OFFLINE)
+    for ticker, err in fetch_errors.items():
+        print(f"Data Error ({ticker}): {err}")
+
+    # 2. Run Backtests (process pool)
+    print(f"Running {len(data)} backtests...")
+    leaderboard, run_errors = run_many(data, n_workers=args.workers, sort_by=args.sort)
+    for ticker, err in run_errors.items():
+        print(f"Backtest Error ({ticker}): {err}")
+    if leaderboard.empty:
+        print("No successful backtests.")
+        return
+
+    # 3. Save Leaderboard
+    if not os.path.exists(args.output):
+        os.makedirs(args.output)
+    leaderboard_path = os.path.join(args.output, "leaderboard.csv")
+    leaderboard.to_csv(leaderboard_path)
+    cols = ['ticker', 'strat_cagr', 'strat_sharpe', 'strat_max_dd', 'bh_cagr', 'bh_sharpe', 'final_leverage']
+    print("\n=== Leaderboard ===")
+    print(leaderboard[cols].head(20).to_string())
+
+    # 4. Full Reports for the Top N only
+    for ticker in leaderboard['ticker'].head(args.top):
+        print(f"\nGenerating reports for {ticker}...")
+        folder = os.path.join(args.output, ticker)
+        df_res, metrics, trades_df = run_backtest(data[ticker])
+        metrics['ticker'] = ticker
+        chart_path = plot_results(df_res, output_dir=folder, filename="backtest_chart.png")
+        prompt = generate_ai_prompt(ticker, metrics, df_res.iloc[-1], config)
+        ai_response = query_llm(prompt, cache_dir=config.LLM_CACHE_DIR,
+                                ttl_hours=config.LLM_CACHE_TTL_HOURS, max_entries=config.LLM_CACHE_MAX_ENTRIES)
+        save_reports(df_res, metrics, ai_response, config, folder=folder, chart_path=chart_path)
+        save_trades_html(trades_df, folder=folder, filename="trades_log.html")
+
+    print("\n=== Watchlist Run Complete ===")
+    print(f"Leaderboard: {leaderboard_path}")
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,34 @@
 # src/backtest.py
+import warnings
 import numpy as np
 import pandas as pd
 from strategy import VolatilityStrategy
-from config import COST_BPS, RISK_FREE_RATE
+import config
+from config import RISK_FREE_RATE
+
+# Tunable parameters (config.py name -> VolatilityStrategy keyword)
+STRATEGY_PARAMS = {
+    'VOL_WINDOW': 'vol_window',
+    'TARGET_VOL': 'target_vol',
+    'MAX_LEVERAGE': 'max_leverage',
+    'SMA_WINDOW': 'sma_window',
+    'RSI_WINDOW': 'rsi_window',
+    'RSI_HIGH': 'rsi_high',
+    'REBALANCE_THRESHOLD': 'rebalance_threshold',
+}
+PARAM_NAMES = list(STRATEGY_PARAMS) + ['COST_BPS']
+
+def resolve_params(params=None):
+    """
+    Merge parameter overrides (keyed by config.py names) over the config defaults.
+    """
+    resolved = {name: getattr(config, name) for name in PARAM_NAMES}
+    if params:
+        unknown = set(params) - set(PARAM_NAMES)
+        if unknown:
+            raise ValueError(f"Unknown backtest parameters: {sorted(unknown)}. Allowed: {PARAM_NAMES}")
+        resolved.update(params)
+    return resolved
 
 def calculate_max_drawdown(equity_curve):
     """Calculate Max Drawdown (Maximum percentage drop from peak)."""
@@ -53,110 +79,190 @@ def calculate_cagr(equity_curve):
     if total_return <= 0: return -1.0
     return float(total_return ** (1 / years) - 1)
 
+def calculate_metrics_matrix(returns, dates=None, risk_free_rate=0.0, block_size=1024):
+    """
+    Multi-curve metrics engine: all performance metrics for many return streams at once.
+    returns: 2-D (time x curves) array or DataFrame (e.g. sweep results or tickers).
+    dates: DatetimeIndex for CAGR (defaults to the DataFrame index).
+    Matches the single-series functions above, column by column; leading NaNs
+    (a curve that starts later) are skipped, undefined metrics are NaN.
+    Returns: DataFrame with one row per curve.
+    """
+    if isinstance(returns, pd.Series):
+        returns = returns.to_frame()
+    if isinstance(returns, pd.DataFrame):
+        labels = returns.columns
+        if dates is None:
+            dates = returns.index
+        values = returns.to_numpy(dtype=float)
+    else:
+        values = np.asarray(returns, dtype=float)
+        if values.ndim == 1:
+            values = values[:, None]
+        labels = pd.RangeIndex(values.shape[1])
+
+    n_rows, n_cols = values.shape
+    # Each curve starts at its first valid row (e.g. a ticker listed later); earlier
+    # rows are ignored, as if the single-series functions were run on that curve alone.
+    valid = ~np.isnan(values)
+    first = np.where(valid.any(axis=0), valid.argmax(axis=0), n_rows)
+    n_obs = valid.sum(axis=0)
+
+    # Calendar length of each curve (CAGR convention: days / 365.25)
+    years = np.zeros(n_cols)
+    if dates is not None and n_rows >= 2:
+        day = pd.to_datetime(dates).values.astype('datetime64[D]').astype(np.int64)
+        has_data = first < n_rows
+        years[has_data] = (day[-1] - day[first[has_data]]) / 365.25
+    rf_daily = risk_free_rate / 252.0
+
+    out = {name: np.zeros(n_cols) for name in
+           ['total_return', 'cagr', 'max_dd', 'sharpe', 'sortino', 'calmar', 'win_rate']}
+
+    # Process curves in column blocks to bound temporary memory
+    for lo in range(0, n_cols, block_size):
+        hi = min(lo + block_size, n_cols)
+        r = values[:, lo:hi]
+        cols = np.arange(hi - lo)
+        has_data = first[lo:hi] < n_rows
+
+        # 1. Equity, Running Peak & Drawdown (missing rows leave the equity unchanged)
+        equity = np.nancumprod(1 + r, axis=0)
+        started = np.arange(n_rows)[:, None] >= first[lo:hi]
+        peak = np.maximum.accumulate(np.where(started, equity, 0.0), axis=0)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            out['max_dd'][lo:hi] = np.where(started, (equity - peak) / peak, 0.0).min(axis=0)
+        out['total_return'][lo:hi] = equity[-1] - 1
+
+        # 2. Annualized Growth (from the curve's own first bar); undefined growth -> NaN
+        growth = np.full(hi - lo, np.nan)
+        growth[has_data] = equity[-1, has_data] / equity[first[lo:hi][has_data], cols[has_data]]
+        yrs = years[lo:hi]
+        with np.errstate(invalid='ignore', divide='ignore'):
+            cagr = np.where(growth > 0, np.abs(growth) ** (1 / yrs) - 1, np.where(growth <= 0, -1.0, np.nan))
+        out['cagr'][lo:hi] = np.where(yrs > 0, cagr, np.where(has_data, 0.0, np.nan))
+
+        # 3. Sharpe (sample std, ddof=1)
+        excess = r - rf_daily
+        with np.errstate(invalid='ignore', divide='ignore'), warnings.catch_warnings():
+            warnings.simplefilter('ignore', RuntimeWarning)  # all-NaN / single-row curves -> NaN
+            mean = np.nanmean(excess, axis=0)
+            std = np.nanstd(excess, axis=0, ddof=1)
+            out['sharpe'][lo:hi] = np.where(std == 0, 0.0, mean / std * np.sqrt(252))
+
+        # 4. Sortino (std of negative excess returns only)
+        downside = excess < 0
+        n_down = downside.sum(axis=0)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            down_mean = np.where(downside, excess, 0.0).sum(axis=0) / n_down
+            down_var = np.where(downside, (excess - down_mean) ** 2, 0.0).sum(axis=0) / (n_down - 1)
+            down_std = np.where(n_down > 1, np.sqrt(down_var), np.nan)
+            out['sortino'][lo:hi] = np.where(down_std == 0, 0.0, (mean * 252) / (down_std * np.sqrt(252)))
+
+        # 5. Hit Rate (over the curve's valid rows)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            out['win_rate'][lo:hi] = (r > 0).sum(axis=0) / n_obs[lo:hi]
+
+        # Curves without any data have no metrics
+        for name in ('total_return', 'max_dd'):
+            out[name][lo:hi][~has_data] = np.nan
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        out['calmar'] = np.where(out['max_dd'] == 0, 0.0, out['cagr'] / np.abs(out['max_dd']))
+
+    return pd.DataFrame(out, index=labels)
+
 def _generate_trade_log(df):
     """
     Helper: Generate discrete Trade Log from continuous leverage series.
     Rule: Open Trade when Leverage > 0, Close Trade when Leverage == 0.
+    Vectorized: holding periods are run-length segments of a latched in-trade state.
     """
-    trades = []
-    in_trade = False
-    entry_date = None
-    entry_price = 0.0
-    entry_equity = 0.0
-    max_lev = 0.0
-    
-    # Ensure index is datetime
-    df.index = pd.to_datetime(df.index)
-    
-    for date, row in df.iterrows():
-        lev = row['leverage']
-        price = row['Close']
-        equity = row['strategy_equity']
-        
-        # Signal: Open Trade (Leverage goes from 0 to positive)
-        if lev > 0 and not in_trade:
-            in_trade = True
-            entry_date = date
-            entry_price = price
-            entry_equity = equity
-            max_lev = lev
-            
-        # Signal: Update Status (Track max leverage during holding)
-        elif lev > 0 and in_trade:
-            max_lev = max(max_lev, lev)
-            
-        # Signal: Close Trade (Leverage drops to 0)
-        elif lev == 0 and in_trade:
-            in_trade = False
-            # Calculate PnL for this specific trade period (Assume 100k capital for display)
-            pnl_abs = (equity - entry_equity) * 100000 
-            
-            trades.append({
-                'entry_date': entry_date,
-                'exit_date': date,
-                'entry_price': entry_price,
-                'exit_price': price,
-                'shares': 1000, # Simulated shares
-                'leverage_mult_at_entry': max_lev, # Record max leverage used
-                'pnl': pnl_abs,
-                'exit_reason': 'Risk Off (Vol/SMA Filter)'
-            })
-            
-    # Handle open position at the end of backtest
-    if in_trade:
-        last_row = df.iloc[-1]
-        pnl_abs = (last_row['strategy_equity'] - entry_equity) * 100000
-        trades.append({
-            'entry_date': entry_date,
-            'exit_date': df.index[-1], # Till date
-            'entry_price': entry_price,
-            'exit_price': last_row['Close'],
-            'shares': 1000,
-            'leverage_mult_at_entry': max_lev,
-            'pnl': pnl_abs,
-            'exit_reason': 'Position Open'
-        })
-        
-    return pd.DataFrame(trades)
-
-def run_backtest(df):
+    dates = pd.to_datetime(df.index)
+    lev = df['leverage'].to_numpy(dtype=float)
+    price = df['Close'].to_numpy(dtype=float)
+    equity = df['strategy_equity'].to_numpy(dtype=float)
+    n = len(lev)
+
+    # 1. Latch: Leverage > 0 opens, Leverage == 0 closes, anything else keeps the state
+    events = pd.Series(np.where(lev > 0, 1.0, np.where(lev == 0, 0.0, np.nan)))
+    in_trade = events.ffill().fillna(0.0).to_numpy() > 0
+    prev_in_trade = np.concatenate(([False], in_trade[:-1]))
+
+    # 2. Run boundaries: entry on the first holding bar, exit on the first flat bar
+    entry_idx = np.flatnonzero(in_trade & ~prev_in_trade)
+    exit_idx = np.flatnonzero(~in_trade & prev_in_trade)
+    is_open = len(exit_idx) < len(entry_idx)
+    if is_open:
+        # Handle open position at the end of backtest (marked to the last bar)
+        exit_idx = np.append(exit_idx, n - 1)
+
+    # 3. Max leverage used per holding period
+    trade_id = np.cumsum(in_trade & ~prev_in_trade)
+    max_lev = pd.Series(lev[in_trade]).groupby(trade_id[in_trade]).max().to_numpy()
+
+    exit_reason = np.full(len(entry_idx), 'Risk Off (Vol/SMA Filter)', dtype=object)
+    if is_open:
+        exit_reason[-1] = 'Position Open'
+
+    return pd.DataFrame({
+        'entry_date': dates[entry_idx],
+        'exit_date': dates[exit_idx],
+        'entry_price': price[entry_idx],
+        'exit_price': price[exit_idx],
+        'shares': np.full(len(entry_idx), 1000), # Simulated shares
+        'leverage_mult_at_entry': max_lev, # Record max leverage used
+        # PnL for each trade period (Assume 100k capital for display)
+        'pnl': (equity[exit_idx] - equity[entry_idx]) * 100000,
+        'exit_reason': exit_reason,
+    })
+
+def _run_strategy(df, params):
     """
-    Execute Main Backtest Process.
-    Returns: Result DataFrame, Metrics Dictionary, Trades DataFrame.
+    Helper: Run the strategy for one parameter set and add equity curves.
     """
-    # 1. Initialize and Run Strategy
-    strategy = VolatilityStrategy(df)
-    df = strategy.generate_signals()
-    df = strategy.calculate_returns(cost_bps=COST_BPS, risk_free_rate=RISK_FREE_RATE)
-    
-    # 2. Calculate Equity Curves
+    strategy = VolatilityStrategy(df, **{kw: params[name] for name, kw in STRATEGY_PARAMS.items()})
+    strategy.generate_signals()
+    df = strategy.calculate_returns(cost_bps=params['COST_BPS'], risk_free_rate=RISK_FREE_RATE)
+
     df['strategy_equity'] = (1 + df['strategy_returns']).cumprod()
     df['benchmark_equity'] = (1 + df['returns']).cumprod()
-    
+    return df
+
+def calculate_metrics(df):
+    """
+    Calculate Strategy and Benchmark metrics from a backtest result frame.
+    """
     metrics = {}
     
-    # --- Benchmark Metrics (Buy & Hold) ---
-    metrics['bh_total_return'] = df['benchmark_equity'].iloc[-1] - 1
-    metrics['bh_cagr'] = calculate_cagr(df['benchmark_equity'])
-    metrics['bh_max_dd'] = calculate_max_drawdown(df['benchmark_equity'])
-    metrics['bh_sharpe'] = calculate_sharpe_ratio(df['returns'], RISK_FREE_RATE)
-    metrics['bh_sortino'] = calculate_sortino_ratio(df['returns'], RISK_FREE_RATE)
-    metrics['bh_calmar'] = calculate_calmar_ratio(metrics['bh_cagr'], metrics['bh_max_dd'])
-    
-    # --- Strategy Metrics ---
-    metrics['strat_total_return'] = df['strategy_equity'].iloc[-1] - 1
-    metrics['strat_cagr'] = calculate_cagr(df['strategy_equity'])
-    metrics['strat_max_dd'] = calculate_max_drawdown(df['strategy_equity'])
-    metrics['strat_sharpe'] = calculate_sharpe_ratio(df['strategy_returns'], RISK_FREE_RATE)
-    metrics['strat_sortino'] = calculate_sortino_ratio(df['strategy_returns'], RISK_FREE_RATE)
-    metrics['strat_calmar'] = calculate_calmar_ratio(metrics['strat_cagr'], metrics['strat_max_dd'])
+    # --- Benchmark (Buy & Hold) and Strategy Metrics in one pass ---
+    curves = calculate_metrics_matrix(
+        df[['returns', 'strategy_returns']].rename(columns={'returns': 'bh', 'strategy_returns': 'strat'}),
+        risk_free_rate=RISK_FREE_RATE,
+    )
+    for prefix, row in curves.drop(columns='win_rate').iterrows():
+        for name, value in row.items():
+            metrics[f'{prefix}_{name}'] = value
     
     # --- Other Statistics ---
     metrics['final_leverage'] = df['leverage'].iloc[-1]
     daily_wins = (df['strategy_returns'] > 0).sum()
     metrics['win_rate'] = daily_wins / len(df) if len(df) > 0 else 0.0
+    return metrics
+
+def run_backtest(df, params=None):
+    """
+    Execute Main Backtest Process.
+    params: optional overrides keyed by config.py names (e.g. {'TARGET_VOL': 0.2}).
+    Returns: Result DataFrame, Metrics Dictionary, Trades DataFrame.
+    """
+    # 1. Initialize and Run Strategy (adds Equity Curves)
+    df = _run_strategy(df, resolve_params(params))
+    
+    # 2. Calculate Metrics
+    metrics = calculate_metrics(df)
     
-    # --- Generate Trade Log ---
+    # 3. Generate Trade Log
     trades_df = _generate_trade_log(df)
 
-    return df, metrics, trades_df
\ No newline at end of file
+    return df, metrics, trades_df
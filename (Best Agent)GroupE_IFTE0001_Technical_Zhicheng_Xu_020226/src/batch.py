@@ -0,0 +1,88 @@
+# src/batch.py
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import pandas as pd
+from data import fetch_data, download_many, download_start, _download
+from backtest import run_backtest
+
+def fetch_many(tickers, start_date, end_date=None, cache_dir=None, offline=False):
+    """
+    Download (or load from cache) many tickers.
+    yf.download is not thread-safe, so instead of one download per thread the missing data is
+    fetched with grouped yf.download calls, one per distinct start date (usually a single call:
+    cold caches start at start_date, warm caches at their shared last bar).
+    Returns: ({ticker: DataFrame}, {ticker: error message}).
+    """
+    tickers = list(tickers)
+    prefetched = {}
+    if not offline:
+        groups = {}
+        for t in tickers:
+            start = download_start(t, start_date, end_date, cache_dir)
+            if start is not None:
+                groups.setdefault(start, []).append(t)
+        for start, group in groups.items():
+            print(f"Downloading {len(group)} tickers from {start.strftime('%Y-%m-%d')}...")
+            try:
+                frames = download_many(group, start, end_date)
+            except Exception as e:
+                # Fall back to per-ticker downloads for this group
+                print(f"Grouped download failed ({e}), retrying per ticker...")
+                continue
+            prefetched.update({(t, start): df for t, df in frames.items()})
+
+    def download(ticker, start, end):
+        """Serve the prefetched frame once; any other request (e.g. a restatement refresh) goes to Yahoo."""
+        frame = prefetched.pop((ticker, pd.Timestamp(start)), None)
+        return frame if frame is not None else _download(ticker, start, end)
+
+    data, errors = {}, {}
+    for ticker in tickers:
+        try:
+            data[ticker] = fetch_data(ticker, start_date, end_date, cache_dir=cache_dir,
+                                      offline=offline, download=download)
+        except Exception as e:
+            errors[ticker] = str(e)
+    return data, errors
+
+def _backtest_worker(ticker, df, params):
+    """Process pool task: run one ticker and return only its metrics row."""
+    _, metrics, trades_df = run_backtest(df, params)
+    row = {'ticker': ticker}
+    row.update(metrics)
+    row['n_trades'] = len(trades_df)
+    row['start'] = df.index[0]
+    row['end'] = df.index[-1]
+    return row
+
+def run_many(data, params=None, n_workers=None, sort_by='strat_sharpe'):
+    """
+    Backtest every ticker in a process pool.
+    Returns: leaderboard DataFrame sorted by `sort_by` (descending) and {ticker: error message}.
+    """
+    rows, errors = [], {}
+    if n_workers is None:
+        n_workers = min(len(data), os.cpu_count() or 1)
+
+    if n_workers <= 1:
+        for ticker, df in data.items():
+            try:
+                rows.append(_backtest_worker(ticker, df, params))
+            except Exception as e:
+                errors[ticker] = str(e)
+    else:
+        with ProcessPoolExecutor(max_workers=n_workers) as pool:
+            futures = {pool.submit(_backtest_worker, t, df, params): t for t, df in data.items()}
+            for future in as_completed(futures):
+                try:
+                    rows.append(future.result())
+                except Exception as e:
+                    errors[futures[future]] = str(e)
+
+    leaderboard = pd.DataFrame(rows)
+    if not leaderboard.empty:
+        leaderboard = leaderboard.sort_values(sort_by, ascending=False).reset_index(drop=True)
+        leaderboard.index = leaderboard.index + 1
+        leaderboard.index.name = 'rank'
+    return leaderboard, errors
@@ -5,6 +5,15 @@ TICKER = "AMZN"
 START_DATE = "2015-01-01"
 END_DATE = None  # None means up to today
 
+# --- Watchlist Batch Run (run_watchlist.py) ---
+WATCHLIST = ["AMZN", "AAPL", "MSFT", "GOOGL", "META", "NVDA", "TSLA", "NFLX"]
+TOP_N = 3                       # Full reports are generated only for the top N tickers
+LEADERBOARD_SORT = "strat_sharpe"
+
+# --- Data Cache ---
+CACHE_DIR = "data_cache"  # Local per-ticker OHLCV cache (None disables caching)
+OFFLINE = False           # True: read prices from the cache only, never download
+
 # --- Core Strategy Parameters (Volatility Targeting) ---
 VOL_WINDOW = 20    # Lookback window for realized volatility
 TARGET_VOL = 0.25  # Target annualized volatility (25% for tech stocks)
@@ -18,4 +27,9 @@ RSI_HIGH = 80      # Overbought Threshold: RSI > 80 -> Trim Exposure
 # --- Real World Parameters (Costs & Cash) ---
 COST_BPS = 10          # Transaction Cost: 10bps (0.1%)
 RISK_FREE_RATE = 0.04  # Risk-Free Rate: 4% (Yield on idle cash / Cost of borrowing)
-REBALANCE_THRESHOLD = 0.10 # Rebalance Buffer: Only trade if target differs by >10%
\ No newline at end of file
+REBALANCE_THRESHOLD = 0.10 # Rebalance Buffer: Only trade if target differs by >10%
+
+# --- AI Commentary Cache ---
+LLM_CACHE_DIR = "llm_cache"   # On-disk response cache (None disables caching)
+LLM_CACHE_TTL_HOURS = 24      # Cached commentary expires after this many hours
+LLM_CACHE_MAX_ENTRIES = 1000  # Least recently used responses are evicted beyond this
@@ -1,19 +1,50 @@
 # src/data.py
+import os
+import numpy as np
 import yfinance as yf
 import pandas as pd
 
-def fetch_data(ticker, start_date, end_date=None):
+# Columns persisted in the local price cache (adjusted OHLCV)
+CACHE_COLUMNS = ['Open', 'High', 'Low', 'Close', 'Volume']
+
+# Relative tolerance when checking that a re-downloaded overlap bar still matches the cache.
+# Adjusted prices are rewritten by Yahoo after splits/dividends, so a mismatch forces a full refresh.
+ADJUSTMENT_TOLERANCE = 1e-6
+
+def _download(ticker, start_date, end_date=None):
     """
-    Fetch data from Yahoo Finance and calculate basic daily returns.
+    Download adjusted OHLCV from Yahoo Finance and normalise the column layout.
     """
-    print(f"Downloading data for {ticker} from {start_date}...")
-    
     # auto_adjust=True handles stock splits and dividends automatically
     df = yf.download(ticker, start=start_date, end=end_date, progress=False, auto_adjust=True)
-    
+
     if df.empty:
-        raise ValueError(f"No data found for {ticker}. Please check the ticker symbol or date range.")
+        return df
+    return _normalise(df, ticker)
+
+def download_many(tickers, start_date, end_date=None):
+    """
+    Download many tickers with one grouped yf.download call.
+    (yf.download shares global state and is not thread-safe, so never call it from a thread pool.)
+    Returns: {ticker: DataFrame}, an empty DataFrame for tickers without data.
+    """
+    tickers = list(tickers)
+    raw = yf.download(tickers, start=start_date, end=end_date, progress=False,
+                      auto_adjust=True, group_by='ticker')
+
+    frames = {}
+    for ticker in tickers:
+        if isinstance(raw.columns, pd.MultiIndex):
+            df = raw[ticker] if ticker in raw.columns.get_level_values(0) else pd.DataFrame()
+        else:
+            df = raw if len(tickers) == 1 else pd.DataFrame()
+        # Dates are the union over all tickers: drop the rows before a ticker's listing
+        df = df.dropna(how='all')
+        frames[ticker] = _normalise(df.copy(), ticker) if not df.empty else pd.DataFrame()
+    return frames
 
+def _normalise(df, ticker):
+    """Flatten yfinance's column layout to one ticker's OHLCV with a DatetimeIndex."""
     # --- Data Cleaning (Compatible with different yfinance versions) ---
     # If MultiIndex (new yfinance structure), try to extract the specific ticker level
     if isinstance(df.columns, pd.MultiIndex):
@@ -31,9 +62,155 @@ def fetch_data(ticker, start_date, end_date=None):
         else:
             # Last resort: take the first column
             df['Close'] = df.iloc[:, 0]
-            
+
+    df.index = pd.to_datetime(df.index)
+    return df
+
+def _cache_path(cache_dir, ticker):
+    """Helper: One .npz file per ticker inside the cache directory."""
+    safe_name = ticker.replace('/', '_').replace('^', '_')
+    return os.path.join(cache_dir, f"{safe_name}.npz")
+
+def load_cache(ticker, cache_dir):
+    """
+    Load cached OHLCV for a ticker.
+    Returns: DataFrame indexed by date (df.attrs['start'] = requested start the cache
+    covers, None if unknown), or None if the ticker is not cached.
+    """
+    path = _cache_path(cache_dir, ticker)
+    if not os.path.exists(path):
+        return None
+    with np.load(path) as store:
+        index = pd.to_datetime(store['dates'])
+        data = {col: store[col] for col in CACHE_COLUMNS if col in store.files}
+        start = pd.Timestamp(int(store['start'])) if 'start' in store.files else None
+    df = pd.DataFrame(data, index=index)
+    df.index.name = 'Date'
+    df.attrs['start'] = start
+    return df
+
+def save_cache(df, ticker, cache_dir, start_date):
+    """
+    Persist OHLCV columns to the cache (column-per-array, dates as int64 nanoseconds),
+    together with the requested start date the download covered.
+    """
+    if not os.path.exists(cache_dir):
+        os.makedirs(cache_dir)
+    arrays = {col: df[col].to_numpy(dtype=float) for col in CACHE_COLUMNS if col in df.columns}
+    arrays['dates'] = pd.DatetimeIndex(df.index).as_unit('ns').asi8
+    arrays['start'] = np.int64(pd.Timestamp(start_date).as_unit('ns').value)
+    path = _cache_path(cache_dir, ticker)
+    # Write to a temp file first so an interrupted run never leaves a truncated cache
+    tmp_path = path + ".tmp.npz"
+    np.savez(tmp_path, **arrays)
+    os.replace(tmp_path, path)
+
+def _completed_bars(df):
+    """Drop today's bar: it is still forming and its Close will change."""
+    return df[df.index < pd.Timestamp.now().normalize()]
+
+def _needs_full_download(cached, start_date):
+    """
+    True if the cache cannot serve the request. Coverage is judged on the requested start
+    stored with the cache, not on the first bar (a start on a holiday / weekend never has a bar of its own).
+    """
+    return cached is None or cached.empty or cached.attrs['start'] is None or cached.attrs['start'] > pd.Timestamp(start_date)
+
+def _is_covered(cached, end_date):
+    """True if the cached bars already reach the (exclusive) end date."""
+    return end_date is not None and cached.index[-1] >= pd.Timestamp(end_date) - pd.Timedelta(days=1)
+
+def download_start(ticker, start_date, end_date=None, cache_dir=None):
+    """
+    Start date of the first download fetch_data will make for a ticker,
+    or None if the cache already covers the requested window.
+    """
+    if cache_dir is None:
+        return pd.Timestamp(start_date)
+    cached = load_cache(ticker, cache_dir)
+    if _needs_full_download(cached, start_date):
+        return pd.Timestamp(start_date)
+    if _is_covered(cached, end_date):
+        return None
+    return cached.index[-1]
+
+def _update_cache(ticker, start_date, end_date, cache_dir, download=_download):
+    """
+    Bring the cache up to date: fetch only the missing tail and append it.
+    Falls back to a full download when the cache is empty, was built from a later
+    start date, or the adjusted history has been restated since the last run.
+    Only completed bars are cached; today's forming bar is returned but not saved.
+    """
+    cached = load_cache(ticker, cache_dir)
+    start_ts = pd.Timestamp(start_date)
+
+    if _needs_full_download(cached, start_ts):
+        print(f"Downloading data for {ticker} from {start_date}...")
+        fresh = download(ticker, start_date, end_date)
+        if not fresh.empty:
+            save_cache(_completed_bars(fresh), ticker, cache_dir, start_ts)
+        return fresh
+
+    cache_start = cached.attrs['start']
+    last_date = cached.index[-1]
+    # Nothing to fetch if the requested window is already covered
+    if _is_covered(cached, end_date):
+        return cached
+
+    # Re-download from the last cached bar (inclusive) to detect restated adjustments
+    print(f"Updating cache for {ticker} from {last_date.strftime('%Y-%m-%d')}...")
+    tail = download(ticker, last_date.strftime('%Y-%m-%d'), end_date)
+    if tail.empty:
+        return cached
+
+    if last_date in tail.index:
+        old_close = cached.loc[last_date, 'Close']
+        new_close = tail.loc[last_date, 'Close']
+        if not np.isclose(old_close, new_close, rtol=ADJUSTMENT_TOLERANCE, atol=0.0):
+            print(f"Adjusted history for {ticker} changed, refreshing full cache...")
+            fresh = download(ticker, cache_start.strftime('%Y-%m-%d'), end_date)
+            if not fresh.empty:
+                save_cache(_completed_bars(fresh), ticker, cache_dir, cache_start)
+                return fresh
+            return cached
+
+    combined = pd.concat([cached, tail[[c for c in CACHE_COLUMNS if c in tail.columns]]])
+    combined = combined[~combined.index.duplicated(keep='last')].sort_index()
+    save_cache(_completed_bars(combined), ticker, cache_dir, cache_start)
+    return combined
+
+def fetch_data(ticker, start_date, end_date=None, cache_dir=None, offline=False, download=_download):
+    """
+    Fetch data from Yahoo Finance and calculate basic daily returns.
+    If cache_dir is set, prices are served from a local per-ticker cache and only
+    the missing tail days are downloaded. offline=True reads from the cache only.
+    download(ticker, start, end) replaces the Yahoo download (batch.fetch_many passes prefetched data).
+    """
+    if cache_dir is None:
+        if offline:
+            raise ValueError("Offline mode requires a cache directory.")
+        print(f"Downloading data for {ticker} from {start_date}...")
+        df = download(ticker, start_date, end_date)
+    elif offline:
+        df = load_cache(ticker, cache_dir)
+        if df is None:
+            raise ValueError(f"No cached data for {ticker} in '{cache_dir}' (offline mode).")
+    else:
+        df = _update_cache(ticker, start_date, end_date, cache_dir, download)
+
+    if df is not None and not df.empty:
+        # Restrict to the requested window (yfinance 'end' is exclusive)
+        df = df[df.index >= pd.Timestamp(start_date)]
+        if end_date is not None:
+            df = df[df.index < pd.Timestamp(end_date)]
+
+    if df is None or df.empty:
+        raise ValueError(f"No data found for {ticker}. Please check the ticker symbol or date range.")
+
+    df = df.copy()
+
     # --- Calculate Daily Returns ---
     # Required for strategy backtesting
     df['returns'] = df['Close'].pct_change().fillna(0)
-    
+
     return df
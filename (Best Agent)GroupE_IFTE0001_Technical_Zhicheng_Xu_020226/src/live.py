@@ -0,0 +1,214 @@
+# src/live.py
+import json
+import math
+import os
+from collections import deque
+
+import pandas as pd
+from config import VOL_WINDOW, TARGET_VOL, MAX_LEVERAGE, SMA_WINDOW, RSI_WINDOW, RSI_HIGH, REBALANCE_THRESHOLD, COST_BPS, RISK_FREE_RATE
+from strategy import EXIT_BUFFER
+
+class LiveVolatilityStrategy:
+    """
+    Streaming version of VolatilityStrategy.
+    Keeps indicator state (rolling variance, SMA sum, RSI averages), the executed
+    leverage and equity between runs, so each new bar is an O(1) update.
+    Produces the same leverage path as generate_signals() + calculate_returns().
+    """
+
+    def __init__(self, vol_window=VOL_WINDOW, target_vol=TARGET_VOL, max_leverage=MAX_LEVERAGE,
+                 sma_window=SMA_WINDOW, rsi_window=RSI_WINDOW, rsi_high=RSI_HIGH,
+                 rebalance_threshold=REBALANCE_THRESHOLD, cost_bps=COST_BPS, risk_free_rate=RISK_FREE_RATE):
+        self.vol_window = vol_window
+        self.target_vol = target_vol
+        self.max_leverage = max_leverage
+        self.sma_window = sma_window
+        self.rsi_window = rsi_window
+        self.rsi_high = rsi_high
+        self.rebalance_threshold = rebalance_threshold
+        self.cost_bps = cost_bps
+        self.risk_free_rate = risk_free_rate
+
+        # Rolling variance of returns (windowed Welford)
+        self.ret_window = deque()
+        self.ret_mean = 0.0
+        self.ret_m2 = 0.0
+        # SMA of closes
+        self.close_window = deque()
+        self.close_sum = 0.0
+        # RSI rolling gain/loss sums
+        self.gain_window = deque()
+        self.loss_window = deque()
+        self.gain_sum = 0.0
+        self.loss_sum = 0.0
+
+        # Position & equity
+        self.last_date = None
+        self.last_close = None
+        self.current_lev = 0.0   # Executed leverage decided at the last close (applies to next bar)
+        self.applied_lev = 0.0   # Leverage held during the last bar
+        self.strategy_equity = 1.0
+        self.benchmark_equity = 1.0
+        self.n_bars = 0
+
+    # --- Indicator updates ---
+    def _push_return(self, x):
+        self.ret_window.append(x)
+        delta = x - self.ret_mean
+        self.ret_mean += delta / len(self.ret_window)
+        self.ret_m2 += delta * (x - self.ret_mean)
+        if len(self.ret_window) > self.vol_window:
+            y = self.ret_window.popleft()
+            n = len(self.ret_window)
+            delta = y - self.ret_mean
+            self.ret_mean -= delta / n
+            self.ret_m2 -= delta * (y - self.ret_mean)
+
+    def _push_close(self, close):
+        self.close_window.append(close)
+        self.close_sum += close
+        if len(self.close_window) > self.sma_window:
+            self.close_sum -= self.close_window.popleft()
+
+    def _push_delta(self, delta):
+        gain = delta if delta > 0 else 0.0
+        loss = -delta if delta < 0 else 0.0
+        self.gain_window.append(gain)
+        self.loss_window.append(loss)
+        self.gain_sum += gain
+        self.loss_sum += loss
+        if len(self.gain_window) > self.rsi_window:
+            self.gain_sum -= self.gain_window.popleft()
+            self.loss_sum -= self.loss_window.popleft()
+
+    def rolling_vol(self):
+        """Annualized rolling volatility (NaN during warm-up)."""
+        if len(self.ret_window) < self.vol_window or self.vol_window < 2:
+            return math.nan
+        return math.sqrt(max(self.ret_m2, 0.0) / (self.vol_window - 1)) * math.sqrt(252)
+
+    def sma(self):
+        """Simple Moving Average (NaN during warm-up)."""
+        if len(self.close_window) < self.sma_window:
+            return math.nan
+        return self.close_sum / self.sma_window
+
+    def rsi(self):
+        """Relative Strength Index (50 = Neutral during warm-up or with no losses)."""
+        if len(self.gain_window) < self.rsi_window:
+            return 50.0
+        avg_gain = self.gain_sum / self.rsi_window
+        avg_loss = self.loss_sum / self.rsi_window
+        if avg_loss <= 0:
+            return 50.0
+        return 100 - (100 / (1 + avg_gain / avg_loss))
+
+    # --- Signal ---
+    def _target_leverage(self, close, vol, sma, rsi):
+        """Same stepped caps as VolatilityStrategy.generate_signals."""
+        cap = self.max_leverage
+        if close < sma:
+            cap = 1.0
+        if close < sma * (1 - EXIT_BUFFER):
+            cap = 0.0
+        if rsi > self.rsi_high:
+            cap = 0.8
+        raw = self.target_vol / vol if (vol == vol and vol != 0) else math.nan
+        # NaN raw leverage (warm-up) falls back to the cap, as in the batch min(axis=1)
+        target = cap if math.isnan(raw) else min(raw, cap)
+        return max(target, 0.0)
+
+    def update(self, date, close):
+        """
+        Process one new bar (date, adjusted close).
+        Returns: dict with the leverage decision for the next bar and current state.
+        """
+        date = pd.Timestamp(date)
+        if self.last_date is not None and date <= self.last_date:
+            raise ValueError(f"Bar {date.date()} is not after the last processed bar {self.last_date.date()}.")
+
+        # 1. Daily return (first bar = 0, as pct_change().fillna(0))
+        ret = 0.0 if self.last_close is None else close / self.last_close - 1
+        delta = 0.0 if self.last_close is None else close - self.last_close
+
+        # 2. Mark equity with the leverage decided at the previous close (T+1 execution)
+        held = self.current_lev
+        rf_daily = self.risk_free_rate / 252
+        txn_costs = abs(held - self.applied_lev) * self.cost_bps / 10000
+        strat_ret = held * ret + (1.0 - held) * rf_daily - txn_costs
+        self.strategy_equity *= 1 + strat_ret
+        self.benchmark_equity *= 1 + ret
+        self.applied_lev = held
+
+        # 3. Update indicators
+        self._push_return(ret)
+        self._push_close(close)
+        self._push_delta(delta)
+        vol, sma, rsi = self.rolling_vol(), self.sma(), self.rsi()
+
+        # 4. Rebalance Buffer -> next executed leverage
+        target = self._target_leverage(close, vol, sma, rsi)
+        if target == 0.0:
+            self.current_lev = 0.0
+        elif self.current_lev == 0.0 and target > 0.0:
+            self.current_lev = target
+        elif abs(target - self.current_lev) > self.rebalance_threshold:
+            self.current_lev = target
+
+        self.last_date = date
+        self.last_close = close
+        self.n_bars += 1
+
+        return {
+            'date': date,
+            'close': close,
+            'rolling_vol': vol,
+            'sma': sma,
+            'rsi': rsi,
+            'target_leverage': target,
+            'leverage': held,
+            'next_leverage': self.current_lev,
+            'strategy_returns': strat_ret,
+            'strategy_equity': self.strategy_equity,
+            'benchmark_equity': self.benchmark_equity,
+        }
+
+    def warm_up(self, df):
+        """
+        Feed a history of bars (DataFrame with 'Close').
+        Returns: DataFrame of per-bar outputs.
+        """
+        rows = [self.update(date, float(close)) for date, close in df['Close'].items()]
+        return pd.DataFrame(rows).set_index('date') if rows else pd.DataFrame()
+
+    # --- Persistence ---
+    def to_dict(self):
+        state = dict(self.__dict__)
+        for key in ['ret_window', 'close_window', 'gain_window', 'loss_window']:
+            state[key] = list(state[key])
+        state['last_date'] = None if self.last_date is None else self.last_date.isoformat()
+        return state
+
+    @classmethod
+    def from_dict(cls, state):
+        obj = cls.__new__(cls)
+        obj.__dict__.update(state)
+        for key in ['ret_window', 'close_window', 'gain_window', 'loss_window']:
+            setattr(obj, key, deque(state[key]))
+        obj.last_date = None if state['last_date'] is None else pd.Timestamp(state['last_date'])
+        return obj
+
+    def save(self, path):
+        """Persist state as JSON (written atomically)."""
+        folder = os.path.dirname(path)
+        if folder and not os.path.exists(folder):
+            os.makedirs(folder)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w", encoding='utf-8') as f:
+            json.dump(self.to_dict(), f)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "r", encoding='utf-8') as f:
+            return cls.from_dict(json.load(f))
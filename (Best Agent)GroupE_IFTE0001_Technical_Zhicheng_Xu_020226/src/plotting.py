@@ -1,21 +1,78 @@
 # src/plotting.py
+import hashlib
 import matplotlib.pyplot as plt
+import matplotlib.dates as mdates
+from matplotlib.collections import PolyCollection
 import pandas as pd
 import numpy as np
 import os
 from config import VOL_WINDOW, TARGET_VOL
 
-def plot_results(df, output_dir="reports", filename="backtest_chart.png"):
+# Bump when the chart layout changes so cached PNGs are re-rendered
+CHART_VERSION = "2"
+
+def _chart_hash(df, max_points):
+    """
+    Helper: Fingerprint of every array and setting that affects the chart.
+    """
+    h = hashlib.sha256()
+    h.update(f"{CHART_VERSION}|{VOL_WINDOW}|{TARGET_VOL}|{max_points}".encode())
+    h.update(pd.DatetimeIndex(pd.to_datetime(df.index)).as_unit('ns').asi8.tobytes())
+    for col in ['strategy_equity', 'benchmark_equity', 'strategy_returns', 'returns', 'leverage', 'Close', 'sma']:
+        if col in df.columns:
+            h.update(col.encode())
+            h.update(np.ascontiguousarray(df[col].to_numpy(dtype=float)).tobytes())
+    return h.hexdigest()
+
+def _lttb_indices(x, y, n_out):
+    """
+    Largest-Triangle-Three-Buckets downsampling.
+    Returns: indices of the points to keep (always includes first and last).
+    """
+    n = len(x)
+    if n_out is None or n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    # NaN (e.g. indicator warm-up) -> treat as 0 area so buckets still pick a point
+    y = np.nan_to_num(np.asarray(y, dtype=float))
+    x = np.asarray(x, dtype=float)
+    edges = np.linspace(1, n - 1, n_out - 1).astype(int)
+    keep = np.empty(n_out, dtype=int)
+    keep[0], keep[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+        # Average of the next bucket (or the last point) is the third triangle vertex
+        nxt_lo, nxt_hi = hi, (edges[i + 2] if i + 2 < len(edges) else n)
+        avg_x = x[nxt_lo:nxt_hi].mean()
+        avg_y = y[nxt_lo:nxt_hi].mean()
+        area = np.abs((x[a] - avg_x) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (avg_y - y[a]))
+        a = lo + int(np.argmax(area))
+        keep[i + 1] = a
+    return keep
+
+def plot_results(df, output_dir="reports", filename="backtest_chart.png", max_points=2000, use_cache=True):
     """
     Plot Professional 4-Panel Backtest Charts:
     1. Net Equity Curve
     2. Drawdown Profile
     3. Volatility Regime
     4. Leverage & Risk Controls
+    Long series are reduced to ~max_points per line (LTTB). If the plotted data is
+    unchanged since the last render (same hash), the existing PNG is reused.
     """
     if not os.path.exists(output_dir):
         os.makedirs(output_dir)
 
+    output_path = os.path.join(output_dir, filename)
+    hash_path = output_path + ".hash"
+    chart_hash = _chart_hash(df, max_points)
+    if use_cache and os.path.exists(output_path) and os.path.exists(hash_path):
+        with open(hash_path, "r", encoding='utf-8') as f:
+            if f.read().strip() == chart_hash:
+                print(f"Chart unchanged, reusing: {output_path}")
+                return output_path
+
     # Set transparent background style (optimized for HTML embedding)
     plt.rcParams.update({
         "figure.facecolor":  (0.0, 0.0, 0.0, 0.0),  # Transparent
@@ -32,12 +89,22 @@ def plot_results(df, output_dir="reports", filename="backtest_chart.png"):
     rolling_strat_vol = df['strategy_returns'].rolling(window=VOL_WINDOW).std() * np.sqrt(252)
     rolling_bench_vol = df['returns'].rolling(window=VOL_WINDOW).std() * np.sqrt(252)
 
+    strat_dd = (df['strategy_equity'] / df['strategy_equity'].cummax()) - 1
+    bench_dd = (df['benchmark_equity'] / df['benchmark_equity'].cummax()) - 1
+
+    # Downsample each line on its own shape (full-resolution values computed above)
+    dates = pd.to_datetime(df.index)
+    x_num = dates.asi8.astype(float)
+    def _reduced(series):
+        idx = _lttb_indices(x_num, series.to_numpy(dtype=float), max_points)
+        return dates[idx], series.to_numpy(dtype=float)[idx]
+
     # Create 4x1 Subplots
     fig, (ax1, ax2, ax3, ax4) = plt.subplots(4, 1, figsize=(10, 14), sharex=True)
     
     # --- Panel 1: Cumulative Returns (Log Scale) ---
-    ax1.plot(df.index, df['strategy_equity'], label='Strategy (Net)', color=STRAT_COLOR, lw=2)
-    ax1.plot(df.index, df['benchmark_equity'], label='Benchmark (Buy & Hold)', color=BENCH_COLOR, alpha=0.7, ls='--', lw=1.5)
+    ax1.plot(*_reduced(df['strategy_equity']), label='Strategy (Net)', color=STRAT_COLOR, lw=2)
+    ax1.plot(*_reduced(df['benchmark_equity']), label='Benchmark (Buy & Hold)', color=BENCH_COLOR, alpha=0.7, ls='--', lw=1.5)
     ax1.set_title('1. Cumulative Returns (Log Scale)', fontsize=11, fontweight='bold', color='#333')
     ax1.set_yscale('log')
     ax1.set_ylabel('Equity ($)')
@@ -45,18 +112,16 @@ def plot_results(df, output_dir="reports", filename="backtest_chart.png"):
     ax1.grid(True, which='both', alpha=0.2, color='#999')
     
     # --- Panel 2: Drawdown ---
-    strat_dd = (df['strategy_equity'] / df['strategy_equity'].cummax()) - 1
-    bench_dd = (df['benchmark_equity'] / df['benchmark_equity'].cummax()) - 1
-    ax2.fill_between(df.index, strat_dd, 0, color=STRAT_COLOR, alpha=0.2, label='Strategy Drawdown')
-    ax2.plot(df.index, bench_dd, color='gray', alpha=0.5, lw=1, label='Benchmark Drawdown')
+    ax2.fill_between(*_reduced(strat_dd), 0, color=STRAT_COLOR, alpha=0.2, label='Strategy Drawdown')
+    ax2.plot(*_reduced(bench_dd), color='gray', alpha=0.5, lw=1, label='Benchmark Drawdown')
     ax2.set_title('2. Drawdown Profile (%)', fontsize=11, fontweight='bold', color='#333')
     ax2.set_ylabel('Depth')
     ax2.legend(loc='lower left', frameon=True, facecolor='white', framealpha=0.8)
     ax2.grid(True, alpha=0.2, color='#999')
 
     # --- Panel 3: Volatility Regime ---
-    ax3.plot(df.index, rolling_bench_vol, label='Benchmark Vol', color='gray', alpha=0.4, lw=1)
-    ax3.plot(df.index, rolling_strat_vol, label='Strategy Vol', color=VOL_COLOR, lw=1.5)
+    ax3.plot(*_reduced(rolling_bench_vol), label='Benchmark Vol', color='gray', alpha=0.4, lw=1)
+    ax3.plot(*_reduced(rolling_strat_vol), label='Strategy Vol', color=VOL_COLOR, lw=1.5)
     ax3.axhline(TARGET_VOL, color='green', ls='--', alpha=0.8, label=f'Target Vol ({TARGET_VOL:.0%})')
     ax3.set_title('3. Volatility Regime (20-day Rolling)', fontsize=11, fontweight='bold', color='#333')
     ax3.set_ylabel('Ann. Volatility')
@@ -64,21 +129,19 @@ def plot_results(df, output_dir="reports", filename="backtest_chart.png"):
     ax3.grid(True, alpha=0.2, color='#999')
     
     # --- Panel 4: Leverage & Risk Control ---
-    ax4.plot(df.index, df['leverage'], label='Leverage Used', color='#1f77b4', lw=1.5)
+    ax4.plot(*_reduced(df['leverage']), label='Leverage Used', color='#1f77b4', lw=1.5)
     ax4.axhline(1.0, color='black', ls=':', alpha=0.5)
     
-    # Mark SMA Bear Market Filter (Gray Background)
+    # Mark SMA Bear Market Filter (Gray Background) - all regions in one collection
     if 'sma' in df.columns:
-        bear_mask = df['Close'] < df['sma']
+        bear_mask = (df['Close'] < df['sma']).to_numpy()
         if bear_mask.any():
-            import matplotlib.transforms as mtransforms
-            labeled = False
-            for start, end in _contiguous_regions(bear_mask):
-                if not labeled:
-                    ax4.axvspan(df.index[start], df.index[end], color='gray', alpha=0.15, label='Bear Filter (SMA)')
-                    labeled = True
-                else:
-                    ax4.axvspan(df.index[start], df.index[end], color='gray', alpha=0.15)
+            x_dates = mdates.date2num(dates.to_pydatetime())
+            verts = [[(x_dates[start], 0), (x_dates[start], 1), (x_dates[end], 1), (x_dates[end], 0)]
+                     for start, end in _contiguous_regions(bear_mask)]
+            shading = PolyCollection(verts, transform=ax4.get_xaxis_transform(),
+                                     facecolor='gray', edgecolor='none', alpha=0.15, label='Bear Filter (SMA)')
+            ax4.add_collection(shading)
 
     ax4.set_title('4. Leverage & Risk Controls', fontsize=11, fontweight='bold', color='#333')
     ax4.set_ylabel('Exposure')
@@ -88,10 +151,11 @@ def plot_results(df, output_dir="reports", filename="backtest_chart.png"):
     
     plt.tight_layout()
     
-    output_path = os.path.join(output_dir, filename)
     # transparent=True ensures the chart background blends with HTML
     plt.savefig(output_path, dpi=120, bbox_inches='tight', transparent=True)
     plt.close(fig)
+    with open(hash_path, "w", encoding='utf-8') as f:
+        f.write(chart_hash)
     print(f"Chart saved to: {output_path}")
     return output_path
 
@@ -1,8 +1,18 @@
 # src/report.py
 import os
+import json
+import time
 import base64
+import glob
+import hashlib
+import numpy as np
 import pandas as pd
 
+# --- LLM Settings ---
+LLM_MODEL = "gpt-4o"
+LLM_TEMPERATURE = 0.5
+LLM_SYSTEM_PROMPT = "You are a hedge fund analyst. Output HTML paragraphs <p> and <b>."
+
 # --- CSS Styling ---
 HTML_CSS = """
 <style>
@@ -27,6 +37,8 @@ HTML_CSS = """
     .footer { margin-top: 50px; text-align: center; font-size: 12px; color: #aaa; border-top: 1px solid #eee; padding-top: 20px; }
     .pnl-pos { color: #27ae60; font-weight: bold; }
     .pnl-neg { color: #c0392b; font-weight: bold; }
+    .pager { margin: 20px 0; text-align: center; font-size: 14px; color: #7f8c8d; }
+    .pager a { color: #2980b9; margin: 0 8px; text-decoration: none; }
 </style>
 """
 
@@ -73,23 +85,89 @@ def generate_ai_prompt(ticker, metrics, latest_data, config):
     """
     return prompt
 
-def query_llm(prompt):
+# --- LLM Response Cache ---
+_CLIENTS = {}
+
+def _get_client(api_key):
+    """Reuse one OpenAI client per API key instead of building one per call."""
+    if api_key not in _CLIENTS:
+        from openai import OpenAI
+        _CLIENTS[api_key] = OpenAI(api_key=api_key)
+    return _CLIENTS[api_key]
+
+def _llm_cache_key(prompt, model, temperature):
+    payload = json.dumps([model, temperature, LLM_SYSTEM_PROMPT, prompt])
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+def _llm_cache_get(cache_dir, key, ttl_seconds):
+    path = os.path.join(cache_dir, f"{key}.json")
+    if not os.path.exists(path): return None
+    try:
+        with open(path, "r", encoding='utf-8') as f: entry = json.load(f)
+    except (OSError, ValueError):
+        return None
+    # Another process may expire / evict the same entry concurrently
+    if ttl_seconds is not None and time.time() - entry.get('created', 0) > ttl_seconds:
+        try: os.remove(path)
+        except FileNotFoundError: pass
+        return None
+    try: os.utime(path)  # mark as recently used (LRU order = file mtime)
+    except FileNotFoundError: pass
+    return entry.get('content')
+
+def _llm_cache_put(cache_dir, key, content, max_entries):
+    if not os.path.exists(cache_dir): os.makedirs(cache_dir)
+    path = os.path.join(cache_dir, f"{key}.json")
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding='utf-8') as f: json.dump({'created': time.time(), 'content': content}, f)
+    os.replace(tmp_path, path)
+
+    # Evict least recently used entries above the size bound
+    if max_entries is not None:
+        entries = []
+        for name in os.listdir(cache_dir):
+            if not name.endswith(".json"): continue
+            entry_path = os.path.join(cache_dir, name)
+            try: entries.append((os.path.getmtime(entry_path), entry_path))
+            except FileNotFoundError: pass  # removed since listdir
+        if len(entries) > max_entries:
+            entries.sort()
+            for _, old in entries[:len(entries) - max_entries]:
+                try: os.remove(old)
+                except FileNotFoundError: pass
+
+def query_llm(prompt, model=LLM_MODEL, temperature=LLM_TEMPERATURE, cache_dir=None, ttl_hours=24, max_entries=1000):
+    """
+    Query the LLM for commentary.
+    If cache_dir is set, responses are cached on disk keyed by hash(prompt, model, temperature),
+    expire after ttl_hours and the cache keeps at most max_entries (LRU eviction).
+    Cached responses are served even without an API key.
+    """
+    key = _llm_cache_key(prompt, model, temperature)
+    ttl_seconds = None if ttl_hours is None else ttl_hours * 3600
+    if cache_dir:
+        cached = _llm_cache_get(cache_dir, key, ttl_seconds)
+        if cached is not None: return cached
+
     api_key = os.getenv("OPENAI_API_KEY")
     if not api_key: return "<p><em>AI Commentary Unavailable.</em></p>"
+
     try:
-        from openai import OpenAI
-        client = OpenAI(api_key=api_key)
+        client = _get_client(api_key)
         response = client.chat.completions.create(
-            model="gpt-4o",
-            messages=[{"role": "system", "content": "You are a hedge fund analyst. Output HTML paragraphs <p> and <b>."}, {"role": "user", "content": prompt}],
-            temperature=0.5
+            model=model,
+            messages=[{"role": "system", "content": LLM_SYSTEM_PROMPT}, {"role": "user", "content": prompt}],
+            temperature=temperature
         )
         content = response.choices[0].message.content.strip()
         content = content.replace("**", "<b>").replace("**", "</b>")
         if not content.startswith("<p>"): content = f"<p>{content}</p>"
-        return content
     except Exception as e: return f"<p style='color:red'>AI Error: {e}</p>"
 
+    # Only successful responses are cached
+    if cache_dir: _llm_cache_put(cache_dir, key, content, max_entries)
+    return content
+
 # --- REPORT GENERATOR 1: Main Strategy Report ---
 def save_reports(df, metrics, ai_commentary, config, folder="reports", chart_path=None):
     if not os.path.exists(folder): os.makedirs(folder)
@@ -167,56 +245,178 @@ def save_reports(df, metrics, ai_commentary, config, folder="reports", chart_pat
     with open(os.path.join(folder, "trade_note.md"), "w", encoding='utf-8') as f: f.write(md_content)
     print(f"Main Strategy Reports updated in {folder}")
 
+# --- Streaming Table Writer ---
+def _format_number(values, decimals=2, prefix=""):
+    """
+    Vectorized f"{prefix}{x:,.{decimals}f}" for a whole column (NaN -> "").
+    """
+    v = np.asarray(values, dtype=float)
+    nan = np.isnan(v)
+    scaled = np.rint(np.abs(np.where(nan, 0.0, v)) * 10 ** decimals).astype(np.int64)
+    whole, frac = np.divmod(scaled, 10 ** decimals)
+
+    # Build thousands groups from the right: lead group unpadded, others zero-padded
+    lead = np.full(len(v), "", dtype=object)
+    tail = np.full(len(v), "", dtype=object)
+    done = np.zeros(len(v), dtype=bool)
+    while not done.all():
+        whole, group = np.divmod(whole, 1000)
+        more = whole > 0
+        group_str = np.char.mod("%d", group).astype(object)
+        tail = np.where(~done & more, "," + np.char.zfill(group_str.astype(str), 3).astype(object) + tail, tail)
+        lead = np.where(~done & ~more, group_str, lead)
+        done |= ~more
+
+    out = prefix + np.where(v < 0, "-", "") + lead + tail
+    if decimals > 0:
+        out = out + "." + np.char.zfill(np.char.mod("%d", frac), decimals).astype(object)
+    return np.where(nan, "", out)
+
+def _page_name(filename, page):
+    stem, ext = os.path.splitext(filename)
+    return filename if page == 1 else f"{stem}_page{page}{ext}"
+
+def _write_html_pages(chunks, n_rows, headers, folder, filename, title, heading, subtitle="", page_size=1000):
+    """
+    Stream formatted row chunks into paginated HTML files.
+    chunks: iterable of lists of equal-length string arrays (one per column).
+    Page 1 is `filename`, later pages are `<stem>_page<N><ext>`.
+    Returns: list of written paths.
+    """
+    n_pages = max(1, -(-n_rows // page_size))
+    # Drop pages left over from a previous, longer run
+    stem, ext = os.path.splitext(filename)
+    for stale in glob.glob(os.path.join(folder, f"{stem}_page*{ext}")): os.remove(stale)
+
+    head_html = "".join(f"<th>{h}</th>" for h in headers)
+    paths = []
+    page, rows_on_page, f = 0, 0, None
+
+    def _open_page(page):
+        path = os.path.join(folder, _page_name(filename, page))
+        paths.append(path)
+        links = []
+        if page > 1: links.append(f'<a href="{_page_name(filename, page - 1)}">&laquo; Prev</a>')
+        links.append(f"Page {page} of {n_pages}")
+        if page < n_pages: links.append(f'<a href="{_page_name(filename, page + 1)}">Next &raquo;</a>')
+        pager = f'<div class="pager">{" ".join(links)}</div>'
+        fh = open(path, "w", encoding='utf-8')
+        fh.write(f"""<!DOCTYPE html><html lang="en"><head><meta charset="UTF-8"><title>{title}</title>{HTML_CSS}</head><body><div class="container"><h1>{heading}</h1>""")
+        if subtitle: fh.write(f'<div class="subtitle">{subtitle}</div>')
+        fh.write(f"{pager}<table><thead><tr>{head_html}</tr></thead><tbody>")
+        return fh, pager
+
+    def _close_page(fh, pager):
+        fh.write(f'</tbody></table>{pager}<div class="footer">Generated by AI Quantitative Agent</div></div></body></html>')
+        fh.close()
+
+    pager = ""
+    for columns in chunks:
+        cells = [np.asarray(c, dtype=object) for c in columns]
+        rows = "<tr><td>" + cells[0]
+        for c in cells[1:]: rows = rows + "</td><td>" + c
+        rows = rows + "</td></tr>"
+        start = 0
+        while start < len(rows):
+            if f is None or rows_on_page == page_size:
+                if f is not None: _close_page(f, pager)
+                page += 1
+                f, pager = _open_page(page)
+                rows_on_page = 0
+            take = min(page_size - rows_on_page, len(rows) - start)
+            f.write("".join(rows[start:start + take]))
+            rows_on_page += take
+            start += take
+
+    if f is None: f, pager = _open_page(1)
+    _close_page(f, pager)
+    return paths
+
+def _iter_chunks(df, chunk_size):
+    for start in range(0, len(df), chunk_size):
+        yield df.iloc[start:start + chunk_size]
+
 # --- REPORT GENERATOR 2: Detailed Trades Table ---
-def save_trades_html(trades_df, folder="reports", filename="trades_log.html"):
+def save_trades_html(trades_df, folder="reports", filename="trades_log.html", page_size=1000, chunk_size=10000):
+    """
+    Write the holding-period log as paginated HTML (page_size rows per page) plus trades.csv.
+    Rows are formatted column-wise in chunks and streamed to disk.
+    """
     if not os.path.exists(folder): os.makedirs(folder)
     if trades_df is None or trades_df.empty: return
 
-    df_disp = trades_df.copy()
-    for col in ['entry_date', 'exit_date']:
-        if col in df_disp.columns: df_disp[col] = pd.to_datetime(df_disp[col]).dt.strftime('%Y-%m-%d')
-    
-    col_map = {'entry_date': 'Entry Date', 'exit_date': 'Exit Date', 'entry_price': 'Entry Price', 'exit_price': 'Exit Price', 'shares': 'Shares', 'leverage_mult_at_entry': 'Lev Mult', 'pnl': 'PnL ($)', 'exit_reason': 'Exit Reason'}
-    df_disp = df_disp.rename(columns={k: v for k, v in col_map.items() if k in df_disp.columns})
-    
-    if 'Entry Price' in df_disp.columns: df_disp['Entry Price'] = df_disp['Entry Price'].apply(format_currency)
-    if 'Exit Price' in df_disp.columns: df_disp['Exit Price'] = df_disp['Exit Price'].apply(format_currency)
-    if 'Lev Mult' in df_disp.columns: df_disp['Lev Mult'] = df_disp['Lev Mult'].apply(lambda x: f"{x:.2f}x")
-    if 'Shares' in df_disp.columns: df_disp['Shares'] = df_disp['Shares'].apply(lambda x: f"{x:,.0f}")
-    if 'PnL ($)' in df_disp.columns: df_disp['PnL ($)'] = df_disp['PnL ($)'].apply(color_pnl)
-
-    html_content = f"""<!DOCTYPE html><html lang="en"><head><meta charset="UTF-8"><title>Trade Log</title>{HTML_CSS}</head><body><div class="container"><h1>Holding Periods Log <span style="float:right; font-size: 16px; color: #999; font-weight: normal;">{len(df_disp)} Rounds</span></h1><table>{df_disp.to_html(index=False, escape=False, border=0)}</table><div class="footer">Generated by AI Quantitative Agent</div></div></body></html>"""
-    with open(os.path.join(folder, filename), "w", encoding='utf-8') as f: f.write(html_content)
+    headers = ['Entry Date', 'Exit Date', 'Entry Price', 'Exit Price', 'Shares', 'Lev Mult', 'PnL ($)', 'Exit Reason']
+
+    def _formatted(chunk):
+        pnl = chunk['pnl'].to_numpy(dtype=float)
+        pnl_class = np.where(pnl >= 0, 'pnl-pos', 'pnl-neg')
+        pnl_html = np.where(np.isnan(pnl), "", '<span class="' + pnl_class.astype(object) + '">' + _format_number(pnl, 2, "$") + '</span>')
+        return [
+            pd.to_datetime(chunk['entry_date']).dt.strftime('%Y-%m-%d').to_numpy(dtype=object),
+            pd.to_datetime(chunk['exit_date']).dt.strftime('%Y-%m-%d').to_numpy(dtype=object),
+            _format_number(chunk['entry_price'], 2, "$"),
+            _format_number(chunk['exit_price'], 2, "$"),
+            _format_number(chunk['shares'], 0),
+            np.char.mod("%.2f", chunk['leverage_mult_at_entry'].to_numpy(dtype=float)).astype(object) + "x",
+            pnl_html,
+            chunk['exit_reason'].astype(str).to_numpy(dtype=object),
+        ]
+
+    paths = _write_html_pages(
+        (_formatted(c) for c in _iter_chunks(trades_df, chunk_size)), len(trades_df), headers,
+        folder, filename, title="Trade Log",
+        heading=f"""Holding Periods Log <span style="float:right; font-size: 16px; color: #999; font-weight: normal;">{len(trades_df)} Rounds</span>""",
+        page_size=page_size,
+    )
     
     # Save CSV
     trades_df.to_csv(os.path.join(folder, "trades.csv"), index=False)
-    print(f"Trades Report generated: {os.path.join(folder, filename)}")
+    print(f"Trades Report generated: {paths[0]} ({len(paths)} page(s))")
 
 # --- REPORT GENERATOR 3: Daily Transactions ---
-def save_daily_transactions_html(df_res, folder="reports", filename="daily_transactions.html"):
+def save_daily_transactions_html(df_res, folder="reports", filename="daily_transactions.html", page_size=1000, chunk_size=10000):
+    """
+    Write every rebalancing action as paginated HTML plus a compact CSV ledger
+    (daily_transactions.csv), streaming in chunks.
+    """
     if not os.path.exists(folder): os.makedirs(folder)
     
-    trans_df = df_res.copy()
-    trans_df['Position_Value'] = trans_df['strategy_equity'] * trans_df['leverage']
-    trans_df['Shares'] = trans_df['Position_Value'] / trans_df['Close']
-    trans_df['Delta_Shares'] = trans_df['Shares'].diff().fillna(0)
-    
-    actions = trans_df[abs(trans_df['Delta_Shares']) > 0.1].copy()
-    if actions.empty: return
-
-    display_df = pd.DataFrame()
-    display_df['Date'] = actions.index.strftime('%Y-%m-%d')
-    display_df['Action'] = actions['Delta_Shares'].apply(lambda x: 'BUY' if x > 0 else 'SELL')
-    display_df['Shares'] = abs(actions['Delta_Shares']).apply(lambda x: f"{x:,.2f}")
-    display_df['Price'] = actions['Close'].apply(format_currency)
-    display_df['Value ($)'] = (abs(actions['Delta_Shares']) * actions['Close']).apply(format_currency)
-    display_df['New Leverage'] = actions['leverage'].apply(lambda x: f"{x:.2f}x")
-    
-    def color_action(val):
-        color = '#27ae60' if val == 'BUY' else '#c0392b'
-        return f'<span style="color: {color}; font-weight:bold;">{val}</span>'
-    display_df['Action'] = display_df['Action'].apply(color_action)
-
-    html_content = f"""<!DOCTYPE html><html lang="en"><head><meta charset="UTF-8"><title>Daily Transaction Log</title>{HTML_CSS}</head><body><div class="container"><h1>Daily Transaction Log <span style="float:right; font-size: 16px; color: #999; font-weight: normal;">{len(display_df)} Actions</span></h1><div class="subtitle">Detailed record of daily rebalancing and leverage adjustments.</div><table><thead><tr><th>Date</th><th>Action</th><th>Shares</th><th>Price</th><th>Est. Value</th><th>New Leverage</th></tr></thead><tbody>{display_df.to_html(index=False, escape=False, border=0, header=False)}</tbody></table><div class="footer">Generated by AI Quantitative Agent</div></div></body></html>"""
-    with open(os.path.join(folder, filename), "w", encoding='utf-8') as f: f.write(html_content)
-    print(f"Daily Transactions Report generated: {os.path.join(folder, filename)}")
\ No newline at end of file
+    shares = (df_res['strategy_equity'] * df_res['leverage'] / df_res['Close']).to_numpy(dtype=float)
+    delta_shares = np.diff(shares, prepend=shares[:1])
+    action_rows = np.flatnonzero(np.abs(delta_shares) > 0.1)
+    if len(action_rows) == 0: return
+
+    actions = pd.DataFrame({
+        'Date': pd.to_datetime(df_res.index[action_rows]),
+        'Action': np.where(delta_shares[action_rows] > 0, 'BUY', 'SELL'),
+        'Shares': np.abs(delta_shares[action_rows]),
+        'Price': df_res['Close'].to_numpy(dtype=float)[action_rows],
+        'Leverage': df_res['leverage'].to_numpy(dtype=float)[action_rows],
+    })
+    actions['Value'] = actions['Shares'] * actions['Price']
+
+    ledger_path = os.path.join(folder, os.path.splitext(filename)[0] + ".csv")
+    headers = ['Date', 'Action', 'Shares', 'Price', 'Est. Value', 'New Leverage']
+
+    def _formatted(chunk):
+        # Ledger is appended chunk by chunk alongside the HTML pages
+        chunk.to_csv(ledger_path, mode='a', header=chunk.index[0] == 0, index=False, date_format='%Y-%m-%d')
+        color = np.where(chunk['Action'] == 'BUY', '#27ae60', '#c0392b').astype(object)
+        return [
+            chunk['Date'].dt.strftime('%Y-%m-%d').to_numpy(dtype=object),
+            '<span style="color: ' + color + '; font-weight:bold;">' + chunk['Action'].to_numpy(dtype=object) + '</span>',
+            _format_number(chunk['Shares'], 2),
+            _format_number(chunk['Price'], 2, "$"),
+            _format_number(chunk['Value'], 2, "$"),
+            np.char.mod("%.2f", chunk['Leverage'].to_numpy(dtype=float)).astype(object) + "x",
+        ]
+
+    if os.path.exists(ledger_path): os.remove(ledger_path)
+    paths = _write_html_pages(
+        (_formatted(c) for c in _iter_chunks(actions, chunk_size)), len(actions), headers,
+        folder, filename, title="Daily Transaction Log",
+        heading=f"""Daily Transaction Log <span style="float:right; font-size: 16px; color: #999; font-weight: normal;">{len(actions)} Actions</span>""",
+        subtitle="Detailed record of daily rebalancing and leverage adjustments.",
+        page_size=page_size,
+    )
+    print(f"Daily Transactions Report generated: {paths[0]} ({len(paths)} page(s))")
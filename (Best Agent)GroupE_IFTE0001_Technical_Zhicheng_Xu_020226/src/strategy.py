@@ -4,6 +4,12 @@ import pandas as pd
 from indicators import calculate_rolling_volatility, calculate_sma, calculate_rsi
 from config import VOL_WINDOW, TARGET_VOL, MAX_LEVERAGE, SMA_WINDOW, RSI_WINDOW, RSI_HIGH, REBALANCE_THRESHOLD
 
+# Optional JIT backend for the rebalance buffer (falls back to NumPy if not installed)
+try:
+    import numba
+except ImportError:
+    numba = None
+
 # --- Configuration: Exit Buffer Threshold ---
 # Loosened to 10% (0.10) to prioritize CAGR.
 # We only liquidate to Cash if price drops > 10% below the SMA.
@@ -11,18 +17,103 @@ from config import VOL_WINDOW, TARGET_VOL, MAX_LEVERAGE, SMA_WINDOW, RSI_WINDOW,
 # and only exits during catastrophic trend collapses (e.g., Dot-com, GFC).
 EXIT_BUFFER = 0.10 
 
+def _rebalance_buffer_numpy(targets, thresholds):
+    """
+    NumPy fallback: steps through time once, updating every column per step.
+    """
+    n_rows, n_cols = targets.shape
+    executed = np.zeros((n_rows, n_cols))
+    current = np.zeros(n_cols)
+    for t in range(n_rows):
+        target = targets[t]
+        valid = ~np.isnan(target)
+        # Hard exit, new long entry, or move larger than the buffer -> trade to target
+        # (same cases, in the same order, as _rebalance_buffer_loop)
+        trade = valid & ((target == 0.0) | ((current == 0.0) & (target > 0.0)) | (np.abs(target - current) > thresholds))
+        current = np.where(trade, target, current)
+        # Missing target (indicator warm-up) -> flat for this bar, state is kept
+        executed[t] = np.where(valid, current, 0.0)
+    return executed
+
+def _rebalance_buffer_loop(targets, thresholds):
+    """
+    Scalar kernel (compiled with numba when available).
+    """
+    n_rows, n_cols = targets.shape
+    executed = np.zeros((n_rows, n_cols))
+    for j in range(n_cols):
+        current = 0.0
+        threshold = thresholds[j]
+        for t in range(n_rows):
+            target = targets[t, j]
+            if np.isnan(target):
+                executed[t, j] = 0.0
+                continue
+            # Case A: Hard Exit (0.0) -> Execute immediately
+            if target == 0.0:
+                current = 0.0
+            # Case B: New Entry (0.0 to >0.0) -> Execute immediately
+            elif current == 0.0 and target > 0.0:
+                current = target
+            # Case C: Standard Rebalancing -> Only trade if change > threshold
+            elif abs(target - current) > threshold:
+                current = target
+            executed[t, j] = current
+    return executed
+
+if numba is not None:
+    _rebalance_buffer_jit = numba.njit(cache=True)(_rebalance_buffer_loop)
+else:
+    _rebalance_buffer_jit = None
+
+def rebalance_buffer(targets, threshold=REBALANCE_THRESHOLD, use_numba=None):
+    """
+    Apply the rebalance buffer (hysteresis) to target leverage.
+    targets: 1-D series or 2-D (time x ticker / time x parameter-set) array.
+    threshold: scalar, or one value per column.
+    use_numba: None = use numba if installed, False = force the NumPy path.
+    Returns: executed leverage with the same shape as targets (before the T+1 lag).
+    """
+    values = np.asarray(targets, dtype=float)
+    is_1d = values.ndim == 1
+    if is_1d:
+        values = values[:, None]
+
+    thresholds = np.broadcast_to(np.asarray(threshold, dtype=float), (values.shape[1],))
+
+    if use_numba is None:
+        use_numba = _rebalance_buffer_jit is not None
+    if use_numba:
+        if _rebalance_buffer_jit is None:
+            raise ImportError("numba is not installed; use use_numba=False for the NumPy path.")
+        executed = _rebalance_buffer_jit(np.ascontiguousarray(values), np.ascontiguousarray(thresholds))
+    else:
+        executed = _rebalance_buffer_numpy(values, thresholds)
+
+    return executed[:, 0] if is_1d else executed
+
 class VolatilityStrategy:
-    def __init__(self, df):
+    def __init__(self, df, vol_window=VOL_WINDOW, target_vol=TARGET_VOL, max_leverage=MAX_LEVERAGE,
+                 sma_window=SMA_WINDOW, rsi_window=RSI_WINDOW, rsi_high=RSI_HIGH,
+                 rebalance_threshold=REBALANCE_THRESHOLD):
         """
         Initialize strategy with data.
+        Parameters default to config.py; pass overrides to test other configurations.
         """
         self.df = df.copy()
+        self.vol_window = vol_window
+        self.target_vol = target_vol
+        self.max_leverage = max_leverage
+        self.sma_window = sma_window
+        self.rsi_window = rsi_window
+        self.rsi_high = rsi_high
+        self.rebalance_threshold = rebalance_threshold
 
     def calculate_indicators(self):
         """Calculate technical indicators (Vol, SMA, RSI)."""
-        self.df['rolling_vol'] = calculate_rolling_volatility(self.df['returns'], window=VOL_WINDOW)
-        self.df['sma'] = calculate_sma(self.df['Close'], window=SMA_WINDOW)
-        self.df['rsi'] = calculate_rsi(self.df['Close'], window=RSI_WINDOW)
+        self.df['rolling_vol'] = calculate_rolling_volatility(self.df['returns'], window=self.vol_window)
+        self.df['sma'] = calculate_sma(self.df['Close'], window=self.sma_window)
+        self.df['rsi'] = calculate_rsi(self.df['Close'], window=self.rsi_window)
         return self.df
 
     def generate_signals(self):
@@ -35,10 +126,10 @@ class VolatilityStrategy:
         # 1. Base Leverage Calculation (Volatility Targeting)
         # Calculates how much leverage to take based on current market volatility
         safe_vol = self.df['rolling_vol'].replace(0, np.nan)
-        self.df['raw_leverage'] = TARGET_VOL / safe_vol
+        self.df['raw_leverage'] = self.target_vol / safe_vol
         
         # 2. Dynamic Risk Caps (Stepped Logic)
-        self.df['dynamic_cap'] = MAX_LEVERAGE
+        self.df['dynamic_cap'] = self.max_leverage
         
         # --- [Core Logic Update] Extreme Bear Filters ---
         
@@ -58,34 +149,14 @@ class VolatilityStrategy:
         
         # Phase 3: Momentum Filter (Overbought Protection)
         # Action: Trim exposure if RSI is too high.
-        rsi_mask = self.df['rsi'] > RSI_HIGH
+        rsi_mask = self.df['rsi'] > self.rsi_high
         self.df.loc[rsi_mask, 'dynamic_cap'] = 0.8
 
         # 3. Determine Final Target Leverage
         target_series = self.df[['raw_leverage', 'dynamic_cap']].min(axis=1).clip(lower=0.0)
         
         # 4. Rebalance Buffer (Reduce Transaction Costs)
-        executed_leverage = []
-        current_lev = 0.0
-        
-        for target in target_series.values:
-            if np.isnan(target):
-                executed_leverage.append(0.0)
-                continue
-            
-            # Case A: Hard Exit (0.0) -> Execute immediately
-            if target == 0.0:
-                current_lev = 0.0
-            # Case B: New Entry (0.0 to >0.0) -> Execute immediately
-            elif current_lev == 0.0 and target > 0.0:
-                current_lev = target
-            # Case C: Standard Rebalancing -> Only trade if change > threshold
-            elif abs(target - current_lev) > REBALANCE_THRESHOLD:
-                current_lev = target
-            
-            executed_leverage.append(current_lev)
-
-        self.df['leverage'] = executed_leverage
+        self.df['leverage'] = rebalance_buffer(target_series.values, self.rebalance_threshold)
         
         # 5. Signal Lag (Execute on T+1 open/close)
         self.df['leverage'] = self.df['leverage'].shift(1).fillna(0)
@@ -0,0 +1,124 @@
+# src/sweep.py
+import itertools
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+from indicators import calculate_rolling_volatility, calculate_sma, calculate_rsi
+from backtest import PARAM_NAMES, resolve_params, _run_strategy, calculate_metrics
+
+# Worker-side state (attached once per process by _init_worker)
+_WORKER = {}
+
+def expand_grid(param_grid):
+    """
+    Expand a parameter grid into a list of parameter dicts.
+    param_grid: dict of config name -> list of values (e.g. {'TARGET_VOL': [0.2, 0.25]}),
+                or an explicit list of dicts.
+    """
+    if isinstance(param_grid, dict):
+        names = list(param_grid)
+        values = [v if isinstance(v, (list, tuple, np.ndarray)) else [v] for v in param_grid.values()]
+        combos = [dict(zip(names, combo)) for combo in itertools.product(*values)]
+    else:
+        combos = [dict(p) for p in param_grid]
+    return [resolve_params(p) for p in combos]
+
+def _build_indicator_table(df, combos):
+    """
+    Compute every indicator once per distinct window used in the grid.
+    Returns: 2-D array (time x columns) and a {(name, window): column} lookup.
+    """
+    columns = [df['Close'].to_numpy(dtype=float), df['returns'].to_numpy(dtype=float)]
+    lookup = {('Close', None): 0, ('returns', None): 1}
+
+    for window in sorted({p['VOL_WINDOW'] for p in combos}):
+        lookup[('rolling_vol', window)] = len(columns)
+        columns.append(calculate_rolling_volatility(df['returns'], window=window).to_numpy(dtype=float))
+    for window in sorted({p['SMA_WINDOW'] for p in combos}):
+        lookup[('sma', window)] = len(columns)
+        columns.append(calculate_sma(df['Close'], window=window).to_numpy(dtype=float))
+    for window in sorted({p['RSI_WINDOW'] for p in combos}):
+        lookup[('rsi', window)] = len(columns)
+        columns.append(calculate_rsi(df['Close'], window=window).to_numpy(dtype=float))
+
+    return np.column_stack(columns), lookup
+
+def _to_shared(array):
+    """Helper: Copy an array into a new shared memory block."""
+    shm = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+    view = np.ndarray(array.shape, dtype=array.dtype, buffer=shm.buf)
+    view[:] = array
+    return shm
+
+def _init_worker(table_name, table_shape, dates_name, n_dates, lookup):
+    """
+    Process pool initializer: attach to the shared price/indicator table.
+    """
+    table_shm = shared_memory.SharedMemory(name=table_name)
+    dates_shm = shared_memory.SharedMemory(name=dates_name)
+    _WORKER['shm'] = (table_shm, dates_shm)  # keep references alive
+    _WORKER['table'] = np.ndarray(table_shape, dtype=np.float64, buffer=table_shm.buf)
+    _WORKER['index'] = pd.DatetimeIndex(np.ndarray((n_dates,), dtype='datetime64[ns]', buffer=dates_shm.buf))
+    _WORKER['lookup'] = lookup
+
+def _run_one(params):
+    """
+    Run one configuration against the shared table and return its metrics row.
+    """
+    table, lookup = _WORKER['table'], _WORKER['lookup']
+    df = pd.DataFrame({
+        'Close': table[:, lookup[('Close', None)]],
+        'returns': table[:, lookup[('returns', None)]],
+        'rolling_vol': table[:, lookup[('rolling_vol', params['VOL_WINDOW'])]],
+        'sma': table[:, lookup[('sma', params['SMA_WINDOW'])]],
+        'rsi': table[:, lookup[('rsi', params['RSI_WINDOW'])]],
+    }, index=_WORKER['index'])
+
+    df = _run_strategy(df, params)
+    row = dict(params)
+    row.update(calculate_metrics(df))
+    row['turnover'] = df['leverage'].diff().abs().sum()
+    return row
+
+def run_sweep(df, param_grid, n_workers=None, chunksize=None):
+    """
+    Run the backtest over a parameter grid in a process pool.
+    Prices and indicators (one column per distinct window) are computed once
+    in the parent and shared with workers through shared memory.
+    Returns: tidy DataFrame, one row per configuration (parameters + metrics).
+    """
+    combos = expand_grid(param_grid)
+    if not combos:
+        return pd.DataFrame(columns=PARAM_NAMES)
+
+    table, lookup = _build_indicator_table(df, combos)
+    dates = pd.DatetimeIndex(pd.to_datetime(df.index)).as_unit('ns').to_numpy()
+
+    table_shm = _to_shared(np.ascontiguousarray(table, dtype=np.float64))
+    dates_shm = _to_shared(dates)
+    initargs = (table_shm.name, table.shape, dates_shm.name, len(dates), lookup)
+
+    if n_workers is None:
+        n_workers = min(len(combos), os.cpu_count() or 1)
+
+    try:
+        if n_workers <= 1:
+            # In-process path (no pool overhead for small grids)
+            _init_worker(*initargs)
+            rows = [_run_one(p) for p in combos]
+            _WORKER.clear()
+        else:
+            if chunksize is None:
+                chunksize = max(1, len(combos) // (n_workers * 4))
+            with ProcessPoolExecutor(max_workers=n_workers, initializer=_init_worker, initargs=initargs) as pool:
+                rows = list(pool.map(_run_one, combos, chunksize=chunksize))
+    finally:
+        table_shm.close()
+        table_shm.unlink()
+        dates_shm.close()
+        dates_shm.unlink()
+
+    return pd.DataFrame(rows)
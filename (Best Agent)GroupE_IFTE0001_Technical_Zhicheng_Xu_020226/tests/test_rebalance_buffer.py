@@ -0,0 +1,30 @@
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from strategy import rebalance_buffer, _rebalance_buffer_jit, _rebalance_buffer_loop, _rebalance_buffer_numpy
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_backends_agree_on_signed_targets(seed):
+    rng = np.random.default_rng(seed)
+    targets = rng.normal(0.0, 1.0, (300, 8))
+    targets[rng.random(targets.shape) < 0.15] = 0.0     # hard exits
+    targets[rng.random(targets.shape) < 0.05] = np.nan  # warm-up / missing
+    thresholds = rng.uniform(0.0, 0.5, targets.shape[1])
+
+    expected = _rebalance_buffer_loop(targets, thresholds)  # pure-Python reference
+    np.testing.assert_array_equal(rebalance_buffer(targets, thresholds, use_numba=False), expected)
+    np.testing.assert_array_equal(_rebalance_buffer_numpy(targets, thresholds), expected)
+    if _rebalance_buffer_jit is not None:
+        np.testing.assert_array_equal(rebalance_buffer(targets, thresholds, use_numba=True), expected)
+
+
+def test_negative_target_from_flat_respects_buffer():
+    # From flat, only a long target is a "new entry"; a small short target stays inside the buffer
+    executed = rebalance_buffer(np.array([0.0, -0.05, -0.5]), 0.1, use_numba=False)
+    np.testing.assert_array_equal(executed, [0.0, 0.0, -0.5])
@@ -4,11 +4,11 @@ from __future__ import annotations
 import os
 from datetime import date
 import pandas as pd
-import matplotlib.pyplot as plt
 
 from src.data import load_price_data
 from src.strategy import compute_complex_agent_overlay
 from src.metrics import cagr, sharpe_ratio, max_drawdown, total_return, hit_rate_on_rebalances
+from src.charts import render_report_charts
 
 from src.report import (
     vol_overlay_signal_and_action,
@@ -63,62 +63,6 @@ def ensure_dir(path: str) -> None:
     os.makedirs(path, exist_ok=True)
 
 
-# --------------------------
-# Charts (4 key figures)
-# --------------------------
-def save_equity_chart(df: pd.DataFrame, out_path: str, ticker: str) -> None:
-    plt.figure(figsize=(10, 4))
-    plt.plot(df.index, df["bh_equity"], label="Buy & Hold")
-    plt.plot(df.index, df["strategy_equity"], label="Strategy (net costs)")
-    plt.title(f"{ticker}: Equity Curve (Normalized)")
-    plt.xlabel("Date")
-    plt.ylabel("Equity")
-    plt.legend()
-    plt.tight_layout()
-    plt.savefig(out_path, dpi=150)
-    plt.close()
-
-
-def save_rolling_vol_chart(df: pd.DataFrame, target_vol: float, out_path: str, ticker: str) -> None:
-    plt.figure(figsize=(10, 4))
-    # Use df["vol"] if present (we set it in strategy for compatibility)
-    plt.plot(df.index, df["vol"], label="Rolling Vol (ann.)")
-    plt.axhline(y=float(target_vol), linestyle="--", label="Reference Target Vol")
-    plt.title(f"{ticker}: Rolling Volatility (Annualized)")
-    plt.xlabel("Date")
-    plt.ylabel("Vol")
-    plt.legend()
-    plt.tight_layout()
-    plt.savefig(out_path, dpi=150)
-    plt.close()
-
-
-def save_exposure_chart(df: pd.DataFrame, out_path: str, ticker: str) -> None:
-    plt.figure(figsize=(10, 4))
-    plt.plot(df.index, df["exposure"], label="Executed Exposure (t-1)")
-    plt.title(f"{ticker}: Exposure (Complex Overlay)")
-    plt.xlabel("Date")
-    plt.ylabel("Exposure")
-    plt.ylim(0, 1.05)
-    plt.legend()
-    plt.tight_layout()
-    plt.savefig(out_path, dpi=150)
-    plt.close()
-
-
-def save_drawdown_comparison(df: pd.DataFrame, out_path: str, ticker: str) -> None:
-    plt.figure(figsize=(10, 4))
-    plt.plot(df.index, df["bh_dd"], label="Buy & Hold DD", alpha=0.85)
-    plt.plot(df.index, df["strategy_dd"], label="Strategy DD", alpha=0.95)
-    plt.title(f"{ticker}: Drawdown Comparison")
-    plt.xlabel("Date")
-    plt.ylabel("Drawdown")
-    plt.legend()
-    plt.tight_layout()
-    plt.savefig(out_path, dpi=150)
-    plt.close()
-
-
 def main() -> None:
     ticker = PARAMS["ticker"]
     as_of_today = str(date.today())
@@ -180,28 +124,15 @@ def main() -> None:
     reports_dir = "reports"
     ensure_dir(reports_dir)
 
-    equity_path = os.path.join(reports_dir, "equity_curve.png")
-    vol_path = os.path.join(reports_dir, "rolling_vol.png")
-    exposure_path = os.path.join(reports_dir, "exposure.png")
-    drawdown_path = os.path.join(reports_dir, "drawdown_comparison.png")
-
-    save_equity_chart(df, equity_path, ticker)
-    save_rolling_vol_chart(df, PARAMS["target_vol"], vol_path, ticker)
-    save_exposure_chart(df, exposure_path, ticker)
-    save_drawdown_comparison(df, drawdown_path, ticker)
+    # Rendered in parallel; figures with unchanged inputs are reused from disk
+    rendered = render_report_charts(df, ticker, PARAMS["target_vol"], out_dir=reports_dir)
 
     print("Charts saved:")
-    print(f"- {equity_path}")
-    print(f"- {vol_path}")
-    print(f"- {exposure_path}")
-    print(f"- {drawdown_path}")
-
-    charts = {
-        "equity": equity_path,
-        "vol": vol_path,
-        "exposure": exposure_path,
-        "drawdown": drawdown_path,
-    }
+    for item in rendered.values():
+        print(f"- {item['path']}" + (" (unchanged)" if item["cached"] else ""))
+
+    # PNG bytes are embedded directly, no re-read from disk
+    charts = {name: item["png"] for name, item in rendered.items()}
 
     # 6) Signal/Action (keeps your existing report style)
     # Note: This is based on vol regime labeling; complex agent uses other brakes too.
@@ -0,0 +1,184 @@
+# src/charts.py
+from __future__ import annotations
+
+import hashlib
+import io
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+# Bump when a chart layout changes so cached PNGs are re-rendered
+CHART_VERSION = "1"
+DPI = 150
+
+# figure name -> (file name, columns it plots)
+CHART_SPECS = {
+    "equity": ("equity_curve.png", ("bh_equity", "strategy_equity")),
+    "vol": ("rolling_vol.png", ("vol",)),
+    "exposure": ("exposure.png", ("exposure",)),
+    "drawdown": ("drawdown_comparison.png", ("bh_dd", "strategy_dd")),
+}
+
+
+# ------------------------------------------------------------
+# Figures (object-oriented Agg API: no global pyplot state)
+# ------------------------------------------------------------
+def _new_axes() -> tuple[Figure, object]:
+    fig = Figure(figsize=(10, 4))
+    FigureCanvasAgg(fig)
+    return fig, fig.add_subplot(111)
+
+
+def _equity_figure(dates, cols: dict, ticker: str, target_vol: float) -> Figure:
+    fig, ax = _new_axes()
+    ax.plot(dates, cols["bh_equity"], label="Buy & Hold")
+    ax.plot(dates, cols["strategy_equity"], label="Strategy (net costs)")
+    ax.set_title(f"{ticker}: Equity Curve (Normalized)")
+    ax.set_xlabel("Date")
+    ax.set_ylabel("Equity")
+    ax.legend()
+    return fig
+
+
+def _rolling_vol_figure(dates, cols: dict, ticker: str, target_vol: float) -> Figure:
+    fig, ax = _new_axes()
+    ax.plot(dates, cols["vol"], label="Rolling Vol (ann.)")
+    ax.axhline(y=float(target_vol), linestyle="--", label="Reference Target Vol")
+    ax.set_title(f"{ticker}: Rolling Volatility (Annualized)")
+    ax.set_xlabel("Date")
+    ax.set_ylabel("Vol")
+    ax.legend()
+    return fig
+
+
+def _exposure_figure(dates, cols: dict, ticker: str, target_vol: float) -> Figure:
+    fig, ax = _new_axes()
+    ax.plot(dates, cols["exposure"], label="Executed Exposure (t-1)")
+    ax.set_title(f"{ticker}: Exposure (Complex Overlay)")
+    ax.set_xlabel("Date")
+    ax.set_ylabel("Exposure")
+    ax.set_ylim(0, 1.05)
+    ax.legend()
+    return fig
+
+
+def _drawdown_figure(dates, cols: dict, ticker: str, target_vol: float) -> Figure:
+    fig, ax = _new_axes()
+    ax.plot(dates, cols["bh_dd"], label="Buy & Hold DD", alpha=0.85)
+    ax.plot(dates, cols["strategy_dd"], label="Strategy DD", alpha=0.95)
+    ax.set_title(f"{ticker}: Drawdown Comparison")
+    ax.set_xlabel("Date")
+    ax.set_ylabel("Drawdown")
+    ax.legend()
+    return fig
+
+
+_FIGURES = {
+    "equity": _equity_figure,
+    "vol": _rolling_vol_figure,
+    "exposure": _exposure_figure,
+    "drawdown": _drawdown_figure,
+}
+
+
+def _render_png(name: str, dates: np.ndarray, cols: dict, ticker: str, target_vol: float) -> bytes:
+    """Worker task: draw one figure and return the encoded PNG."""
+    fig = _FIGURES[name](dates, cols, ticker, target_vol)
+    fig.tight_layout()
+    buf = io.BytesIO()
+    fig.savefig(buf, format="png", dpi=DPI)
+    return buf.getvalue()
+
+
+# ------------------------------------------------------------
+# Change detection
+# ------------------------------------------------------------
+def _chart_hash(name: str, dates: np.ndarray, cols: dict, ticker: str, target_vol: float) -> str:
+    h = hashlib.sha256()
+    h.update(f"{CHART_VERSION}|{DPI}|{name}|{ticker}".encode())
+    if name == "vol":
+        h.update(repr(float(target_vol)).encode())
+    h.update(dates.tobytes())
+    for col, values in cols.items():
+        h.update(col.encode())
+        h.update(values.tobytes())
+    return h.hexdigest()
+
+
+def _read_cached(png_path: str, chart_hash: str) -> bytes | None:
+    hash_path = png_path + ".hash"
+    if not (os.path.exists(png_path) and os.path.exists(hash_path)):
+        return None
+    with open(hash_path, "r", encoding="utf-8") as f:
+        if f.read().strip() != chart_hash:
+            return None
+    with open(png_path, "rb") as f:
+        return f.read()
+
+
+def _write_png(png_path: str, png: bytes, chart_hash: str) -> None:
+    with open(png_path, "wb") as f:
+        f.write(png)
+    with open(png_path + ".hash", "w", encoding="utf-8") as f:
+        f.write(chart_hash)
+
+
+# ------------------------------------------------------------
+# Pipeline
+# ------------------------------------------------------------
+def render_report_charts(
+    df: pd.DataFrame,
+    ticker: str,
+    target_vol: float,
+    out_dir: str = "reports",
+    n_workers: int | None = None,
+    use_cache: bool = True,
+) -> dict[str, dict]:
+    """
+    Render the four report figures (equity, rolling vol, exposure, drawdown).
+
+    Figures whose plotted columns are unchanged since the last run (same hash in
+    `<png>.hash`) are not redrawn; the others are drawn concurrently in worker
+    processes with the Agg backend. Each worker receives only the arrays it plots.
+
+    Returns: {name: {"path": png path, "png": encoded bytes, "cached": bool}}.
+    The bytes can be passed straight to build_trade_note_html_vol_overlay.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    dates = pd.DatetimeIndex(df.index).to_numpy(dtype="datetime64[ns]")
+
+    results: dict[str, dict] = {}
+    jobs = {}
+    for name, (filename, columns) in CHART_SPECS.items():
+        cols = {c: np.ascontiguousarray(df[c].to_numpy(dtype=float)) for c in columns}
+        path = os.path.join(out_dir, filename)
+        chart_hash = _chart_hash(name, dates, cols, ticker, target_vol)
+        png = _read_cached(path, chart_hash) if use_cache else None
+        if png is not None:
+            results[name] = {"path": path, "png": png, "cached": True}
+        else:
+            jobs[name] = (path, chart_hash, cols)
+
+    if n_workers is None:
+        n_workers = min(len(jobs), os.cpu_count() or 1)
+
+    if n_workers <= 1 or len(jobs) <= 1:
+        rendered = {name: _render_png(name, dates, cols, ticker, target_vol) for name, (_, _, cols) in jobs.items()}
+    else:
+        with ProcessPoolExecutor(max_workers=n_workers) as pool:
+            futures = {
+                name: pool.submit(_render_png, name, dates, cols, ticker, target_vol)
+                for name, (_, _, cols) in jobs.items()
+            }
+            rendered = {name: fut.result() for name, fut in futures.items()}
+
+    for name, png in rendered.items():
+        path, chart_hash, _ = jobs[name]
+        _write_png(path, png, chart_hash)
+        results[name] = {"path": path, "png": png, "cached": False}
+
+    return {name: results[name] for name in CHART_SPECS}
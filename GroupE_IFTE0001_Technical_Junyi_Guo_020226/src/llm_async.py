@@ -0,0 +1,160 @@
+# src/llm_async.py
+from __future__ import annotations
+
+import asyncio
+import os
+import random
+import time
+
+from src.report import LLM_MODEL, LLM_TEMPERATURE, llm_messages
+
+RETRYABLE_STATUS = {408, 409, 429, 500, 502, 503, 504}
+
+
+# ------------------------------------------------------------
+# Rate limiting
+# ------------------------------------------------------------
+class TokenBucket:
+    """
+    Async token bucket: refills at `rate` tokens per second up to `capacity`.
+    acquire() waits until a token is available, so bursts are capped at `capacity`
+    and the long-run request rate at `rate`.
+    """
+
+    def __init__(self, rate: float, capacity: float | None = None):
+        if rate <= 0:
+            raise ValueError("rate must be > 0")
+        self.rate = float(rate)
+        self.capacity = float(capacity) if capacity is not None else max(1.0, self.rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self, tokens: float = 1.0) -> None:
+        async with self._lock:  # FIFO: waiters are served in arrival order
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= tokens:
+                    self.tokens -= tokens
+                    return
+                await asyncio.sleep((tokens - self.tokens) / self.rate)
+
+
+# ------------------------------------------------------------
+# Retries
+# ------------------------------------------------------------
+def _retry_after(exc: Exception) -> float | None:
+    """Seconds from a Retry-After header on an API error, if any."""
+    response = getattr(exc, "response", None)
+    headers = getattr(response, "headers", None)
+    if not headers:
+        return None
+    try:
+        return max(0.0, float(headers.get("retry-after")))
+    except (TypeError, ValueError):
+        return None
+
+
+def _is_retryable(exc: Exception) -> bool:
+    import openai
+
+    if isinstance(exc, (openai.APIConnectionError, asyncio.TimeoutError)):  # includes APITimeoutError
+        return True
+    if isinstance(exc, openai.APIStatusError):
+        return exc.status_code in RETRYABLE_STATUS
+    return False
+
+
+async def _complete_with_retries(
+    client,
+    prompt: str,
+    bucket: TokenBucket,
+    semaphore: asyncio.Semaphore,
+    model: str,
+    max_retries: int,
+    backoff_base: float,
+    backoff_max: float,
+) -> str | None:
+    attempt = 0
+    while True:
+        try:
+            # Take the rate token first: waiting for it must not hold a concurrency slot
+            await bucket.acquire()
+            async with semaphore:
+                resp = await client.chat.completions.create(
+                    model=model,
+                    messages=llm_messages(prompt),
+                    temperature=LLM_TEMPERATURE,
+                )
+            return resp.choices[0].message.content
+        except Exception as e:
+            if attempt >= max_retries or not _is_retryable(e):
+                print(f"AI call failed. Reason: {e}")
+                return None
+            # Exponential backoff with full jitter; a server Retry-After wins if longer
+            delay = random.uniform(0, min(backoff_max, backoff_base * 2 ** attempt))
+            delay = max(delay, _retry_after(e) or 0.0)
+            attempt += 1
+            await asyncio.sleep(delay)
+
+
+# ------------------------------------------------------------
+# Fan-out
+# ------------------------------------------------------------
+async def generate_llm_commentary_many_async(
+    prompts: dict[str, str],
+    max_concurrency: int = 8,
+    requests_per_second: float = 2.0,
+    burst: int | None = None,
+    max_retries: int = 4,
+    backoff_base: float = 1.0,
+    backoff_max: float = 30.0,
+    model: str = LLM_MODEL,
+    base_url: str | None = None,
+    timeout: float = 60.0,
+    client=None,
+) -> dict[str, str | None]:
+    """
+    Async counterpart of try_generate_llm_commentary for many prompts
+    (e.g. {ticker: build_vol_overlay_llm_prompt(...)}).
+
+    Requests are issued concurrently, at most `max_concurrency` in flight, admitted by a
+    token bucket (`requests_per_second`, bursts up to `burst`). Connection errors,
+    timeouts, 429 and 5xx responses are retried up to `max_retries` times with
+    exponential backoff (honouring Retry-After). Failed prompts map to None.
+
+    `base_url` (or OPENAI_BASE_URL) can point at a local server such as src/llm_stub.py.
+    A client created here is closed before returning; a passed-in `client` is left open.
+    """
+    if not prompts:
+        return {}
+    owns_client = client is None
+    if owns_client:
+        api_key = os.getenv("OPENAI_API_KEY", "").strip()
+        if not api_key:
+            print("Info: OPENAI_API_KEY not found. Skipping AI commentary.")
+            return {key: None for key in prompts}
+        from openai import AsyncOpenAI
+
+        # Retries are handled here (shared backoff + rate limit), not by the SDK
+        client = AsyncOpenAI(api_key=api_key, base_url=base_url, timeout=timeout, max_retries=0)
+
+    bucket = TokenBucket(requests_per_second, burst)
+    semaphore = asyncio.Semaphore(max_concurrency)
+    keys = list(prompts)
+    try:
+        texts = await asyncio.gather(*[
+            _complete_with_retries(client, prompts[k], bucket, semaphore, model, max_retries, backoff_base, backoff_max)
+            for k in keys
+        ])
+    finally:
+        if owns_client:
+            await client.close()  # release the HTTP connection pool
+    return dict(zip(keys, texts))
+
+
+def generate_llm_commentary_many(prompts: dict[str, str], **kwargs) -> dict[str, str | None]:
+    """Blocking wrapper around generate_llm_commentary_many_async (for scripts)."""
+    return asyncio.run(generate_llm_commentary_many_async(prompts, **kwargs))
@@ -0,0 +1,126 @@
+# src/llm_stub.py
+"""
+Local stand-in for the OpenAI chat completions endpoint, for exercising the async
+commentary fan-out (concurrency, rate limiting, retries) without network or API costs.
+
+    python -m src.llm_stub --port 8765 --latency 1.0 --fail-rate 0.2
+    OPENAI_API_KEY=stub OPENAI_BASE_URL=http://127.0.0.1:8765/v1 python ...
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    server: "StubLLMServer"
+
+    def log_message(self, format, *args) -> None:  # keep stdout quiet
+        pass
+
+    def _send_json(self, status: int, payload: dict, headers: dict | None = None) -> None:
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for k, v in (headers or {}).items():
+            self.send_header(k, v)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self) -> None:
+        length = int(self.headers.get("Content-Length", 0))
+        request = json.loads(self.rfile.read(length) or b"{}")
+        if not self.path.rstrip("/").endswith("/chat/completions"):
+            self._send_json(404, {"error": {"message": f"Unknown path {self.path}"}})
+            return
+
+        srv = self.server
+        with srv.lock:
+            srv.requests += 1
+            srv.in_flight += 1
+            srv.max_in_flight = max(srv.max_in_flight, srv.in_flight)
+            fail = srv.rng.random() < srv.fail_rate
+        try:
+            time.sleep(srv.latency)
+            if fail:
+                with srv.lock:
+                    srv.failures += 1
+                self._send_json(429, {"error": {"message": "Rate limit (stub)", "type": "rate_limit"}},
+                                headers={"Retry-After": str(srv.retry_after)})
+                return
+
+            prompt = request.get("messages", [{}])[-1].get("content", "")
+            first_line = prompt.strip().splitlines()[0] if prompt.strip() else ""
+            text = f"- Stub commentary for: {first_line[:80]}"
+            self._send_json(200, {
+                "id": "chatcmpl-stub",
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": request.get("model", "stub"),
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": text}, "finish_reason": "stop"}],
+                "usage": {"prompt_tokens": len(prompt.split()), "completion_tokens": len(text.split()),
+                          "total_tokens": len(prompt.split()) + len(text.split())},
+            })
+        finally:
+            with srv.lock:
+                srv.in_flight -= 1
+
+
+class StubLLMServer(ThreadingHTTPServer):
+    """
+    Threaded HTTP server answering POST /v1/chat/completions after `latency` seconds;
+    a `fail_rate` fraction of calls get a 429 with Retry-After. Counters (requests,
+    failures, max_in_flight) are kept for checking client behaviour.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, latency: float = 0.5,
+                 fail_rate: float = 0.0, retry_after: float = 0.0, seed: int | None = 0):
+        super().__init__((host, port), _StubHandler)
+        self.latency = float(latency)
+        self.fail_rate = float(fail_rate)
+        self.retry_after = float(retry_after)
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.failures = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def start_background(self) -> "StubLLMServer":
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Local OpenAI-compatible stub for LLM commentary tests")
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8765)
+    ap.add_argument("--latency", type=float, default=0.5, help="seconds per response")
+    ap.add_argument("--fail-rate", type=float, default=0.0, help="fraction of calls answered with 429")
+    ap.add_argument("--retry-after", type=float, default=0.0, help="Retry-After seconds sent with 429")
+    args = ap.parse_args()
+
+    server = StubLLMServer(args.host, args.port, args.latency, args.fail_rate, args.retry_after)
+    print(f"Stub LLM server on {server.base_url} (Ctrl+C to stop)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -89,3 +89,173 @@ def hit_rate_on_rebalances(df: pd.DataFrame) -> float:
         return np.nan
 
     return float((next_ret > 0).mean())
+
+
+# ------------------------------------------------------------
+# Vectorized versions: one value per column of a (time x columns) matrix
+# ------------------------------------------------------------
+def total_return_matrix(equity: np.ndarray) -> np.ndarray:
+    equity = np.asarray(equity, dtype=float)
+    if len(equity) < 2:
+        return np.full(equity.shape[1:], np.nan)
+    return equity[-1] / equity[0] - 1.0
+
+
+def cagr_matrix(equity: np.ndarray, years: float) -> np.ndarray:
+    """
+    CAGR per column; `years` is the calendar length of the sample (days / 365.25).
+    """
+    equity = np.asarray(equity, dtype=float)
+    if len(equity) < 2 or years <= 0:
+        return np.full(equity.shape[1:], np.nan)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return (equity[-1] / equity[0]) ** (1.0 / years) - 1.0
+
+
+def max_drawdown_matrix(equity: np.ndarray) -> np.ndarray:
+    equity = np.asarray(equity, dtype=float)
+    if len(equity) < 2:
+        return np.full(equity.shape[1:], np.nan)
+    peak = np.maximum.accumulate(equity, axis=0)
+    return (equity / peak - 1.0).min(axis=0)
+
+
+def sharpe_ratio_matrix(daily_ret: np.ndarray, rf_annual: float = 0.0, periods: int = ANN) -> np.ndarray:
+    """
+    Same definition as sharpe_ratio(), per column (NaN returns are ignored).
+    """
+    r = np.asarray(daily_ret, dtype=float)
+    valid = ~np.isnan(r)
+    n = valid.sum(axis=0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean = np.where(valid, r, 0.0).sum(axis=0) / n
+        var = np.where(valid, (r - mean) ** 2, 0.0).sum(axis=0) / (n - 1)
+        vol = np.sqrt(var)
+        rf_daily = _annual_to_daily_rf(rf_annual, periods=periods)
+        out = (mean - rf_daily) / vol * np.sqrt(periods)
+    return np.where((n < 2) | (vol == 0) | np.isnan(vol), np.nan, out)
+
+
+# ------------------------------------------------------------
+# Rolling analytics (O(n): cumulative sums + block prefix/suffix scans)
+# ------------------------------------------------------------
+def rolling_sharpe(
+    daily_ret: pd.Series,
+    window: int = ANN,
+    rf_annual: float = 0.0,
+    periods: int = ANN,
+) -> pd.Series:
+    """
+    Rolling version of sharpe_ratio() over `window` returns, from cumulative sums of r and r^2.
+    NaN until the window holds `window` valid returns.
+    """
+    r = daily_ret.to_numpy(dtype=float)
+    valid = ~np.isnan(r)
+    # Centre on the sample mean before summing to limit cancellation in S2 - S1^2/n
+    centre = np.nanmean(r) if valid.any() else 0.0
+    x = np.where(valid, r - centre, 0.0)
+
+    def _window_sum(a: np.ndarray) -> np.ndarray:
+        c = np.concatenate(([0.0], np.cumsum(a)))
+        out = np.full(len(a), np.nan)
+        out[window - 1:] = c[window:] - c[:-window]
+        return out
+
+    n = _window_sum(valid.astype(float))
+    s1 = _window_sum(x)
+    s2 = _window_sum(x * x)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean = s1 / n
+        var = np.maximum(s2 - s1 * s1 / n, 0.0) / (n - 1)
+        vol = np.sqrt(var)
+        rf_daily = _annual_to_daily_rf(rf_annual, periods=periods)
+        out = (mean + centre - rf_daily) / vol * np.sqrt(periods)
+    out = np.where((n < window) | (n < 2) | (vol == 0), np.nan, out)
+    return pd.Series(out, index=daily_ret.index, name="rolling_sharpe")
+
+
+def rolling_cagr(equity: pd.Series, window: int = ANN) -> pd.Series:
+    """
+    CAGR over the trailing `window` periods (equity[t] vs equity[t - window]),
+    annualized by calendar days / 365.25 like cagr().
+    """
+    ratio = equity / equity.shift(window)
+    idx = pd.DatetimeIndex(equity.index)
+    days = pd.Series((idx - idx.to_series().shift(window).values).days, index=equity.index)
+    years = days / 365.25
+    with np.errstate(invalid="ignore", divide="ignore"):
+        out = ratio ** (1.0 / years.where(years > 0)) - 1.0
+    return out.rename("rolling_cagr")
+
+
+def _rolling_min_pair_diff(x: np.ndarray, w: int) -> np.ndarray:
+    """
+    For each window x[e-w+1 .. e] (along axis 0): min over i <= j of x[j] - x[i].
+    van Herk / Gil-Werman style: prefix scans inside blocks of length w, suffix scans
+    inside the previous block, combined per window -> O(n) with no per-row Python loop.
+    """
+    n = x.shape[0]
+    n_blocks = -(-n // w)
+    pad = n_blocks * w - n
+    tail_shape = x.shape[1:]
+    xp = np.concatenate([x, np.full((pad,) + tail_shape, np.nan)]) if pad else x
+    b = xp.reshape((n_blocks, w) + tail_shape)
+
+    # Prefix aggregates (block start .. j)
+    pre_min = np.minimum.accumulate(b, axis=1)
+    pre_max = np.maximum.accumulate(b, axis=1)
+    pre_mdd = np.minimum.accumulate(b - pre_max, axis=1)
+
+    # Suffix aggregates (i .. block end)
+    rb = b[:, ::-1]
+    suf_max = np.maximum.accumulate(rb, axis=1)[:, ::-1]
+    suf_min = np.minimum.accumulate(rb, axis=1)
+    suf_mdd = np.minimum.accumulate(suf_min - rb, axis=1)[:, ::-1]
+
+    def flat(a: np.ndarray) -> np.ndarray:
+        return a.reshape((n_blocks * w,) + tail_shape)[:n]
+
+    pre_min, pre_mdd = flat(pre_min), flat(pre_mdd)
+    suf_max, suf_mdd = flat(suf_max), flat(suf_mdd)
+
+    out = np.full(x.shape, np.nan)
+    if n < w:
+        return out
+    e = np.arange(w - 1, n)
+    s = e - w + 1
+    aligned = (s % w) == 0
+    res = np.minimum(np.minimum(suf_mdd[s], pre_mdd[e]), pre_min[e] - suf_max[s])
+    # A window starting on a block boundary is a single full block: its prefix aggregate at e
+    aligned = aligned.reshape((-1,) + (1,) * len(tail_shape))
+    out[w - 1:] = np.where(aligned, pre_mdd[e], res)
+    return out
+
+
+def rolling_max_drawdown(equity: pd.Series, window: int = ANN) -> pd.Series:
+    """
+    Max drawdown inside each trailing window of `window` periods (window + 1 equity points),
+    measured from the peak within that window. O(n) overall.
+    """
+    log_eq = np.log(equity.to_numpy(dtype=float))
+    mdd = _rolling_min_pair_diff(log_eq, int(window) + 1)
+    return pd.Series(np.expm1(mdd), index=equity.index, name="rolling_max_drawdown")
+
+
+def rolling_performance(
+    df: pd.DataFrame,
+    windows: dict | None = None,
+    rf_annual: float = 0.0,
+    equity_col: str = "strategy_equity",
+    ret_col: str = "strategy_ret",
+) -> pd.DataFrame:
+    """
+    Rolling Sharpe / CAGR / MaxDD for each window, e.g. windows={"1y": 252, "3y": 756}.
+    """
+    if windows is None:
+        windows = {"1y": ANN, "3y": 3 * ANN}
+    out = {}
+    for label, w in windows.items():
+        out[f"Sharpe_{label}"] = rolling_sharpe(df[ret_col], window=w, rf_annual=rf_annual)
+        out[f"CAGR_{label}"] = rolling_cagr(df[equity_col], window=w)
+        out[f"MaxDD_{label}"] = rolling_max_drawdown(df[equity_col], window=w)
+    return pd.DataFrame(out, index=df.index)
@@ -0,0 +1,162 @@
+# src/montecarlo.py
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+
+from src.strategy import ANN, complex_overlay_matrix
+from src.sweep import OVERLAY_DEFAULTS
+from src.metrics import (
+    total_return_matrix,
+    cagr_matrix,
+    max_drawdown_matrix,
+    sharpe_ratio_matrix,
+)
+
+
+# ------------------------------------------------------------
+# Stationary block bootstrap (Politis & Romano)
+# ------------------------------------------------------------
+def stationary_bootstrap_paths(
+    returns: np.ndarray,
+    n_paths: int,
+    length: int | None = None,
+    block_mean: float = 20.0,
+    rng: np.random.Generator | None = None,
+) -> np.ndarray:
+    """
+    Resample a return series into a (paths x time) array.
+
+    Blocks start at uniform random positions, block lengths are geometric with mean
+    `block_mean`, and blocks wrap around the end of the sample. Fully vectorized:
+    each draw's source index is its block's start index plus its offset in the block.
+    """
+    r = np.asarray(returns, dtype=float)
+    r = r[~np.isnan(r)]
+    n = len(r)
+    if n == 0:
+        raise ValueError("No valid returns to bootstrap.")
+    length = n if length is None else int(length)
+    rng = np.random.default_rng() if rng is None else rng
+
+    new_block = rng.random((n_paths, length)) < (1.0 / float(block_mean))
+    new_block[:, 0] = True
+    starts = rng.integers(0, n, size=(n_paths, length))
+
+    t = np.broadcast_to(np.arange(length), (n_paths, length))
+    block_start_t = np.maximum.accumulate(np.where(new_block, t, 0), axis=1)
+    block_start_idx = np.take_along_axis(starts, block_start_t, axis=1)
+    idx = (block_start_idx + (t - block_start_t)) % n
+    return r[idx]
+
+
+def _path_years(index, length: int) -> float:
+    """
+    Calendar length in years of a `length`-return path, days / 365.25 as in metrics.cagr():
+    the historical calendar days per bar times `length` (synthetic business days if the
+    index has no dates).
+    """
+    if isinstance(index, pd.DatetimeIndex) and len(index) > 1:
+        days_per_bar = (index[-1] - index[0]).days / (len(index) - 1)
+    else:
+        dates = pd.bdate_range("2000-01-03", periods=length + 1)
+        days_per_bar = (dates[-1] - dates[0]).days / max(length, 1)
+    return length * days_per_bar / 365.25
+
+
+# ------------------------------------------------------------
+# Overlay on many paths
+# ------------------------------------------------------------
+def _overlay_on_paths(path_returns: np.ndarray, params: dict) -> dict[str, np.ndarray]:
+    """
+    Run the complex overlay on every path at once. Input is (paths x time) returns;
+    each path becomes a synthetic close series starting at 1.0 (time x paths internally).
+    """
+    n_paths, length = path_returns.shape
+    ret = np.empty((length + 1, n_paths))
+    ret[0] = np.nan  # pct_change() of the first close
+    ret[1:] = path_returns.T
+
+    close = np.cumprod(1 + np.nan_to_num(ret, nan=0.0), axis=0)
+    drawdown = close / np.maximum.accumulate(close, axis=0) - 1.0
+
+    ret_df = pd.DataFrame(ret)
+    sigma_fast = ret_df.ewm(span=int(params["vol_fast_span"]), adjust=False).std().to_numpy()
+    downside_vol = (ret_df.clip(upper=0.0).rolling(int(params["window_dvol"])).std() * np.sqrt(ANN)).to_numpy()
+
+    # Synthetic business-day calendar for weekly / monthly rebalance schedules
+    dates = pd.bdate_range("2000-01-03", periods=length + 1)
+    out = complex_overlay_matrix(
+        ret, drawdown, sigma_fast, downside_vol, dates=dates,
+        **{k: v for k, v in params.items() if k not in ("vol_fast_span", "window_dvol")},
+    )
+    out["bh_ret"] = ret
+    out["bh_equity"] = close
+    return out
+
+
+def run_overlay_monte_carlo(
+    df: pd.DataFrame,
+    n_paths: int = 1000,
+    length: int | None = None,
+    block_mean: float = 20.0,
+    seed: int | None = 0,
+    chunk_size: int = 500,
+    rf_annual: float = 0.0,
+    **overlay_params,
+) -> pd.DataFrame:
+    """
+    Block-bootstrap robustness test for compute_complex_agent_overlay.
+
+    Generates `n_paths` stationary-bootstrap paths of the historical Close returns and
+    runs the overlay on all of them, `chunk_size` paths at a time so memory stays bounded
+    (roughly chunk_size x length x 8 bytes per intermediate matrix).
+
+    Returns: one row per path with strategy and buy & hold CAGR / Sharpe / MaxDD / TotalReturn.
+    """
+    unknown = set(overlay_params) - set(OVERLAY_DEFAULTS)
+    if unknown:
+        raise ValueError(f"Unknown overlay parameters: {sorted(unknown)}")
+    params = {**OVERLAY_DEFAULTS, **overlay_params}
+
+    hist_ret = df["Close"].astype(float).pct_change().to_numpy()
+    rng = np.random.default_rng(seed)
+    length = int(np.sum(~np.isnan(hist_ret))) if length is None else int(length)
+    years = _path_years(df.index, length)
+
+    chunks = []
+    for lo in range(0, n_paths, chunk_size):
+        m = min(chunk_size, n_paths - lo)
+        paths = stationary_bootstrap_paths(hist_ret, m, length=length, block_mean=block_mean, rng=rng)
+        out = _overlay_on_paths(paths, params)
+        chunks.append(pd.DataFrame({
+            "path": np.arange(lo, lo + m),
+            "CAGR_strategy": cagr_matrix(out["strategy_equity"], years),
+            "CAGR_buy_hold": cagr_matrix(out["bh_equity"], years),
+            "Sharpe_strategy": sharpe_ratio_matrix(out["strategy_ret"], rf_annual=rf_annual),
+            "Sharpe_buy_hold": sharpe_ratio_matrix(out["bh_ret"], rf_annual=rf_annual),
+            "MaxDD_strategy": max_drawdown_matrix(out["strategy_equity"]),
+            "MaxDD_buy_hold": max_drawdown_matrix(out["bh_equity"]),
+            "TotalReturn_strategy": total_return_matrix(out["strategy_equity"]),
+            "TotalReturn_buy_hold": total_return_matrix(out["bh_equity"]),
+        }))
+
+    return pd.concat(chunks, ignore_index=True).set_index("path")
+
+
+def summarize_monte_carlo(results: pd.DataFrame, quantiles=(0.05, 0.25, 0.50, 0.75, 0.95)) -> pd.DataFrame:
+    """
+    Distribution summary: mean and quantiles per metric, plus how often the
+    strategy beats buy & hold on each metric.
+    """
+    summary = results.quantile(list(quantiles)).T
+    summary.columns = [f"p{int(q * 100):02d}" for q in quantiles]
+    summary.insert(0, "mean", results.mean())
+
+    beats = {}
+    for metric in ("CAGR", "Sharpe", "MaxDD", "TotalReturn"):
+        s, b = f"{metric}_strategy", f"{metric}_buy_hold"
+        if s in results.columns and b in results.columns:
+            beats[s] = float((results[s] > results[b]).mean())
+    summary["P(strategy > buy_hold)"] = pd.Series(beats)
+    return summary
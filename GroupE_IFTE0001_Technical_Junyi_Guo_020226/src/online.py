@@ -0,0 +1,330 @@
+# src/online.py
+from __future__ import annotations
+
+import json
+import math
+import os
+from collections import deque
+
+import pandas as pd
+
+from src.strategy import ANN
+from src.sweep import OVERLAY_DEFAULTS
+
+
+# ------------------------------------------------------------
+# Online building blocks (O(1) per observation)
+# ------------------------------------------------------------
+class _RollingStd:
+    """
+    Rolling sample std over a fixed window (windowed Welford), NaN-aware like
+    pandas rolling(window).std(): NaN until the window holds `window` valid values.
+    """
+
+    def __init__(self, window: int):
+        self.window = int(window)
+        self.values: deque = deque()
+        self.n = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+
+    def update(self, x: float) -> float:
+        self.values.append(x)
+        if not math.isnan(x):
+            self.n += 1
+            delta = x - self.mean
+            self.mean += delta / self.n
+            self.m2 += delta * (x - self.mean)
+        if len(self.values) > self.window:
+            y = self.values.popleft()
+            if not math.isnan(y):
+                self.n -= 1
+                if self.n == 0:
+                    self.mean, self.m2 = 0.0, 0.0
+                else:
+                    delta = y - self.mean
+                    self.mean -= delta / self.n
+                    self.m2 -= delta * (y - self.mean)
+        if self.n < self.window or self.n < 2:
+            return math.nan
+        return math.sqrt(max(self.m2, 0.0) / (self.n - 1))
+
+    def to_dict(self) -> dict:
+        return {"window": self.window, "values": list(self.values), "n": self.n, "mean": self.mean, "m2": self.m2}
+
+    @classmethod
+    def from_dict(cls, d: dict) -> "_RollingStd":
+        obj = cls(d["window"])
+        obj.values = deque(d["values"])
+        obj.n, obj.mean, obj.m2 = d["n"], d["mean"], d["m2"]
+        return obj
+
+
+class _EwmStd:
+    """
+    Online equivalent of pandas ewm(span=span, adjust=False).std() (bias-corrected).
+    """
+
+    def __init__(self, span: int):
+        self.alpha = 2.0 / (int(span) + 1.0)
+        self.mean = math.nan
+        self.cov = 0.0
+        self.sum_wt = 1.0
+        self.sum_wt2 = 1.0
+        self.old_wt = 1.0
+        self.nobs = 0
+
+    def update(self, x: float) -> float:
+        is_obs = not math.isnan(x)
+        self.nobs += int(is_obs)
+        old_wt_factor = 1.0 - self.alpha
+        new_wt = self.alpha
+        if not math.isnan(self.mean):
+            # ignore_na=False: weights decay on missing observations as well
+            self.sum_wt *= old_wt_factor
+            self.sum_wt2 *= old_wt_factor * old_wt_factor
+            self.old_wt *= old_wt_factor
+            if is_obs:
+                old_mean = self.mean
+                if self.mean != x:
+                    self.mean = ((self.old_wt * old_mean) + (new_wt * x)) / (self.old_wt + new_wt)
+                self.cov = ((self.old_wt * (self.cov + ((old_mean - self.mean) * (old_mean - self.mean))))
+                            + (new_wt * ((x - self.mean) * (x - self.mean)))) / (self.old_wt + new_wt)
+                self.sum_wt += new_wt
+                self.sum_wt2 += new_wt * new_wt
+                self.old_wt += new_wt
+                self.sum_wt /= self.old_wt
+                self.sum_wt2 /= self.old_wt * self.old_wt
+                self.old_wt = 1.0
+        elif is_obs:
+            self.mean = x
+
+        if self.nobs < 1:
+            return math.nan
+        numerator = self.sum_wt * self.sum_wt
+        denominator = numerator - self.sum_wt2
+        if denominator <= 0:
+            return math.nan
+        return math.sqrt(max((numerator / denominator) * self.cov, 0.0))
+
+    def to_dict(self) -> dict:
+        return dict(self.__dict__)
+
+    @classmethod
+    def from_dict(cls, d: dict) -> "_EwmStd":
+        obj = cls.__new__(cls)
+        obj.__dict__.update(d)
+        return obj
+
+
+def _clip01(x: float) -> float:
+    if math.isnan(x) or math.isinf(x):
+        return 1.0
+    return min(max(x, 0.0), 1.0)
+
+
+# ------------------------------------------------------------
+# Online overlay
+# ------------------------------------------------------------
+class OverlayState:
+    """
+    Online version of compute_complex_agent_overlay.
+
+    Holds the running peak, EWM variance, downside-vol window, previous tail flag,
+    smoothed overlay and equity; each new close is an O(1) update. The state is
+    persisted as JSON so a ticker can be refreshed daily without rebuilding history.
+    `periods_per_year` annualizes the downside / realized vol (ANN for daily bars) and is
+    stored with the state, so daily updates and streamed chunks use the same factor.
+    """
+
+    def __init__(self, ticker: str | None = None, periods_per_year: float = ANN, **params):
+        unknown = set(params) - set(OVERLAY_DEFAULTS)
+        if unknown:
+            raise ValueError(f"Unknown overlay parameters: {sorted(unknown)}")
+        self.ticker = ticker
+        self.periods_per_year = float(periods_per_year)
+        self.params = {**OVERLAY_DEFAULTS, **params}
+        if self.params["rebalance"] not in ("daily", "band"):
+            # A period end is only known once the next bar arrives
+            raise ValueError("OverlayState supports rebalance='daily' or 'band'; "
+                             "calendar schedules need compute_complex_agent_overlay.")
+
+        self.last_date: pd.Timestamp | None = None
+        self.last_close = math.nan
+        self.peak = -math.inf
+        self.sigma_fast = _EwmStd(self.params["vol_fast_span"])
+        self.downside = _RollingStd(self.params["window_dvol"])
+        self.vol20 = _RollingStd(20)
+        self.prev_tail = False
+        self.overlay = 1.0          # smoothed overlay at the last close
+        self.held = 1.0             # position held after the last close (= next day's exposure)
+        self.exposure = math.nan    # exposure held during the last day
+        self.strategy_equity = 1.0
+        self.bh_equity = 1.0
+        self.n_obs = 0
+
+    def update(self, date, close: float) -> dict:
+        """
+        Apply one new close. Returns the diagnostics for that day, including
+        `next_exposure` (exposure to hold for the next day).
+        """
+        p = self.params
+        date = pd.Timestamp(date)
+        if self.last_date is not None and date <= self.last_date:
+            raise ValueError(f"{date.date()} is not after the last update ({self.last_date.date()}).")
+        close = float(close)
+
+        # 1) Simple return
+        ret = close / self.last_close - 1.0 if self.n_obs > 0 else math.nan
+
+        # 2) Drawdown
+        self.peak = max(self.peak, close)
+        drawdown = close / self.peak - 1.0
+
+        # 3) Drawdown overlay
+        denom = p["dd_full"] - p["dd_enter"]
+        if denom != 0:
+            x = (drawdown - p["dd_enter"]) / denom
+        else:  # same as float division by zero in pandas: +-inf, or NaN for 0/0
+            x = math.nan if drawdown == p["dd_enter"] else math.copysign(math.inf, drawdown - p["dd_enter"])
+        x = min(max(x, 0.0), 1.0)
+        overlay_dd = _clip01((1.0 - x) * 1.0 + x * float(p["floor"]))
+
+        # 4) Tail crash brake (2 consecutive tail days)
+        sigma_fast = self.sigma_fast.update(ret)
+        tail = (not math.isnan(ret)) and (not math.isnan(sigma_fast)) and ret < (-float(p["sigma_k"]) * sigma_fast)
+        crash_tail = tail and self.prev_tail
+        self.prev_tail = tail
+        overlay_tail = _clip01(float(p["tail_cap"])) if crash_tail else 1.0
+
+        # 5) Downside vol brake (gated by drawdown)
+        neg = min(ret, 0.0) if not math.isnan(ret) else math.nan
+        downside_std = self.downside.update(neg)
+        downside_vol = downside_std * math.sqrt(self.periods_per_year)
+        if math.isnan(downside_vol) or downside_vol == 0:
+            overlay_dvol = 1.0
+        else:
+            overlay_dvol = _clip01((float(p["target_dvol"]) / downside_vol) ** float(p["alpha"]))
+        overlay_dvol_gate = _clip01(overlay_dvol if drawdown < p["use_dvol_dd"] else 1.0)
+
+        # 6) Composite overlay raw + 7) asymmetric smoothing
+        overlay_raw = _clip01(overlay_dd * overlay_tail * overlay_dvol_gate)
+        prev = self.overlay
+        speed = p["down_speed"] if overlay_raw < prev else p["up_speed"]
+        self.overlay = _clip01(prev + float(speed) * (overlay_raw - prev))
+
+        # Held position under the rebalance schedule
+        prev_held = self.held
+        if (self.n_obs == 0 or p["rebalance"] == "daily"
+                or abs(self.overlay - prev_held) >= float(p["rebalance_band"])):
+            self.held = self.overlay
+
+        # 8-9) Executed exposure (yesterday's held position), turnover cost, equity
+        exposure = prev_held if self.n_obs > 0 else math.nan
+        turnover = abs(exposure - self.exposure)
+        turnover = 0.0 if math.isnan(turnover) else turnover
+        strategy_ret = exposure * ret - turnover * float(p["transaction_cost"])
+        if not math.isnan(strategy_ret):
+            self.strategy_equity *= 1 + strategy_ret
+        if not math.isnan(ret):
+            self.bh_equity *= 1 + ret
+        self.exposure = exposure
+
+        vol = self.vol20.update(ret) * math.sqrt(self.periods_per_year)
+        self.last_date = date
+        self.last_close = close
+        self.n_obs += 1
+
+        return {
+            "date": date,
+            "Close": close,
+            "ret": ret,
+            "drawdown": drawdown,
+            "sigma_fast": sigma_fast,
+            "crash_tail": crash_tail,
+            "downside_vol": downside_vol,
+            "overlay_raw": overlay_raw,
+            "overlay": self.overlay,
+            "exposure": exposure,
+            "exposure_held": self.held,
+            "next_exposure": self.held,
+            "turnover": turnover,
+            "strategy_ret": strategy_ret,
+            "strategy_equity": self.strategy_equity,
+            "bh_equity": self.bh_equity,
+            "vol": vol,
+        }
+
+    def warm_up(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Feed a price history (DataFrame with 'Close'); returns the per-day diagnostics."""
+        rows = [self.update(d, c) for d, c in df["Close"].items()]
+        return pd.DataFrame(rows).set_index("date") if rows else pd.DataFrame()
+
+    # ---------- persistence ----------
+    def to_dict(self) -> dict:
+        return {
+            "ticker": self.ticker,
+            "periods_per_year": self.periods_per_year,
+            "params": self.params,
+            "last_date": None if self.last_date is None else self.last_date.isoformat(),
+            "last_close": self.last_close,
+            "peak": self.peak,
+            "sigma_fast": self.sigma_fast.to_dict(),
+            "downside": self.downside.to_dict(),
+            "vol20": self.vol20.to_dict(),
+            "prev_tail": self.prev_tail,
+            "overlay": self.overlay,
+            "held": self.held,
+            "exposure": self.exposure,
+            "strategy_equity": self.strategy_equity,
+            "bh_equity": self.bh_equity,
+            "n_obs": self.n_obs,
+        }
+
+    @classmethod
+    def from_dict(cls, d: dict) -> "OverlayState":
+        obj = cls(d["ticker"], d["periods_per_year"], **d["params"])
+        obj.last_date = None if d["last_date"] is None else pd.Timestamp(d["last_date"])
+        obj.last_close = d["last_close"]
+        obj.peak = d["peak"]
+        obj.sigma_fast = _EwmStd.from_dict(d["sigma_fast"])
+        obj.downside = _RollingStd.from_dict(d["downside"])
+        obj.vol20 = _RollingStd.from_dict(d["vol20"])
+        obj.prev_tail = d["prev_tail"]
+        obj.overlay = d["overlay"]
+        obj.held = d["held"]
+        obj.exposure = d["exposure"]
+        obj.strategy_equity = d["strategy_equity"]
+        obj.bh_equity = d["bh_equity"]
+        obj.n_obs = d["n_obs"]
+        return obj
+
+    def save(self, path: str) -> None:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f)  # NaN / inf are written as JSON extensions
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> "OverlayState":
+        with open(path, "r", encoding="utf-8") as f:
+            return cls.from_dict(json.load(f))
+
+
+def refresh_overlay_state(ticker: str, date, close: float, state_dir: str = "state", history: pd.DataFrame | None = None, **params) -> dict:
+    """
+    Load `<state_dir>/<ticker>.json` (or bootstrap it from `history` on first use),
+    apply today's close and save. Returns the day's diagnostics.
+    """
+    path = os.path.join(state_dir, f"{ticker}.json")
+    if os.path.exists(path):
+        state = OverlayState.load(path)
+    else:
+        if history is None:
+            raise FileNotFoundError(f"No saved state for {ticker}; pass `history` to bootstrap it.")
+        state = OverlayState(ticker, **params)
+        state.warm_up(history[history.index < pd.Timestamp(date)])
+    row = state.update(date, close)
+    state.save(path)
+    return row
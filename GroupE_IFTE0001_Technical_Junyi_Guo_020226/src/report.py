@@ -18,10 +18,13 @@ def format_num(x: float) -> str:
         return "n/a"
     return f"{x:,.3f}"
 
-def image_to_base64(img_path: str) -> str:
-    if (not img_path) or (not os.path.exists(img_path)):
+def image_to_base64(img: str | bytes) -> str:
+    """Accepts a PNG path or already-encoded PNG bytes (e.g. from render_report_charts)."""
+    if isinstance(img, (bytes, bytearray)):
+        return base64.b64encode(img).decode("utf-8")
+    if (not img) or (not os.path.exists(img)):
         return ""
-    with open(img_path, "rb") as f:
+    with open(img, "rb") as f:
         return base64.b64encode(f.read()).decode("utf-8")
 
 def markdown_to_html(text: str) -> str:
@@ -99,6 +102,15 @@ Now write the analysis.
 """.strip()
     return prompt
 
+LLM_MODEL = "gpt-4o-mini"
+LLM_TEMPERATURE = 0.2
+
+def llm_messages(prompt: str) -> list[dict]:
+    return [
+        {"role": "system", "content": "You are a helpful financial analyst."},
+        {"role": "user", "content": prompt},
+    ]
+
 def try_generate_llm_commentary(prompt: str) -> str | None:
     api_key = os.getenv("OPENAI_API_KEY", "").strip()
     if not api_key:
@@ -110,12 +122,9 @@ def try_generate_llm_commentary(prompt: str) -> str | None:
         client = OpenAI(api_key=api_key)
 
         resp = client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[
-                {"role": "system", "content": "You are a helpful financial analyst."},
-                {"role": "user", "content": prompt},
-            ],
-            temperature=0.2,
+            model=LLM_MODEL,
+            messages=llm_messages(prompt),
+            temperature=LLM_TEMPERATURE,
         )
         return resp.choices[0].message.content
 
@@ -170,7 +179,7 @@ def build_trade_note_html_vol_overlay(
     advice_color = "#fdebd0" if is_high_vol else "#d4efdf"
     advice_text_color = "#d35400" if is_high_vol else "#186a3b"
 
-    # base64 images
+    # base64 images (charts values: PNG paths or PNG bytes)
     img_equity = image_to_base64(charts.get("equity", ""))
     img_vol = image_to_base64(charts.get("vol", ""))
     img_exposure = image_to_base64(charts.get("exposure", ""))
@@ -4,6 +4,11 @@ from __future__ import annotations
 import numpy as np
 import pandas as pd
 
+try:  # optional JIT for the sequential smoothing step
+    import numba
+except ImportError:
+    numba = None
+
 ANN = 252
 
 
@@ -30,19 +35,9 @@ def compute_vol_target_overlay(
     df["exposure_raw"] = target_vol / df["vol"]
     df["exposure_target"] = df["exposure_raw"].clip(lower=min_exposure, upper=max_exposure)
 
-    exec_exposure = []
-    last_exec = np.nan
-    for x in df["exposure_target"].values:
-        if np.isnan(x):
-            exec_exposure.append(np.nan)
-            continue
-        if np.isnan(last_exec):
-            last_exec = x
-            exec_exposure.append(last_exec)
-            continue
-        if abs(x - last_exec) >= rebalance_threshold:
-            last_exec = x
-        exec_exposure.append(last_exec)
+    exec_exposure = _threshold_execution_matrix(
+        df["exposure_target"].to_numpy(dtype=float)[:, None], rebalance_threshold
+    )[:, 0]
 
     df["exposure"] = pd.Series(exec_exposure, index=df.index).clip(min_exposure, max_exposure)
 
@@ -62,6 +57,103 @@ def compute_vol_target_overlay(
     return df
 
 
+def _threshold_execution_numpy(targets: np.ndarray, thresholds: np.ndarray) -> np.ndarray:
+    """NumPy fallback: one pass over time, all columns updated per step."""
+    out = np.empty_like(targets)
+    last = np.full(targets.shape[1], np.nan)
+    for t in range(targets.shape[0]):
+        x = targets[t]
+        valid = ~np.isnan(x)
+        trade = valid & (np.isnan(last) | (np.abs(x - last) >= thresholds))
+        last = np.where(trade, x, last)
+        out[t] = np.where(valid, last, np.nan)
+    return out
+
+
+def _threshold_execution_loop(targets: np.ndarray, thresholds: np.ndarray) -> np.ndarray:
+    """Scalar kernel (compiled with numba when available)."""
+    n_rows, n_cols = targets.shape
+    out = np.empty_like(targets)
+    for j in range(n_cols):
+        last = np.nan
+        for t in range(n_rows):
+            x = targets[t, j]
+            if np.isnan(x):
+                out[t, j] = np.nan
+                continue
+            if np.isnan(last) or abs(x - last) >= thresholds[j]:
+                last = x
+            out[t, j] = last
+    return out
+
+
+_threshold_execution_jit = numba.njit(cache=True)(_threshold_execution_loop) if numba is not None else None
+
+
+def _threshold_execution_matrix(targets: np.ndarray, rebalance_threshold, use_numba: bool | None = None) -> np.ndarray:
+    """
+    Thresholded execution for a (time x columns) target matrix:
+    trade to the target only when it moves >= rebalance_threshold from the last executed level.
+    NaN targets give NaN (state kept); the first valid target is executed immediately.
+    """
+    targets = np.ascontiguousarray(targets, dtype=float)
+    thresholds = np.ascontiguousarray(np.broadcast_to(np.asarray(rebalance_threshold, dtype=float), (targets.shape[1],)))
+    if use_numba is None:
+        use_numba = _threshold_execution_jit is not None
+    if use_numba:
+        if _threshold_execution_jit is None:
+            raise ImportError("numba is not installed; pass use_numba=False.")
+        return _threshold_execution_jit(targets, thresholds)
+    return _threshold_execution_numpy(targets, thresholds)
+
+
+def compute_vol_target_overlay_panel(
+    close: pd.DataFrame,
+    window_days: int = 20,
+    target_vol: float = 0.20,
+    min_exposure: float = 0.0,
+    max_exposure: float = 1.0,
+    rebalance_threshold: float = 0.05,
+) -> dict[str, pd.DataFrame]:
+    """
+    Panel version of compute_vol_target_overlay for a wide (dates x tickers) close matrix.
+    All tickers are processed together; returns wide DataFrames keyed by the same
+    column names as the single-ticker output (ret, vol, exposure, strategy_equity, strategy_dd, ...).
+    """
+    close = close.astype(float)
+
+    ret = np.log(close).diff()
+    vol = ret.rolling(window_days).std() * np.sqrt(ANN)
+
+    exposure_target = (target_vol / vol).clip(lower=min_exposure, upper=max_exposure)
+    exposure = pd.DataFrame(
+        _threshold_execution_matrix(exposure_target.to_numpy(dtype=float), rebalance_threshold),
+        index=close.index,
+        columns=close.columns,
+    ).clip(min_exposure, max_exposure)
+
+    strategy_ret = exposure.shift(1) * ret
+    strategy_equity = (1 + strategy_ret.fillna(0)).cumprod()
+    bh_equity = (1 + ret.fillna(0)).cumprod()
+
+    trade_flag = (exposure.diff().abs() >= 1e-12).astype(int)
+    trade_flag = trade_flag.mask(exposure.isna() | exposure.shift(1).isna(), 0)
+
+    return {
+        "ret": ret,
+        "vol": vol,
+        "exposure_target": exposure_target,
+        "exposure": exposure,
+        "strategy_ret": strategy_ret,
+        "bh_ret": ret,
+        "strategy_equity": strategy_equity,
+        "bh_equity": bh_equity,
+        "strategy_dd": strategy_equity / strategy_equity.cummax() - 1.0,
+        "bh_dd": bh_equity / bh_equity.cummax() - 1.0,
+        "trade_count": trade_flag.cumsum(),
+    }
+
+
 # ------------------------------------------------------------
 # Helpers for complex agent overlay
 # ------------------------------------------------------------
@@ -75,18 +167,189 @@ def _asymmetric_smoothing(values: np.ndarray, down_speed: float, up_speed: float
       if v < prev: prev += down_speed*(v-prev)
       else:        prev += up_speed*(v-prev)
     """
-    out = []
-    prev = float(start)
-    ds = float(down_speed)
-    us = float(up_speed)
-    for v in values:
-        v = float(v)
-        if v < prev:
-            prev = prev + ds * (v - prev)
-        else:
-            prev = prev + us * (v - prev)
-        out.append(prev)
-    return np.array(out, dtype=float)
+    values = np.asarray(values, dtype=float)
+    return _asymmetric_smoothing_matrix(values[:, None], down_speed, up_speed, start=start)[:, 0]
+
+
+def _asymmetric_smoothing_numpy(values: np.ndarray, ds: np.ndarray, us: np.ndarray, start: np.ndarray) -> np.ndarray:
+    """NumPy fallback: one pass over time, all columns updated per step."""
+    out = np.empty_like(values)
+    prev = start.copy()
+    for t in range(values.shape[0]):
+        v = values[t]
+        speed = np.where(v < prev, ds, us)
+        prev = prev + speed * (v - prev)
+        out[t] = prev
+    return out
+
+
+def _asymmetric_smoothing_loop(values: np.ndarray, ds: np.ndarray, us: np.ndarray, start: np.ndarray) -> np.ndarray:
+    """Scalar kernel, compiled with numba when available (no fastmath: keeps results bit-identical)."""
+    n_rows, n_cols = values.shape
+    out = np.empty_like(values)
+    for j in range(n_cols):
+        prev = start[j]
+        for t in range(n_rows):
+            v = values[t, j]
+            if v < prev:
+                prev = prev + ds[j] * (v - prev)
+            else:
+                prev = prev + us[j] * (v - prev)
+            out[t, j] = prev
+    return out
+
+
+_asymmetric_smoothing_jit = numba.njit(cache=True)(_asymmetric_smoothing_loop) if numba is not None else None
+
+
+def _asymmetric_smoothing_matrix(
+    values: np.ndarray, down_speed, up_speed, start=1.0, use_numba: bool | None = None
+) -> np.ndarray:
+    """
+    Column-wise _asymmetric_smoothing for a (time x columns) matrix (tickers or parameter sets).
+    down_speed / up_speed / start: scalar or one value per column.
+    use_numba: None = numba if installed, False = NumPy fallback.
+    """
+    values = np.ascontiguousarray(values, dtype=float)
+    n_cols = values.shape[1]
+    ds = np.ascontiguousarray(np.broadcast_to(np.asarray(down_speed, dtype=float), (n_cols,)))
+    us = np.ascontiguousarray(np.broadcast_to(np.asarray(up_speed, dtype=float), (n_cols,)))
+    st = np.ascontiguousarray(np.broadcast_to(np.asarray(start, dtype=float), (n_cols,)))
+
+    if use_numba is None:
+        use_numba = _asymmetric_smoothing_jit is not None
+    if use_numba:
+        if _asymmetric_smoothing_jit is None:
+            raise ImportError("numba is not installed; pass use_numba=False.")
+        return _asymmetric_smoothing_jit(values, ds, us, st)
+    return _asymmetric_smoothing_numpy(values, ds, us, st)
+
+
+def _clip01(x: np.ndarray) -> np.ndarray:
+    """Array version of _safe_clip01(...).fillna(1.0)."""
+    x = np.where(np.isinf(x), np.nan, x)
+    return np.where(np.isnan(x), 1.0, np.clip(x, 0.0, 1.0))
+
+
+REBALANCE_SCHEDULES = ("daily", "weekly", "monthly", "band")
+
+
+def rebalance_positions(dates, schedule: str) -> np.ndarray:
+    """
+    Row positions at which a calendar schedule re-sets the position
+    (decided at that close, executed next day): the last trading day of each
+    week / month. The first row is always included as the initial entry.
+    """
+    dates = pd.DatetimeIndex(dates)
+    n = len(dates)
+    if schedule == "daily":
+        return np.arange(n)
+    if schedule not in ("weekly", "monthly"):
+        raise ValueError(f"Unknown calendar schedule {schedule!r}; use 'daily', 'weekly' or 'monthly'.")
+    period = dates.to_period("W" if schedule == "weekly" else "M").asi8
+    last_in_period = np.flatnonzero(np.append(period[1:] != period[:-1], True))
+    return np.union1d([0], last_in_period) if n else last_in_period
+
+
+def _hold_at_positions(values: np.ndarray, positions: np.ndarray) -> np.ndarray:
+    """Decimate (time x columns) values to `positions` and hold each row until the next position."""
+    decimated = values[positions]
+    owner = np.searchsorted(positions, np.arange(values.shape[0]), side="right") - 1
+    return decimated[owner]
+
+
+def _scheduled_overlay(overlay: np.ndarray, rebalance: str, rebalance_band=0.05, dates=None) -> np.ndarray:
+    """
+    Held (time x columns) position under a rebalance schedule:
+      daily:          overlay every day
+      weekly/monthly: overlay sampled at period ends, held in between
+      band:           trade to the overlay only when it moves >= rebalance_band from the held level
+    """
+    if rebalance == "daily":
+        return overlay
+    if rebalance == "band":
+        return _threshold_execution_matrix(overlay, rebalance_band)
+    if rebalance in ("weekly", "monthly"):
+        if dates is None:
+            raise ValueError(f"rebalance={rebalance!r} needs the dates of the rows.")
+        return _hold_at_positions(overlay, rebalance_positions(dates, rebalance))
+    raise ValueError(f"Unknown rebalance schedule {rebalance!r}; choose from {REBALANCE_SCHEDULES}.")
+
+
+def complex_overlay_matrix(
+    ret: np.ndarray,
+    drawdown: np.ndarray,
+    sigma_fast: np.ndarray,
+    downside_vol: np.ndarray,
+    dd_enter=-0.08,
+    dd_full=-0.25,
+    floor=0.20,
+    sigma_k=3.0,
+    tail_cap=0.40,
+    target_dvol=0.20,
+    alpha=0.60,
+    use_dvol_dd=-0.12,
+    down_speed=0.50,
+    up_speed=0.30,
+    transaction_cost=0.001,
+    rebalance="daily",
+    rebalance_band=0.05,
+    dates=None,
+) -> dict[str, np.ndarray]:
+    """
+    Core of compute_complex_agent_overlay on (time x columns) arrays.
+
+    Columns can be parameter sets (shared ret/drawdown, per-column params) or
+    return paths (per-column ret/drawdown, scalar params); inputs broadcast.
+    sigma_fast / downside_vol are precomputed for each column's span / window.
+    `rebalance` is one schedule for all columns (rebalance_band may vary per column);
+    weekly / monthly schedules need the row `dates`.
+
+    Returns: overlay, exposure, turnover, strategy_ret, strategy_equity matrices.
+    """
+    with np.errstate(invalid="ignore", divide="ignore", over="ignore"):
+        # 3) Drawdown overlay
+        x = np.clip((drawdown - dd_enter) / (np.asarray(dd_full) - dd_enter), 0.0, 1.0)
+        overlay_dd = _clip01((1.0 - x) * 1.0 + x * np.asarray(floor, dtype=float))
+
+        # 4) Tail crash brake (2 consecutive tail days)
+        tail = ret < (-np.asarray(sigma_k, dtype=float) * sigma_fast)
+        prev_tail = np.zeros_like(tail)
+        prev_tail[1:] = tail[:-1]
+        overlay_tail = _clip01(np.where(tail & prev_tail, np.asarray(tail_cap, dtype=float), 1.0))
+
+        # 5) Downside vol brake (gated by drawdown)
+        overlay_dvol = _clip01((np.asarray(target_dvol, dtype=float) / downside_vol) ** np.asarray(alpha, dtype=float))
+        overlay_dvol_gate = _clip01(np.where(drawdown < use_dvol_dd, overlay_dvol, 1.0))
+
+        # 6) Composite overlay raw
+        overlay_raw = _clip01(overlay_dd * overlay_tail * overlay_dvol_gate)
+
+    # 7) Asymmetric smoothing
+    overlay = _clip01(_asymmetric_smoothing_matrix(overlay_raw, down_speed, up_speed, start=1.0))
+    held = _scheduled_overlay(overlay, rebalance, rebalance_band, dates)
+
+    # Executed exposure (shift 1 day to avoid look-ahead)
+    exposure = np.empty_like(held)
+    exposure[0] = np.nan
+    exposure[1:] = held[:-1]
+
+    # 8) Transaction cost via turnover
+    turnover = np.zeros_like(exposure)
+    turnover[1:] = np.abs(np.diff(exposure, axis=0))
+    turnover = np.nan_to_num(turnover, nan=0.0)
+
+    # 9) Strategy return net of cost
+    strategy_ret = exposure * ret - turnover * np.asarray(transaction_cost, dtype=float)
+    strategy_equity = np.cumprod(1 + np.nan_to_num(strategy_ret, nan=0.0), axis=0)
+
+    return {
+        "overlay": overlay,
+        "exposure": exposure,
+        "turnover": turnover,
+        "strategy_ret": strategy_ret,
+        "strategy_equity": strategy_equity,
+    }
 
 
 # ------------------------------------------------------------
@@ -112,6 +375,9 @@ def compute_complex_agent_overlay(
     up_speed: float = 0.30,
     # --- Transaction cost ---
     transaction_cost: float = 0.001,  # 0.1% per 1.0 notional traded (turnover-based)
+    # --- Rebalance schedule ---
+    rebalance: str = "daily",  # "daily" | "weekly" | "monthly" | "band"
+    rebalance_band: float = 0.05,  # only used by rebalance="band"
 ) -> pd.DataFrame:
     """
     Faithful port of your uploaded complex agent.py (core mechanics):
@@ -123,12 +389,16 @@ def compute_complex_agent_overlay(
       exposure = overlay.shift(1)   (avoid look-ahead)
       strategy_ret = exposure * ret - turnover*transaction_cost
 
+    rebalance: "daily" trades to the overlay every day; "weekly" / "monthly" only at the
+    last trading day of each period (held in between); "band" only when the overlay
+    moves >= rebalance_band away from the held exposure.
+
     Returns are computed with pct_change() to match complex agent behavior.
 
     Outputs include the columns your run_demo/report pipeline expects:
       ret, vol, exposure_target, exposure, strategy_ret, bh_ret,
       strategy_equity, bh_equity, strategy_dd, bh_dd, trade_flag, trade_count,
-      plus diagnostic columns: overlay_dd, overlay_tail, overlay_dvol, overlay_raw, overlay, drawdown, turnover, tcost_ret.
+      plus diagnostic columns: overlay_dd, overlay_tail, overlay_dvol, overlay_raw, overlay, exposure_held, drawdown, turnover, tcost_ret.
     """
     df = df.copy()
 
@@ -187,8 +457,12 @@ def compute_complex_agent_overlay(
     # Suggested exposure for reporting consistency
     df["exposure_target"] = df["overlay"].clip(0.0, 1.0)
 
+    # Held position under the rebalance schedule
+    held = _scheduled_overlay(df["overlay"].to_numpy(dtype=float)[:, None], rebalance, rebalance_band, df.index)[:, 0]
+    df["exposure_held"] = held
+
     # Executed exposure (shift 1 day to avoid look-ahead)
-    df["exposure"] = df["overlay"].shift(1).clip(0.0, 1.0)
+    df["exposure"] = df["exposure_held"].shift(1).clip(0.0, 1.0)
 
     # 8) Transaction cost via turnover (continuous exposure -> turnover makes sense)
     df["turnover"] = df["exposure"].diff().abs().fillna(0.0)
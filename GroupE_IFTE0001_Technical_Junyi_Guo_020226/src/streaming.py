@@ -0,0 +1,270 @@
+# src/streaming.py
+from __future__ import annotations
+
+import math
+import os
+from collections import deque
+from typing import Iterator
+
+import numpy as np
+import pandas as pd
+
+from src.strategy import ANN, _asymmetric_smoothing_matrix, _clip01, _threshold_execution_matrix
+from src.online import OverlayState, _EwmStd, _RollingStd
+
+# Regular-session US equity minute bars per year (annualizes downside vol for minute data)
+MINUTE_BARS_PER_YEAR = ANN * 390
+
+OUTPUT_COLUMNS = [
+    "Close", "ret", "drawdown", "overlay", "exposure",
+    "turnover", "strategy_ret", "strategy_equity", "bh_equity",
+]
+
+
+# ------------------------------------------------------------
+# Chunk-wise indicators with carried state
+# ------------------------------------------------------------
+def _ewm_mean_from(start: float, x: np.ndarray, alpha: float) -> np.ndarray:
+    """y_t = (1-alpha)*y_{t-1} + alpha*x_t with y_0 = start (pandas adjust=False recursion)."""
+    return pd.Series(np.r_[start, x]).ewm(alpha=alpha, adjust=False).mean().to_numpy()[1:]
+
+
+def _ewm_std_chunk(ewm: _EwmStd, x: np.ndarray) -> np.ndarray:
+    """
+    Vectorized _EwmStd.update over a chunk (state is updated in place).
+    Only the very first return of a stream may be NaN; later ones must be valid.
+    """
+    out = np.full(len(x), np.nan)
+    i = 0
+    if math.isnan(ewm.mean):  # stream start: skip the leading NaN, first valid value seeds the mean
+        while i < len(x) and math.isnan(x[i]):
+            i += 1
+        if i == len(x):
+            return out
+        out[i] = ewm.update(float(x[i]))
+        i += 1
+    y = x[i:]
+    if len(y) == 0:
+        return out
+    if np.isnan(y).any():
+        raise ValueError("NaN returns inside a stream are not supported; drop missing closes first.")
+
+    a = ewm.alpha
+    mean = _ewm_mean_from(ewm.mean, y, a)
+    prev_mean = np.r_[ewm.mean, mean[:-1]]
+    # cov_t = (1-a)*cov_{t-1} + u_t  ->  same recursion as an EWM mean of u/a
+    u = (1 - a) * (prev_mean - mean) ** 2 + a * (y - mean) ** 2
+    cov = _ewm_mean_from(ewm.cov, u / a, a)
+    c = (1 - a) ** 2
+    ck = c ** np.arange(1, len(y) + 1)
+    sum_wt2 = ck * ewm.sum_wt2 + a * a * (1 - ck) / (1 - c)  # sum_wt stays 1 without NaNs
+
+    denom = 1.0 - sum_wt2
+    with np.errstate(invalid="ignore", divide="ignore"):
+        out[i:] = np.where(denom > 0, np.sqrt(np.maximum(cov / denom, 0.0)), np.nan)
+
+    ewm.mean, ewm.cov, ewm.sum_wt2 = float(mean[-1]), float(cov[-1]), float(sum_wt2[-1])
+    ewm.sum_wt, ewm.old_wt = 1.0, 1.0
+    ewm.nobs += len(y)
+    return out
+
+
+def _rolling_std_chunk(rs: _RollingStd, x: np.ndarray) -> np.ndarray:
+    """Vectorized _RollingStd.update over a chunk: the carried window is prepended."""
+    carry = np.asarray(rs.values, dtype=float)
+    full = np.r_[carry, x]
+    out = pd.Series(full).rolling(rs.window).std().to_numpy()[len(carry):]
+
+    tail = full[-rs.window:]
+    valid = tail[~np.isnan(tail)]
+    rs.values = deque(tail.tolist())
+    rs.n = len(valid)
+    rs.mean = float(valid.mean()) if rs.n else 0.0
+    rs.m2 = float(((valid - rs.mean) ** 2).sum()) if rs.n else 0.0
+    return out
+
+
+# ------------------------------------------------------------
+# One chunk
+# ------------------------------------------------------------
+def overlay_chunk(state: OverlayState, close: pd.Series) -> pd.DataFrame:
+    """
+    Advance `state` by a chunk of closes (increasing timestamps) and return the per-bar output.
+
+    Same recursion as OverlayState.update, vectorized over the chunk; only the last close,
+    peak, EWM moments, downside-vol window, previous tail flag, smoothed overlay, held
+    position and equities cross the chunk boundary. Window / span parameters are in bars and
+    the downside vol is annualized with state.periods_per_year.
+    """
+    p = state.params
+    if p["rebalance"] not in ("daily", "band"):
+        raise ValueError("Streaming supports rebalance='daily' (every bar) or 'band'.")
+    close = close.astype(float)
+    if len(close) == 0:
+        return pd.DataFrame(columns=OUTPUT_COLUMNS)
+    idx = pd.DatetimeIndex(close.index)
+    if not idx.is_monotonic_increasing or (state.last_date is not None and idx[0] <= state.last_date):
+        raise ValueError("Timestamps must be increasing within and across chunks.")
+    c = close.to_numpy()
+
+    # 1) Returns (carry last close)
+    prev_close = np.r_[state.last_close if state.n_obs > 0 else np.nan, c[:-1]]
+    ret = c / prev_close - 1.0
+
+    # 2) Drawdown (carry running peak)
+    peak = np.maximum.accumulate(np.r_[state.peak, c])[1:]
+    drawdown = c / peak - 1.0
+
+    with np.errstate(invalid="ignore", divide="ignore", over="ignore"):
+        # 3) Drawdown overlay
+        x = np.clip((drawdown - p["dd_enter"]) / (p["dd_full"] - p["dd_enter"]), 0.0, 1.0)
+        overlay_dd = _clip01((1.0 - x) * 1.0 + x * float(p["floor"]))
+
+        # 4) Tail crash brake (carry previous tail flag)
+        sigma_fast = _ewm_std_chunk(state.sigma_fast, ret)
+        tail = ret < (-float(p["sigma_k"]) * sigma_fast)
+        prev_tail = np.r_[state.prev_tail, tail[:-1]]
+        overlay_tail = _clip01(np.where(tail & prev_tail, float(p["tail_cap"]), 1.0))
+
+        # 5) Downside vol brake (carry the rolling window)
+        neg = np.minimum(ret, 0.0)
+        downside_vol = _rolling_std_chunk(state.downside, neg) * np.sqrt(state.periods_per_year)
+        overlay_dvol = _clip01((float(p["target_dvol"]) / downside_vol) ** float(p["alpha"]))
+        overlay_dvol_gate = _clip01(np.where(drawdown < p["use_dvol_dd"], overlay_dvol, 1.0))
+
+        # 6) Composite overlay raw
+        overlay_raw = _clip01(overlay_dd * overlay_tail * overlay_dvol_gate)
+    _rolling_std_chunk(state.vol20, ret)  # keeps the state usable by OverlayState.update
+
+    # 7) Asymmetric smoothing (carry last overlay)
+    overlay = _clip01(_asymmetric_smoothing_matrix(overlay_raw[:, None], p["down_speed"], p["up_speed"], start=state.overlay)[:, 0])
+
+    # Held position: the carried held level is prepended so the band compares against it
+    if p["rebalance"] == "band":
+        seed = state.held if state.n_obs > 0 else overlay[0]
+        held = _threshold_execution_matrix(np.r_[seed, overlay][:, None], p["rebalance_band"])[1:, 0]
+    else:
+        held = overlay
+
+    # 8-9) Executed exposure (previous bar's held position), turnover cost, equity
+    exposure = np.r_[state.held if state.n_obs > 0 else np.nan, held[:-1]]
+    turnover = np.abs(np.diff(np.r_[state.exposure, exposure]))
+    turnover = np.nan_to_num(turnover, nan=0.0)
+    strategy_ret = exposure * ret - turnover * float(p["transaction_cost"])
+    strategy_equity = state.strategy_equity * np.cumprod(1 + np.nan_to_num(strategy_ret, nan=0.0))
+    bh_equity = state.bh_equity * np.cumprod(1 + np.nan_to_num(ret, nan=0.0))
+
+    # Carry state
+    state.last_date = idx[-1]
+    state.last_close = float(c[-1])
+    state.peak = float(peak[-1])
+    state.prev_tail = bool(tail[-1])
+    state.overlay = float(overlay[-1])
+    state.held = float(held[-1])
+    state.exposure = float(exposure[-1])
+    state.strategy_equity = float(strategy_equity[-1])
+    state.bh_equity = float(bh_equity[-1])
+    state.n_obs += len(c)
+
+    return pd.DataFrame({
+        "Close": c,
+        "ret": ret,
+        "drawdown": drawdown,
+        "overlay": overlay,
+        "exposure": exposure,
+        "turnover": turnover,
+        "strategy_ret": strategy_ret,
+        "strategy_equity": strategy_equity,
+        "bh_equity": bh_equity,
+    }, index=idx)
+
+
+# ------------------------------------------------------------
+# File I/O
+# ------------------------------------------------------------
+def iter_price_chunks(path: str, chunksize: int = 1_000_000, time_col: str = "timestamp", price_col: str = "close") -> Iterator[pd.Series]:
+    """
+    Yield the price column of a CSV or Parquet file in chunks of about `chunksize` rows
+    (Series indexed by timestamp, missing prices dropped). Parquet needs pyarrow.
+    """
+    if path.endswith(".parquet"):
+        try:
+            import pyarrow.parquet as pq
+        except ImportError as e:
+            raise ImportError("Reading Parquet needs pyarrow (pip install pyarrow).") from e
+        batches = (b.to_pandas() for b in pq.ParquetFile(path).iter_batches(batch_size=chunksize, columns=[time_col, price_col]))
+    else:
+        batches = pd.read_csv(path, usecols=[time_col, price_col], chunksize=chunksize)
+
+    for frame in batches:
+        s = pd.Series(frame[price_col].to_numpy(dtype=float), index=pd.to_datetime(frame[time_col]), name="Close")
+        s = s.dropna()
+        if len(s):
+            yield s
+
+
+class _ChunkWriter:
+    """Appends output chunks to Parquet (pyarrow, one row group per chunk) or CSV."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.parquet = path.endswith(".parquet")
+        self._writer = None
+        self._header = True
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        if self.parquet:
+            try:
+                import pyarrow  # noqa: F401
+            except ImportError as e:
+                raise ImportError("Writing Parquet needs pyarrow (pip install pyarrow); use a .csv output instead.") from e
+
+    def write(self, out: pd.DataFrame) -> None:
+        out = out.rename_axis("timestamp").reset_index()
+        if self.parquet:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+
+            table = pa.Table.from_pandas(out, preserve_index=False)
+            if self._writer is None:
+                self._writer = pq.ParquetWriter(self.path, table.schema)
+            self._writer.write_table(table)
+        else:
+            out.to_csv(self.path, mode="w" if self._header else "a", header=self._header, index=False)
+            self._header = False
+
+    def close(self) -> None:
+        if self._writer is not None:
+            self._writer.close()
+
+
+def stream_overlay(
+    in_path: str,
+    out_path: str,
+    chunksize: int = 1_000_000,
+    time_col: str = "timestamp",
+    price_col: str = "close",
+    periods_per_year: float | None = None,
+    state: OverlayState | None = None,
+    **params,
+) -> OverlayState:
+    """
+    Run the complex overlay over a (possibly multi-GB) CSV / Parquet bar file chunk by chunk,
+    appending Close, ret, drawdown, overlay, exposure, turnover, strategy_ret and equity
+    columns to `out_path` (.parquet or .csv). Memory is bounded by `chunksize`.
+
+    Pass a saved `state` (OverlayState.load) to resume a stream; the final state is returned
+    so it can be saved for the next file. `periods_per_year` defaults to MINUTE_BARS_PER_YEAR
+    for a new state and to the state's own factor when resuming (a different value is rejected).
+    """
+    if state is None:
+        state = OverlayState(periods_per_year=MINUTE_BARS_PER_YEAR if periods_per_year is None else periods_per_year, **params)
+    elif periods_per_year is not None and not math.isclose(periods_per_year, state.periods_per_year):
+        raise ValueError(f"periods_per_year={periods_per_year} does not match the resumed state "
+                         f"({state.periods_per_year}).")
+    writer = _ChunkWriter(out_path)
+    try:
+        for close in iter_price_chunks(in_path, chunksize=chunksize, time_col=time_col, price_col=price_col):
+            writer.write(overlay_chunk(state, close))
+    finally:
+        writer.close()
+    return state
@@ -0,0 +1,155 @@
+# src/sweep.py
+from __future__ import annotations
+
+import inspect
+
+import numpy as np
+import pandas as pd
+
+from src.strategy import ANN, REBALANCE_SCHEDULES, compute_complex_agent_overlay, complex_overlay_matrix
+from src.metrics import (
+    total_return_matrix,
+    cagr_matrix,
+    max_drawdown_matrix,
+    sharpe_ratio_matrix,
+)
+
+# Tuning knobs of compute_complex_agent_overlay and their defaults (single source of truth)
+OVERLAY_DEFAULTS = {
+    name: p.default
+    for name, p in inspect.signature(compute_complex_agent_overlay).parameters.items()
+    if name != "df"
+}
+
+
+# ------------------------------------------------------------
+# Config handling
+# ------------------------------------------------------------
+def overlay_grid(**values) -> pd.DataFrame:
+    """
+    Cartesian product of parameter values, e.g. overlay_grid(floor=[0.1, 0.2], alpha=[0.4, 0.6]).
+    """
+    index = pd.MultiIndex.from_product(
+        [np.atleast_1d(v) for v in values.values()], names=list(values.keys())
+    )
+    return index.to_frame(index=False)
+
+
+def _normalize_configs(configs) -> pd.DataFrame:
+    """
+    Accept a DataFrame / list of dicts / dict of equal-length lists; fill missing knobs with defaults.
+    """
+    cfg = pd.DataFrame(configs).reset_index(drop=True)
+    unknown = set(cfg.columns) - set(OVERLAY_DEFAULTS)
+    if unknown:
+        raise ValueError(f"Unknown overlay parameters: {sorted(unknown)}")
+    for name, default in OVERLAY_DEFAULTS.items():
+        if name not in cfg.columns:
+            cfg[name] = default
+        else:  # list of dicts with different keys leaves NaN holes
+            cfg[name] = cfg[name].where(cfg[name].notna(), default)
+    cfg["vol_fast_span"] = cfg["vol_fast_span"].astype(int)
+    cfg["window_dvol"] = cfg["window_dvol"].astype(int)
+    cfg["rebalance_band"] = cfg["rebalance_band"].astype(float)
+    bad = set(cfg["rebalance"]) - set(REBALANCE_SCHEDULES)
+    if bad:
+        raise ValueError(f"Unknown rebalance schedules: {sorted(bad)}; choose from {REBALANCE_SCHEDULES}.")
+    return cfg[list(OVERLAY_DEFAULTS)]
+
+
+# ------------------------------------------------------------
+# Shared pieces (computed once per distinct window)
+# ------------------------------------------------------------
+def _sigma_fast(ret: pd.Series, span: int) -> np.ndarray:
+    return ret.ewm(span=int(span), adjust=False).std().to_numpy(dtype=float)
+
+
+def _downside_vol(ret: pd.Series, window: int) -> np.ndarray:
+    return (ret.clip(upper=0.0).rolling(int(window)).std() * np.sqrt(ANN)).to_numpy(dtype=float)
+
+
+# ------------------------------------------------------------
+# Sweep
+# ------------------------------------------------------------
+def sweep_complex_overlay(
+    df: pd.DataFrame,
+    configs,
+    rf_annual: float = 0.0,
+    chunk_size: int = 1000,
+) -> pd.DataFrame:
+    """
+    Evaluate many compute_complex_agent_overlay parameter sets at once.
+
+    Returns, drawdown, EWM sigma (per vol_fast_span) and downside vol (per window_dvol)
+    are computed once; overlays are evaluated as a (time x configs) matrix in chunks
+    of `chunk_size` configs (one rebalance schedule per chunk) to bound memory.
+
+    Returns: one row per config (input order) with its parameters and CAGR / Sharpe
+    (net and gross of costs) / MaxDD / turnover.
+    """
+    cfg = _normalize_configs(configs)
+
+    close = df["Close"].astype(float)
+    ret_s = close.pct_change()
+    ret = ret_s.to_numpy(dtype=float)[:, None]
+    drawdown = (close / close.cummax() - 1.0).to_numpy(dtype=float)[:, None]
+    years = (df.index[-1] - df.index[0]).days / 365.25 if len(df) >= 2 else 0.0
+
+    sigma_cache = {span: _sigma_fast(ret_s, span) for span in cfg["vol_fast_span"].unique()}
+    dvol_cache = {w: _downside_vol(ret_s, w) for w in cfg["window_dvol"].unique()}
+
+    matrix_params = [k for k in OVERLAY_DEFAULTS if k not in ("vol_fast_span", "window_dvol", "rebalance")]
+    results = []
+    for schedule, group in cfg.groupby("rebalance", sort=False):
+        for lo in range(0, len(group), chunk_size):
+            chunk = group.iloc[lo:lo + chunk_size]
+            sigma_fast = np.column_stack([sigma_cache[s] for s in chunk["vol_fast_span"]])
+            downside_vol = np.column_stack([dvol_cache[w] for w in chunk["window_dvol"]])
+
+            out = complex_overlay_matrix(
+                ret, drawdown, sigma_fast, downside_vol,
+                rebalance=schedule, dates=df.index,
+                **{k: chunk[k].to_numpy(dtype=float) for k in matrix_params},
+            )
+            exposure = out["exposure"]
+            trades = (np.abs(np.diff(exposure, axis=0)) > 1e-12)
+            trades &= ~np.isnan(exposure[1:]) & ~np.isnan(exposure[:-1])
+
+            res = chunk.copy()
+            res["TotalReturn"] = total_return_matrix(out["strategy_equity"])
+            res["CAGR"] = cagr_matrix(out["strategy_equity"], years)
+            res["Sharpe"] = sharpe_ratio_matrix(out["strategy_ret"], rf_annual=rf_annual)
+            res["Sharpe_gross"] = sharpe_ratio_matrix(exposure * ret, rf_annual=rf_annual)
+            res["MaxDD"] = max_drawdown_matrix(out["strategy_equity"])
+            res["Turnover"] = out["turnover"].sum(axis=0)
+            res["AnnualTurnover"] = res["Turnover"] / years if years > 0 else np.nan
+            res["Tcost_drag"] = (out["turnover"] * chunk["transaction_cost"].to_numpy(dtype=float)).sum(axis=0)
+            res["Rebalance_trades"] = trades.sum(axis=0)
+            res["AvgExposure"] = np.nanmean(exposure, axis=0)
+            results.append(res)
+
+    return pd.concat(results).sort_index().reset_index(drop=True)
+
+
+def compare_rebalance_schedules(
+    df: pd.DataFrame,
+    schedules=("daily", "weekly", "monthly"),
+    bands=(0.02, 0.05, 0.10),
+    rf_annual: float = 0.0,
+    **params,
+) -> pd.DataFrame:
+    """
+    Net Sharpe vs turnover for one overlay parameter set under each rebalance schedule
+    (plus the band schedule at each width in `bands`).
+
+    Returns: one row per schedule with Sharpe, Sharpe_gross, CAGR, MaxDD, Turnover,
+    AnnualTurnover, Tcost_drag and Rebalance_trades.
+    """
+    rows = [{**params, "rebalance": s} for s in schedules if s != "band"]
+    rows += [{**params, "rebalance": "band", "rebalance_band": b} for b in bands]
+    res = sweep_complex_overlay(df, rows, rf_annual=rf_annual)
+    cols = ["rebalance", "rebalance_band", "Sharpe", "Sharpe_gross", "CAGR", "MaxDD",
+            "Turnover", "AnnualTurnover", "Tcost_drag", "Rebalance_trades"]
+    res = res[cols].copy()
+    res.loc[res["rebalance"] != "band", "rebalance_band"] = np.nan
+    return res
@@ -8,7 +8,7 @@ import config
 from data import fetch_data
 from strategy import TurtleAgent
 from backtest import run_backtest
-from plotting import plot_performance_dashboard
+from dashboard import render_dashboard_html
 from report import save_reports
 
 def query_llm_professional(metrics, config, last_row):
@@ -63,12 +63,17 @@ def main():
     # 3. Backtest
     df_res, metrics = run_backtest(df_signaled, config)
     
-    # 4. Plots
-    c1, c2, c3, c4 = plot_performance_dashboard(df_res, output_dir="reports")
+    # 4. Plots (matplotlib is only imported for PNG charts)
+    c1 = c2 = c3 = c4 = charts_html = None
+    if config.REPORT_CHARTS == "png":
+        from plotting import plot_performance_dashboard
+        c1, c2, c3, c4 = plot_performance_dashboard(df_res, output_dir="reports")
+    else:
+        charts_html = render_dashboard_html(df_res, target_vol=config.VOL_TARGET)
     
     # 5. Report
     ai_commentary = query_llm_professional(metrics, config, df_res.iloc[-1])
-    save_reports(df_res, metrics, ai_commentary, config, c1, c2, c3, c4)
+    save_reports(df_res, metrics, ai_commentary, config, c1, c2, c3, c4, charts_html=charts_html)
     
     print("-" * 30)
     print(f"Strategy: {config.STRATEGY_NAME}")
@@ -0,0 +1,176 @@
+import numpy as np
+import pandas as pd
+
+def _as_matrix(data):
+    """Series / DataFrame / array -> (2-D float array, index, curve names)."""
+    if isinstance(data, pd.Series):
+        return data.to_numpy(dtype=float)[:, None], data.index, [data.name if data.name is not None else 0]
+    if isinstance(data, pd.DataFrame):
+        return data.to_numpy(dtype=float), data.index, list(data.columns)
+    values = np.asarray(data, dtype=float)
+    if values.ndim == 1:
+        values = values[:, None]
+    return values, pd.RangeIndex(len(values)), list(range(values.shape[1]))
+
+def run_lengths(mask):
+    """
+    Run-length encoding of True runs in a (time x curves) boolean array.
+    Returns: (start, end, curve) arrays ordered by curve then time,
+    end = last row of the run (inclusive).
+    """
+    mask = np.asarray(mask, dtype=bool)
+    if mask.ndim == 1:
+        mask = mask[:, None]
+    padded = np.zeros((mask.shape[0] + 2, mask.shape[1]), dtype=np.int8)
+    padded[1:-1] = mask
+    change = np.diff(padded, axis=0).T                  # +1 at run start, -1 just after run end
+    curve, start = np.nonzero(change == 1)
+    _, stop = np.nonzero(change == -1)
+    return start, stop - 1, curve
+
+def _segment_reduce(ufunc, values, curve, start, end):
+    """ufunc.reduce of values[start:end + 1, curve] for every segment (no Python loop)."""
+    n_rows = values.shape[0]
+    flat = np.append(values.T.ravel(), np.nan)          # column-major + sentinel for the last bound
+    bounds = np.empty(2 * len(start), dtype=np.int64)
+    bounds[0::2] = curve * n_rows + start
+    bounds[1::2] = curve * n_rows + end + 1
+    if len(bounds) == 0:
+        return np.empty(0)
+    return ufunc.reduceat(flat, bounds)[0::2]
+
+def trade_table(leverage, equity):
+    """
+    One row per trade (run of leverage > 0) for every curve.
+    Entry = first bar with a position, exit = first flat bar after it (or the last bar
+    if still open); pnl = equity[exit] / equity[entry] - 1. Same trades as the original
+    run_backtest bar loop: a position held from the first to the last bar has no entry
+    or exit and is not a trade.
+    MAE / MFE: worst / best equity inside the trade relative to the entry equity.
+    """
+    lev, _, _ = _as_matrix(leverage)
+    eq, index, names = _as_matrix(equity)
+    n_rows = lev.shape[0]
+
+    start, last, curve = run_lengths(lev > 0)
+    exit_ = np.minimum(last + 1, n_rows - 1)
+    # A position opened on the final bar has no exit yet; one held over the whole
+    # sample was never entered
+    keep = (start < n_rows - 1) & ~((start == 0) & (last == n_rows - 1))
+    start, last, exit_, curve = start[keep], last[keep], exit_[keep], curve[keep]
+
+    entry_eq = eq[start, curve]
+    trades = pd.DataFrame({
+        'curve': pd.Categorical.from_codes(curve, names),
+        'entry': index[start],
+        'exit': index[exit_],
+        'holding_bars': exit_ - start,
+        'pnl': eq[exit_, curve] / entry_eq - 1,
+        'mae': _segment_reduce(np.minimum, eq, curve, start, exit_) / entry_eq - 1,
+        'mfe': _segment_reduce(np.maximum, eq, curve, start, exit_) / entry_eq - 1,
+        'open': last == n_rows - 1,
+    })
+    return trades
+
+def drawdown_episodes(equity):
+    """
+    One row per drawdown episode (run of equity below its running peak) for every curve:
+    peak / trough / recovery dates, depth, bars to trough, bars to recovery and length.
+    While an episode is still open, recovery is NaT / NaN and length runs to the last bar.
+    """
+    eq, index, names = _as_matrix(equity)
+    n_rows = eq.shape[0]
+    dd = eq / np.fmax.accumulate(eq, axis=0) - 1.0
+
+    start, last, curve = run_lengths(dd < 0)
+    depth = _segment_reduce(np.minimum, dd, curve, start, last)
+
+    # Trough: first row in each episode where dd hits the episode depth
+    lengths = last - start + 1
+    episode_id = np.repeat(np.arange(len(start)), lengths)
+    rows = np.arange(lengths.sum()) - np.repeat(np.cumsum(lengths) - lengths, lengths) + np.repeat(start, lengths)
+    cols = np.repeat(curve, lengths)
+    at_depth = dd[rows, cols] == depth[episode_id]
+    _, first = np.unique(episode_id[at_depth], return_index=True)
+    trough = rows[at_depth][first]
+
+    recovered = last + 1 < n_rows
+    recovery = np.where(recovered, last + 1, -1)
+    peak = np.maximum(start - 1, 0)
+
+    return pd.DataFrame({
+        'curve': pd.Categorical.from_codes(curve, names),
+        'peak': index[peak],
+        'trough': index[trough],
+        'recovery': pd.Series(index[np.maximum(recovery, 0)]).where(recovered).values,
+        'depth': depth,
+        'bars_to_trough': trough - peak,
+        'bars_to_recovery': np.where(recovered, recovery - trough, np.nan),
+        'length': np.where(recovered, recovery, n_rows - 1) - peak,
+    })
+
+def _longest_streaks(mask, group, n_groups):
+    """Longest run of True per group; mask / group are 1-D and sorted by group (e.g. trade pnl)."""
+    mask = np.asarray(mask, dtype=bool)
+    longest = np.zeros(n_groups, dtype=np.int64)
+    if not mask.any():
+        return longest
+    prev_mask = np.r_[False, mask[:-1]]
+    new_group = np.r_[True, group[1:] != group[:-1]]
+    run_id = np.cumsum(mask & (~prev_mask | new_group)) - 1
+    lengths = np.bincount(run_id[mask])
+    run_group = group[mask][np.r_[0, np.flatnonzero(np.diff(run_id[mask])) + 1]]
+    np.maximum.at(longest, run_group, lengths)
+    return longest
+
+def streak_stats(values, names=None):
+    """
+    Longest winning / losing streaks (consecutive > 0 / < 0 values) per curve.
+    values: (time x curves) returns. Returns: DataFrame indexed by curve.
+    """
+    vals, _, default_names = _as_matrix(values)
+    names = default_names if names is None else names
+    out = {}
+    for label, mask in (('max_win_streak', vals > 0), ('max_loss_streak', vals < 0)):
+        start, last, curve = run_lengths(mask)
+        longest = np.zeros(vals.shape[1], dtype=np.int64)
+        np.maximum.at(longest, curve, last - start + 1)
+        out[label] = longest
+    return pd.DataFrame(out, index=names)
+
+def analyze_curves(leverage, equity, returns=None):
+    """
+    Trade, drawdown-episode and streak analytics for one or many curves in one call.
+    leverage / equity (/ returns): Series or (time x curves) DataFrames / arrays.
+    Returns: dict with 'trades', 'drawdowns' and 'summary' (one row per curve).
+    """
+    trades = trade_table(leverage, equity)
+    drawdowns = drawdown_episodes(equity)
+    eq, _, names = _as_matrix(equity)
+    if returns is None:
+        returns = np.vstack([np.zeros((1, eq.shape[1])), eq[1:] / eq[:-1] - 1])
+
+    summary = pd.DataFrame(index=pd.CategoricalIndex(names, categories=names, name='curve'))
+    by_curve = trades.groupby('curve', observed=False)
+    summary['total_trades'] = by_curve.size()
+    summary['hit_rate'] = (trades['pnl'] > 0).groupby(trades['curve'], observed=False).mean()
+    summary['avg_pnl'] = by_curve['pnl'].mean()
+    summary['avg_holding_bars'] = by_curve['holding_bars'].mean()
+    summary['worst_mae'] = by_curve['mae'].min()
+    summary['best_mfe'] = by_curve['mfe'].max()
+
+    dd_by_curve = drawdowns.groupby('curve', observed=False)
+    summary['max_drawdown'] = dd_by_curve['depth'].min().fillna(0.0)
+    summary['longest_drawdown_bars'] = dd_by_curve['length'].max().fillna(0).astype(int)
+    summary['n_drawdowns'] = dd_by_curve.size()
+
+    # Streaks of consecutive winning / losing trades and days
+    codes = trades['curve'].cat.codes.to_numpy()
+    summary['max_win_streak_trades'] = _longest_streaks(trades['pnl'].to_numpy() > 0, codes, len(names))
+    summary['max_loss_streak_trades'] = _longest_streaks(trades['pnl'].to_numpy() < 0, codes, len(names))
+    day_streaks = streak_stats(returns, names)
+    summary['max_win_streak_days'] = day_streaks['max_win_streak'].to_numpy()
+    summary['max_loss_streak_days'] = day_streaks['max_loss_streak'].to_numpy()
+
+    summary.index = pd.Index(names, name='curve')
+    return {'trades': trades, 'drawdowns': drawdowns, 'summary': summary}
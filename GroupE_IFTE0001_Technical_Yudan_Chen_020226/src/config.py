@@ -18,6 +18,18 @@ VOL_TARGET = 0.30      # Target 30% Volatility
 MAX_LEVERAGE = 1.5     
 VOL_LOOKBACK = 20
 
+# --- Reporting ---
+REPORT_CHARTS = "png"  # "png": matplotlib images (default), "svg": interactive client-side charts (no matplotlib)
+
 # --- Costs ---
 COST_BPS = 10 
-RISK_FREE_RATE = 0.04
\ No newline at end of file
+RISK_FREE_RATE = 0.04
+
+# --- Portfolio (multi-asset, src/portfolio.py) ---
+# Original Turtle rules: limits on units held in closely correlated markets and in total
+UNIT_VOL_TARGET = 0.10       # Volatility budget of one unit (one position)
+MAX_UNITS = 12               # Max total units across the portfolio
+MAX_CORRELATED_UNITS = 6     # Max units among closely correlated names
+CORR_THRESHOLD = 0.70        # "Closely correlated" above this pairwise correlation
+CORR_WINDOW = 126            # Lookback (days) for correlations, re-estimated monthly
+GROSS_LEVERAGE_CAP = 1.5     # Portfolio gross exposure cap
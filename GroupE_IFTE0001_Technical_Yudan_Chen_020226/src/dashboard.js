@@ -0,0 +1,194 @@
+/*
+ * Minimal SVG line / area charts for the trade note (no dependencies).
+ * Reads <script type="application/json" class="svg-dashboard-data"> payloads written by
+ * src/dashboard.py and draws them into the preceding <div class="svg-dashboard">.
+ * Series are delta-encoded integers: x_i = cumsum(d)_i / 10^e, null = missing.
+ */
+(function () {
+  "use strict";
+  if (window.__svgDashboard) return;  // the script may be inlined more than once
+  window.__svgDashboard = true;
+
+  var NS = "http://www.w3.org/2000/svg";
+  var W = 700, H = 210, M = { top: 28, right: 14, bottom: 22, left: 54 };
+  var FONT = "font-family:'Helvetica Neue',Arial,sans-serif;";
+
+  function decode(enc) {
+    var d = enc.d, out = new Array(d.length), acc = 0, scale = Math.pow(10, enc.e);
+    for (var i = 0; i < d.length; i++) {
+      if (d[i] === null) { out[i] = null; continue; }
+      acc += d[i];
+      out[i] = acc / scale;
+    }
+    return out;
+  }
+
+  function el(tag, attrs, parent, text) {
+    var node = document.createElementNS(NS, tag);
+    for (var k in attrs) if (attrs[k] !== undefined) node.setAttribute(k, attrs[k]);
+    if (text !== undefined) node.textContent = text;
+    if (parent) parent.appendChild(node);
+    return node;
+  }
+
+  function niceTicks(lo, hi, count) {
+    var span = hi - lo || Math.abs(hi) || 1;
+    var step = Math.pow(10, Math.floor(Math.log10(span / count)));
+    var err = span / count / step;
+    step *= err >= 7.5 ? 10 : err >= 3.5 ? 5 : err >= 1.5 ? 2 : 1;
+    var ticks = [];
+    for (var k = Math.ceil(lo / step - 1e-9); k * step <= hi + step * 1e-9; k++) ticks.push(k * step + 0);
+    return ticks;
+  }
+
+  function logTicks(lo, hi) {
+    var ticks = [];
+    for (var p = Math.floor(Math.log10(lo)); p <= Math.ceil(Math.log10(hi)); p++) {
+      [1, 2, 5].forEach(function (m) {
+        var t = m * Math.pow(10, p);
+        if (t >= lo && t <= hi) ticks.push(t);
+      });
+    }
+    return ticks;
+  }
+
+  function fmt(v, kind) {
+    if (v === 0) return kind === "%" ? "0%" : "0x";
+    if (kind === "%") return (v * 100).toFixed(Math.abs(v) < 0.1 && v !== 0 ? 1 : 0) + "%";
+    return (Math.abs(v) >= 10 ? v.toFixed(0) : Math.abs(v) >= 1 ? v.toFixed(1) : v.toFixed(2)) + "x";
+  }
+
+  function dateLabel(day) {
+    return new Date(day * 86400000).toISOString().slice(0, 10);
+  }
+
+  function drawChart(root, days, chart) {
+    var series = chart.series.map(function (s) { return { spec: s, y: decode(s.data) }; });
+    var hlines = chart.hlines || [];
+    var log = !!chart.log;
+
+    // Y domain (fills always include 0)
+    var lo = Infinity, hi = -Infinity;
+    series.forEach(function (s) {
+      s.y.forEach(function (v) { if (v !== null && (!log || v > 0)) { if (v < lo) lo = v; if (v > hi) hi = v; } });
+      if (s.spec.fill) { lo = Math.min(lo, 0); hi = Math.max(hi, 0); }
+    });
+    hlines.forEach(function (h) { lo = Math.min(lo, h.y); hi = Math.max(hi, h.y); });
+    if (!isFinite(lo)) { lo = 0; hi = 1; }
+    var tr = log ? function (v) { return Math.log10(v); } : function (v) { return v; };
+    var pad = (tr(hi) - tr(lo)) * 0.05 || 0.5;
+    var y0 = tr(lo) - (log || lo < 0 ? pad : 0), y1 = tr(hi) + (hi > 0 ? pad : 0);
+    var x0 = days[0], x1 = days[days.length - 1] === x0 ? x0 + 1 : days[days.length - 1];
+    var pw = W - M.left - M.right, ph = H - M.top - M.bottom;
+    function sx(d) { return M.left + (d - x0) / (x1 - x0) * pw; }
+    function sy(v) { return M.top + (1 - (tr(v) - y0) / (y1 - y0)) * ph; }
+
+    var svg = el("svg", { viewBox: "0 0 " + W + " " + H, width: "100%", style: "max-width:" + W + "px;display:block;margin:10px auto;" + FONT }, root);
+    el("text", { x: W / 2, y: 16, "text-anchor": "middle", "font-size": 12, "font-weight": "bold", fill: "#34495e" }, svg, chart.title);
+    el("text", { transform: "translate(12," + (M.top + ph / 2) + ") rotate(-90)", "text-anchor": "middle", "font-size": 9, fill: "#555" }, svg, chart.ylabel);
+
+    // Grid and axes
+    var yTicks = log ? logTicks(Math.pow(10, y0), Math.pow(10, y1)) : niceTicks(y0, y1, 5);
+    yTicks.forEach(function (t) {
+      var y = sy(t);
+      el("line", { x1: M.left, x2: W - M.right, y1: y, y2: y, stroke: "#000", "stroke-opacity": 0.08 }, svg);
+      el("text", { x: M.left - 5, y: y + 3, "text-anchor": "end", "font-size": 9, fill: "#555" }, svg, fmt(t, chart.fmt));
+    });
+    var firstYear = new Date(x0 * 86400000).getUTCFullYear(), lastYear = new Date(x1 * 86400000).getUTCFullYear();
+    var every = Math.max(1, Math.ceil((lastYear - firstYear + 1) / 10));
+    for (var yr = firstYear; yr <= lastYear; yr += every) {
+      var d = Date.UTC(yr, 0, 1) / 86400000;
+      if (d < x0 || d > x1) continue;
+      el("line", { x1: sx(d), x2: sx(d), y1: M.top, y2: M.top + ph, stroke: "#000", "stroke-opacity": 0.08 }, svg);
+      el("text", { x: sx(d), y: H - 6, "text-anchor": "middle", "font-size": 9, fill: "#555" }, svg, String(yr));
+    }
+    el("rect", { x: M.left, y: M.top, width: pw, height: ph, fill: "none", stroke: "#ccc" }, svg);
+
+    // Series: one path per contiguous run of valid points
+    var base = (log ? M.top + ph : sy(0)).toFixed(1);  // fills are drawn down / up to 0
+    series.forEach(function (s) {
+      var line = "", area = "", runStart = null, prevX = null;
+      for (var i = 0; i < days.length; i++) {
+        var v = s.y[i];
+        if (v === null || (log && v <= 0)) {
+          if (runStart !== null) area += "L" + prevX + "," + base + "Z";
+          runStart = null;
+          continue;
+        }
+        var px = sx(days[i]).toFixed(1), py = sy(v).toFixed(1);
+        if (runStart === null) {
+          line += "M" + px + "," + py;
+          area += "M" + px + "," + base + "L" + px + "," + py;
+          runStart = i;
+        } else {
+          line += "L" + px + "," + py;
+          area += "L" + px + "," + py;
+        }
+        prevX = px;
+      }
+      if (runStart !== null) area += "L" + prevX + "," + base + "Z";
+      var spec = s.spec;
+      if (spec.fill) el("path", { d: area, fill: spec.color, "fill-opacity": spec.fill, stroke: "none" }, svg);
+      if (spec.width !== 0) {
+        el("path", { d: line, fill: "none", stroke: spec.color, "stroke-width": spec.width || 1,
+                     "stroke-opacity": spec.opacity, "stroke-dasharray": spec.dash }, svg);
+      }
+    });
+    hlines.forEach(function (h) {
+      el("line", { x1: M.left, x2: W - M.right, y1: sy(h.y), y2: sy(h.y), stroke: h.color,
+                   "stroke-opacity": h.opacity, "stroke-dasharray": h.dash }, svg);
+    });
+
+    // Legend
+    if (chart.legend) {
+      var items = series.map(function (s) { return s.spec; }).concat(hlines);
+      var top = chart.legend.indexOf("upper") === 0, right = chart.legend.indexOf("right") > 0;
+      items.forEach(function (it, k) {
+        var lx = right ? W - M.right - 110 : M.left + 8;
+        var ly = top ? M.top + 12 + 12 * k : M.top + ph - 8 - 12 * (items.length - 1 - k);
+        el("line", { x1: lx, x2: lx + 16, y1: ly - 3, y2: ly - 3, stroke: it.color, "stroke-width": it.fill ? 6 : 1.5,
+                     "stroke-opacity": it.fill || it.opacity, "stroke-dasharray": it.dash }, svg);
+        el("text", { x: lx + 21, y: ly, "font-size": 9, fill: "#333" }, svg, it.name);
+      });
+    }
+
+    // Hover: nearest point, vertical guide and values
+    var guide = el("line", { y1: M.top, y2: M.top + ph, stroke: "#34495e", "stroke-opacity": 0.4, visibility: "hidden" }, svg);
+    var label = el("text", { y: M.top - 4, "font-size": 9, fill: "#34495e", visibility: "hidden" }, svg);
+    var hit = el("rect", { x: M.left, y: M.top, width: pw, height: ph, fill: "transparent" }, svg);
+    hit.addEventListener("mousemove", function (ev) {
+      var box = svg.getBoundingClientRect();
+      var day = x0 + ((ev.clientX - box.left) * W / box.width - M.left) / pw * (x1 - x0);
+      var a = 0, b = days.length - 1;
+      while (b - a > 1) { var mid = (a + b) >> 1; if (days[mid] < day) a = mid; else b = mid; }
+      var i = Math.abs(days[a] - day) <= Math.abs(days[b] - day) ? a : b;
+      var parts = [dateLabel(days[i])];
+      series.forEach(function (s) { if (s.y[i] !== null) parts.push(s.spec.name + " " + fmt(s.y[i], chart.fmt)); });
+      var px = sx(days[i]);
+      guide.setAttribute("x1", px); guide.setAttribute("x2", px); guide.setAttribute("visibility", "visible");
+      label.textContent = parts.join("   ");
+      label.setAttribute("x", px > W / 2 ? px - 4 : px + 4);
+      label.setAttribute("text-anchor", px > W / 2 ? "end" : "start");
+      label.setAttribute("visibility", "visible");
+    });
+    hit.addEventListener("mouseleave", function () {
+      guide.setAttribute("visibility", "hidden");
+      label.setAttribute("visibility", "hidden");
+    });
+  }
+
+  function renderAll() {
+    var blocks = document.querySelectorAll("script.svg-dashboard-data");
+    for (var b = 0; b < blocks.length; b++) {
+      var root = blocks[b].previousElementSibling;
+      if (!root || root.getAttribute("data-rendered")) continue;
+      var payload = JSON.parse(blocks[b].textContent);
+      var days = decode(payload.x);
+      payload.charts.forEach(function (chart) { drawChart(root, days, chart); });
+      root.setAttribute("data-rendered", "1");
+    }
+  }
+
+  if (document.readyState === "loading") document.addEventListener("DOMContentLoaded", renderAll);
+  else renderAll();
+})();
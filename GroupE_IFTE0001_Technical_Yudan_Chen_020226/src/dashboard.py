@@ -0,0 +1,137 @@
+import json
+import os
+import numpy as np
+import pandas as pd
+
+# Same palette as plotting.py (Navy/Grey Theme)
+COLOR_STRAT = "#1F618D"
+COLOR_BENCH = "#95A5A6"
+COLOR_DD    = "#C0392B"
+COLOR_VOL   = "#34495E"
+COLOR_LEV   = "#1F618D"
+
+SCRIPT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "dashboard.js")
+
+def _first_argmin(values, bucket, bucket_start):
+    """Row of the (first) minimum of values in every bucket; bucket ids are sorted."""
+    mins = np.minimum.reduceat(values, bucket_start)
+    hits = np.flatnonzero(values == mins[bucket])
+    _, first = np.unique(bucket[hits], return_index=True)
+    return hits[first]
+
+def _bucket_extremes(columns, n, n_buckets):
+    """Sorted unique rows: first / last row plus the min and max row of every series in every bucket."""
+    bucket = np.arange(n) * n_buckets // n
+    bucket_start = np.flatnonzero(np.r_[True, bucket[1:] != bucket[:-1]])
+    bucket = np.cumsum(np.r_[False, bucket[1:] != bucket[:-1]])  # 0..n_used-1, indexes bucket_start
+    keep = [np.array([0, n - 1])]
+    for values in columns:
+        values = np.asarray(values, dtype=float)
+        # NaNs are never picked as an extreme (unless the whole bucket is NaN)
+        keep.append(_first_argmin(np.where(np.isnan(values), np.inf, values), bucket, bucket_start))
+        keep.append(_first_argmin(np.where(np.isnan(values), np.inf, -values), bucket, bucket_start))
+    return np.unique(np.concatenate(keep))
+
+def decimation_index(columns, max_points=1500):
+    """
+    Rows to keep so every series still shows its peaks and troughs: the rows are cut
+    into buckets and the min and max row of each series in each bucket (plus the first
+    and last row) are kept. The bucket count is the largest that keeps the combined rows
+    within max_points (found by bisection; series often share extremes).
+    Returns: at most max_points sorted row indices (for max_points >= 2 + 2 * len(columns)).
+    """
+    n = len(columns[0])
+    if n <= max_points:
+        return np.arange(n)
+
+    # Worst case 2 rows per series per bucket: lo buckets always fit, hi is the upper limit
+    lo = max(1, (max_points - 2) // (2 * len(columns)))
+    hi = max(lo, max_points // 2)
+    best = _bucket_extremes(columns, n, lo)
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        rows = _bucket_extremes(columns, n, mid)
+        if len(rows) <= max_points:
+            lo, best = mid, rows
+        else:
+            hi = mid - 1
+    return best
+
+def encode_series(values, digits=5):
+    """
+    Compact JSON encoding: values are cast to float32, quantized to `digits` significant
+    digits (integers at scale 10**e) and delta-encoded, so most entries are short integers.
+    NaN -> null (the next delta continues from the last valid value).
+    Decode: x_i = cumsum(d)_i / 10**e.
+    """
+    values = np.asarray(values, dtype=np.float32).astype(float)
+    valid = np.isfinite(values)
+    peak = np.abs(values[valid]).max() if valid.any() else 0.0
+    exponent = digits - 1 - (int(np.floor(np.log10(peak))) if peak > 0 else 0)
+    scale = 10.0 ** exponent
+
+    q = np.round(values[valid] * scale).astype(np.int64)
+    deltas = np.full(len(values), None, dtype=object)
+    deltas[valid] = np.diff(q, prepend=0).tolist()
+    return {'e': exponent, 'd': deltas.tolist()}
+
+def build_dashboard_payload(df, target_vol=0.30, max_points=1500, digits=5):
+    """
+    Decimated, encoded series for the four dashboard panels
+    (same content as plot_performance_dashboard).
+    """
+    dd_strat = (df['strategy_equity'] / df['strategy_equity'].cummax()) - 1
+    dd_bench = (df['benchmark_equity'] / df['benchmark_equity'].cummax()) - 1
+    vol_strat = df['strategy_returns'].rolling(20).std() * (252**0.5)
+
+    series = {
+        'strategy_equity': df['strategy_equity'].values,
+        'benchmark_equity': df['benchmark_equity'].values,
+        'dd_strat': dd_strat.values,
+        'dd_bench': dd_bench.values,
+        'vol_strat': vol_strat.values,
+        'leverage': df['leverage'].values,
+    }
+    rows = decimation_index(list(series.values()), max_points=max_points)
+    dates = pd.to_datetime(df['Date']).values[rows].astype('datetime64[D]').astype(np.int64)
+    enc = {name: encode_series(values[rows], digits) for name, values in series.items()}
+
+    return {
+        'x': {'e': 0, 'd': np.diff(dates, prepend=0).tolist()},  # days since 1970-01-01
+        'charts': [
+            {'title': "Equity Growth (Log Scale)", 'ylabel': "Multiple", 'log': True, 'fmt': "x", 'legend': "upper left",
+             'series': [
+                 {'name': "Enhanced Turtle", 'data': enc['strategy_equity'], 'color': COLOR_STRAT, 'width': 1.2},
+                 {'name': "Benchmark", 'data': enc['benchmark_equity'], 'color': COLOR_BENCH, 'width': 1, 'opacity': 0.6, 'dash': "4 3"},
+             ]},
+            {'title': "Drawdown Risk Profile", 'ylabel': "Depth", 'fmt': "%", 'legend': "lower left",
+             'series': [
+                 {'name': "Benchmark", 'data': enc['dd_bench'], 'color': COLOR_BENCH, 'fill': 0.2, 'width': 0},
+                 {'name': "Strategy", 'data': enc['dd_strat'], 'color': COLOR_DD, 'fill': 0.6, 'width': 0},
+             ]},
+            {'title': "Volatility Control", 'ylabel': "Ann. Vol", 'fmt': "%", 'legend': "upper right",
+             'series': [
+                 {'name': "Realized Vol", 'data': enc['vol_strat'], 'color': COLOR_VOL, 'width': 1},
+             ],
+             'hlines': [{'name': f"Target ({target_vol:.0%})", 'y': target_vol, 'color': "#2c3e50", 'opacity': 0.5, 'dash': "1 3"}]},
+            {'title': "Active Position Exposure", 'ylabel': "Lev (x)", 'fmt': "x",
+             'series': [
+                 {'name': "Leverage", 'data': enc['leverage'], 'color': COLOR_LEV, 'width': 1, 'fill': 0.1},
+             ]},
+        ],
+    }
+
+def render_dashboard_html(df, target_vol=0.30, max_points=1500, digits=5):
+    """
+    HTML fragment with the four dashboard panels drawn client-side as SVG
+    (no matplotlib, no images): the decimated data as JSON plus the inlined src/dashboard.js.
+    """
+    payload = json.dumps(build_dashboard_payload(df, target_vol, max_points, digits), separators=(',', ':'))
+    payload = payload.replace("</", "<\\/")  # keep the JSON from closing the <script> tag
+    with open(SCRIPT_PATH, "r", encoding="utf-8") as f:
+        script = f.read()
+    return (
+        '<div class="svg-dashboard" style="margin: 15px 0;"></div>\n'
+        f'<script type="application/json" class="svg-dashboard-data">{payload}</script>\n'
+        f'<script>{script}</script>'
+    )
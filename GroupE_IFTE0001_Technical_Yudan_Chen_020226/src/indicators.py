@@ -1,6 +1,14 @@
+from collections import deque
+
 import numpy as np
 import pandas as pd
 
+# Optional JIT backend for the batched Donchian pass (NumPy sparse table otherwise)
+try:
+    import numba
+except ImportError:
+    numba = None
+
 def calculate_rolling_volatility(returns_series, window=20, ann_factor=252):
     """
     Calculate annualized rolling volatility.
@@ -15,3 +23,146 @@ def calculate_sma(series, window=200):
     """
     return series.rolling(window=window).mean()
 
+
+class DonchianChannel:
+    """
+    Incremental Donchian channel (rolling max / min of the last `window` values).
+    Two monotonic deques of (position, value) give amortized O(1) updates.
+    Read upper/lower BEFORE update() to get the Turtle breakout levels for the
+    new bar (same as rolling().max().shift(1)).
+    """
+    def __init__(self, window):
+        self.window = int(window)
+        self.n = 0
+        self.max_q = deque()   # values decreasing from head to tail
+        self.min_q = deque()   # values increasing from head to tail
+
+    def update(self, value):
+        """Push one value. Returns (upper, lower) including it (NaN during warm-up)."""
+        i = self.n
+        while self.max_q and self.max_q[-1][1] <= value:
+            self.max_q.pop()
+        self.max_q.append((i, value))
+        while self.min_q and self.min_q[-1][1] >= value:
+            self.min_q.pop()
+        self.min_q.append((i, value))
+        # Drop positions that left the window
+        if self.max_q[0][0] <= i - self.window:
+            self.max_q.popleft()
+        if self.min_q[0][0] <= i - self.window:
+            self.min_q.popleft()
+        self.n += 1
+        return self.upper, self.lower
+
+    @property
+    def upper(self):
+        return self.max_q[0][1] if self.n >= self.window else np.nan
+
+    @property
+    def lower(self):
+        return self.min_q[0][1] if self.n >= self.window else np.nan
+
+def _donchian_sparse_table(values, windows):
+    """
+    NumPy fallback: sparse table of max/min over power-of-two spans, then each
+    window is the max/min of two overlapping spans (exact, fully vectorized).
+    """
+    n = len(values)
+    upper = np.full((n, len(windows)), np.nan)
+    lower = np.full((n, len(windows)), np.nan)
+    max_levels, min_levels = [values], [values]
+    span = 1
+    while span * 2 <= max(windows, default=1) and span * 2 <= n:
+        max_levels.append(np.maximum(max_levels[-1][:-span], max_levels[-1][span:]))
+        min_levels.append(np.minimum(min_levels[-1][:-span], min_levels[-1][span:]))
+        span *= 2
+    for k, w in enumerate(windows):
+        if w > n:
+            continue
+        level = int(np.floor(np.log2(w)))
+        span = 1 << level
+        starts = np.arange(0, n - w + 1)      # window [s, s + w - 1] ends at row s + w - 1
+        upper[w - 1:, k] = np.maximum(max_levels[level][starts], max_levels[level][starts + w - span])
+        lower[w - 1:, k] = np.minimum(min_levels[level][starts], min_levels[level][starts + w - span])
+    return upper, lower
+
+def _donchian_multi_loop(values, windows):
+    """
+    One pass over time with a single max deque and min deque sized for the largest
+    window; each window's extreme is the oldest deque entry still inside it.
+    Windows are visited shortest first, so one pointer walks back from the deque
+    tail for all of them. Compiled with numba when available.
+    """
+    n = len(values)
+    n_w = len(windows)
+    upper = np.full((n, n_w), np.nan)
+    lower = np.full((n, n_w), np.nan)
+    order = np.argsort(windows)
+    max_w = windows[order[n_w - 1]] if n_w > 0 else 0
+    max_q = np.empty(n, dtype=np.int64)
+    min_q = np.empty(n, dtype=np.int64)
+    max_h, max_e, min_h, min_e = 0, 0, 0, 0
+    for t in range(n):
+        x = values[t]
+        while max_e > max_h and values[max_q[max_e - 1]] <= x:
+            max_e -= 1
+        max_q[max_e] = t
+        max_e += 1
+        while min_e > min_h and values[min_q[min_e - 1]] >= x:
+            min_e -= 1
+        min_q[min_e] = t
+        min_e += 1
+        while max_q[max_h] <= t - max_w:
+            max_h += 1
+        while min_q[min_h] <= t - max_w:
+            min_h += 1
+        p_max = max_e - 1
+        p_min = min_e - 1
+        for o in range(n_w):
+            k = order[o]
+            w = windows[k]
+            if t < w - 1:
+                break
+            start = t - w + 1
+            while p_max > max_h and max_q[p_max - 1] >= start:
+                p_max -= 1
+            while p_min > min_h and min_q[p_min - 1] >= start:
+                p_min -= 1
+            upper[t, k] = values[max_q[p_max]]
+            lower[t, k] = values[min_q[p_min]]
+    return upper, lower
+
+if numba is not None:
+    _donchian_multi_jit = numba.njit(cache=True)(_donchian_multi_loop)
+else:
+    _donchian_multi_jit = None
+
+def donchian_channels(series, windows, use_numba=None):
+    """
+    Donchian channels for many windows at once (e.g. range(10, 101)).
+    series: price series / 1-D array without NaNs (ValueError otherwise). windows: int or list of ints.
+    use_numba: None = one-pass deque kernel if numba is installed, False = NumPy sparse table.
+    Returns: (upper, lower) DataFrames (time x window); a single int window gives Series.
+    Same values as rolling(w).max() / rolling(w).min(); shift(1) for breakout levels.
+    """
+    single = np.isscalar(windows)
+    windows = [int(windows)] if single else [int(w) for w in windows]
+    index = series.index if isinstance(series, pd.Series) else None
+    values = np.ascontiguousarray(np.asarray(series, dtype=float))
+    if np.isnan(values).any():
+        raise ValueError("donchian_channels does not support NaN prices; drop or fill them first.")
+
+    if use_numba is None:
+        use_numba = _donchian_multi_jit is not None
+    if use_numba:
+        if _donchian_multi_jit is None:
+            raise ImportError("numba is not installed; use use_numba=False for the NumPy path.")
+        upper, lower = _donchian_multi_jit(values, np.asarray(windows, dtype=np.int64))
+    else:
+        upper, lower = _donchian_sparse_table(values, windows)
+
+    upper = pd.DataFrame(upper, index=index, columns=windows)
+    lower = pd.DataFrame(lower, index=index, columns=windows)
+    if single:
+        return upper.iloc[:, 0], lower.iloc[:, 0]
+    return upper, lower
@@ -0,0 +1,131 @@
+import numpy as np
+import pandas as pd
+from strategy import compute_turtle_panel
+from backtest import get_metrics
+
+def _correlation_blocks(returns, window):
+    """
+    Month-by-month blocks of rows with the correlation matrix estimated on the
+    `window` days BEFORE each block starts (no look-ahead).
+    Returns: list of (start_row, end_row, corr or None during warm-up).
+    """
+    month = returns.index.to_period('M').asi8 if isinstance(returns.index, pd.DatetimeIndex) else np.arange(len(returns)) // 21
+    starts = np.flatnonzero(np.r_[True, month[1:] != month[:-1]])
+    ends = np.r_[starts[1:], len(returns)]
+    values = returns.values
+
+    blocks = []
+    for start, end in zip(starts, ends):
+        if start < window:
+            blocks.append((start, end, None))
+            continue
+        hist = values[start - window:start]
+        z = hist - hist.mean(axis=0)
+        std = z.std(axis=0, ddof=1)
+        # Names without history (flat / not yet listed) get zero correlation
+        z = np.divide(z, std, out=np.zeros_like(z), where=std > 0)
+        blocks.append((start, end, (z.T @ z) / (window - 1)))
+    return blocks
+
+def correlated_unit_scale(active, returns, window, threshold, max_correlated_units):
+    """
+    Correlation-aware unit limit (Turtle rule: at most `max_correlated_units` units
+    in closely correlated markets). For each active name, count the active names
+    correlated above `threshold` with it (itself included); if the count exceeds the
+    limit, every name in that group is scaled by limit / count.
+    active: (time x ticker) 0/1 array. Returns: (time x ticker) scale in [0, 1].
+    """
+    scale = np.ones(active.shape)
+    for start, end, corr in _correlation_blocks(returns, window):
+        if corr is None:
+            continue
+        close_pairs = (corr > threshold).astype(float)
+        np.fill_diagonal(close_pairs, 1.0)
+        # One matrix product per month gives the correlated active count for every day
+        n_correlated = active[start:end] @ close_pairs
+        scale[start:end] = np.minimum(1.0, max_correlated_units / np.maximum(n_correlated, 1.0))
+    return scale * active
+
+def run_portfolio_backtest(close, config):
+    """
+    Multi-asset Turtle backtest on aligned (dates x tickers) arrays.
+    1. TurtleAgent signals for every name (compute_turtle_panel).
+    2. Units: 1 per active name, scaled by the correlation-aware unit limit, then
+       by MAX_UNITS in total.
+    3. Sizing: each unit targets UNIT_VOL_TARGET (capped at MAX_LEVERAGE per name),
+       then the book is scaled down to GROSS_LEVERAGE_CAP.
+    4. Lag (Trade T+1), financing on the cash weight and turnover costs, as run_backtest.
+    close: wide DataFrame of adjusted closes (NaN before listing / after delisting;
+    a position is flattened on the first NaN close).
+    Returns: dict with 'portfolio' (daily DataFrame), 'weights', 'units' and 'metrics'.
+    """
+    close = close.astype(float)
+    panel = compute_turtle_panel(close, config)
+    returns = panel['returns']
+    daily_rf = config.RISK_FREE_RATE / 252
+    listed = close.notna().values
+
+    # 1. Signals (decided at the close of day t); a NaN close never fires an exit,
+    # so the latched state is cleared wherever the name is not listed
+    active = panel['signal_state'].values * listed
+
+    # 2. Units: correlation-aware limit, then total unit limit
+    units = correlated_unit_scale(active, returns, config.CORR_WINDOW, config.CORR_THRESHOLD,
+                                  config.MAX_CORRELATED_UNITS)
+    total_units = units.sum(axis=1, keepdims=True)
+    units = units * np.minimum(1.0, config.MAX_UNITS / np.maximum(total_units, 1e-12))
+
+    # 3. Volatility Sizing per unit, per-name cap, portfolio gross cap
+    vol = panel['vol'].values
+    with np.errstate(divide='ignore', invalid='ignore'):
+        unit_weight = np.where(listed & (vol > 0), config.UNIT_VOL_TARGET / vol, 0.0)
+    weights = np.minimum(units * unit_weight, config.MAX_LEVERAGE)
+    gross = weights.sum(axis=1, keepdims=True)
+    weights = weights * np.minimum(1.0, config.GROSS_LEVERAGE_CAP / np.maximum(gross, 1e-12))
+
+    # 4. Lag (Trade T+1)
+    weights = np.vstack([np.zeros((1, weights.shape[1])), weights[:-1]])
+    units = np.vstack([np.zeros((1, units.shape[1])), units[:-1]])
+
+    # 5. Returns: stock book, financing / idle cash, transaction costs (matrix ops)
+    ret = returns.values
+    gross = weights.sum(axis=1)
+    stock_component = (weights * ret).sum(axis=1)
+    cash_component = (1.0 - gross) * daily_rf
+    turnover = np.abs(np.diff(weights, axis=0, prepend=0.0)).sum(axis=1)
+    cost_drag = turnover * (config.COST_BPS / 10000)
+    strategy_returns = stock_component + cash_component - cost_drag
+
+    # Benchmark: equal-weight buy & hold of the names listed each day
+    benchmark_returns = np.where(listed, ret, 0.0).sum(axis=1) / np.maximum(listed.sum(axis=1), 1)
+
+    portfolio = pd.DataFrame({
+        'stock_component': stock_component,
+        'cash_component': cash_component,
+        'gross_leverage': gross,
+        'units': units.sum(axis=1),
+        'n_positions': (weights > 0).sum(axis=1),
+        'turnover': turnover,
+        'cost_drag': cost_drag,
+        'strategy_returns': strategy_returns,
+        'benchmark_returns': benchmark_returns,
+    }, index=close.index)
+    portfolio['strategy_equity'] = (1 + portfolio['strategy_returns']).cumprod()
+    portfolio['benchmark_equity'] = (1 + portfolio['benchmark_returns']).cumprod()
+
+    s_cagr, s_mdd, s_sharpe, s_calmar = get_metrics(portfolio['strategy_returns'], portfolio['strategy_equity'], config.RISK_FREE_RATE)
+    b_cagr, b_mdd, b_sharpe, b_calmar = get_metrics(portfolio['benchmark_returns'], portfolio['benchmark_equity'], config.RISK_FREE_RATE)
+    metrics = {
+        'strat_cagr': s_cagr, 'strat_max_dd': s_mdd, 'strat_sharpe': s_sharpe, 'strat_calmar': s_calmar,
+        'bh_cagr': b_cagr, 'bh_max_dd': b_mdd, 'bh_sharpe': b_sharpe, 'bh_calmar': b_calmar,
+        'avg_gross_leverage': float(gross.mean()), 'avg_positions': float(portfolio['n_positions'].mean()),
+        'annual_turnover': float(turnover.sum() / max(len(turnover) / 252, 1e-12)),
+        'total_cost_drag': float(cost_drag.sum()),
+    }
+
+    return {
+        'portfolio': portfolio,
+        'weights': pd.DataFrame(weights, index=close.index, columns=close.columns),
+        'units': pd.DataFrame(units, index=close.index, columns=close.columns),
+        'metrics': metrics,
+    }
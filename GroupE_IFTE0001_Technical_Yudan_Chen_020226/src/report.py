@@ -20,7 +20,12 @@ def clean_html_for_md(html_text):
     text = text.replace("&nbsp;", " ")         # Fix spaces
     return text.strip()
 
-def save_reports(df, metrics, ai_commentary, config, path1, path2, path3, path4):
+def save_reports(df, metrics, ai_commentary, config, path1=None, path2=None, path3=None, path4=None, charts_html=None):
+    """
+    Writes trade_note.html / trade_note.md and the trades log.
+    Charts: either the four PNG paths (base64-inlined) or charts_html from
+    dashboard.render_dashboard_html (client-side SVG, much smaller).
+    """
     if not os.path.exists("reports"): os.makedirs("reports")
     
     # CSV Log
@@ -129,10 +134,7 @@ def save_reports(df, metrics, ai_commentary, config, path1, path2, path3, path4)
             <div class="ai-commentary">{ai_commentary}</div>
 
             <h2>4. Visual Evidence</h2>
-            {get_img_tag(path1)}
-            {get_img_tag(path2)}
-            {get_img_tag(path3)}
-            {get_img_tag(path4)}
+            {charts_html or ''.join(get_img_tag(p) for p in (path1, path2, path3, path4))}
             
             <div style="margin-top:20px; padding-top:10px; border-top:1px solid #eee; font-size:10px; color:#999;">
                 <strong>DISCLAIMER:</strong> This report is generated by an autonomous AI agent for educational purposes (MSc Coursework). 
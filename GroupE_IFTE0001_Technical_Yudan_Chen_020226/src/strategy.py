@@ -2,6 +2,130 @@ import numpy as np
 import pandas as pd
 from indicators import calculate_rolling_volatility, calculate_sma
 
+# Optional JIT backend for custom state rules (plain Python loop otherwise)
+try:
+    import numba
+except ImportError:
+    numba = None
+
+def turtle_events(close, upper, lower, sma):
+    """
+    Entry / exit events of the Turtle rules (1-D or 2-D time x ticker arrays).
+    Entry: Breakout AND Bull Regime. Exit: Breakdown OR Bear Regime (Hard Stop).
+    NaN indicators (warm-up) never fire an event.
+    """
+    with np.errstate(invalid='ignore'):
+        entry = (close > upper) & (close > sma)
+        exit_ = (close < lower) | (close < sma)
+    return entry, exit_
+
+def latch_signals(entry, exit_, initial=0.0):
+    """
+    Event-driven latch, equivalent to the bar-by-bar state loop:
+    state = 1 on an entry event, 0 on an exit event (entry wins if both fire),
+    otherwise the last event is carried forward. Row 0 holds the initial state.
+    entry / exit_: boolean 1-D or 2-D (time x ticker) arrays.
+    """
+    entry = np.asarray(entry, dtype=bool)
+    exit_ = np.asarray(exit_, dtype=bool)
+    is_1d = entry.ndim == 1
+    if is_1d:
+        entry, exit_ = entry[:, None], exit_[:, None]
+
+    # 1. Mark events (NaN = no event)
+    events = np.where(entry, 1.0, np.where(exit_, 0.0, np.nan))
+    if len(events) == 0:
+        return events[:, 0] if is_1d else events
+    events[0] = initial
+
+    # 2. Forward-fill the last event along time
+    rows = np.arange(len(events))[:, None]
+    last_event = np.maximum.accumulate(np.where(np.isnan(events), 0, rows), axis=0)
+    state = np.take_along_axis(events, last_event, axis=0)
+    return state[:, 0] if is_1d else state
+
+def turtle_rule(state, t, j, inputs):
+    """
+    Turtle state rule for run_state_machine (reference for custom rules).
+    inputs = (close, upper, lower, sma) as 2-D (time x ticker) arrays.
+    """
+    close, upper, lower, sma = inputs
+    c = close[t, j]
+    if c > upper[t, j] and c > sma[t, j]:
+        return 1.0
+    elif c < lower[t, j] or c < sma[t, j]:
+        return 0.0
+    return state
+
+def _state_machine_loop(rule, inputs, initial):
+    """Scalar driver (compiled with numba when available)."""
+    n_rows, n_cols = inputs[0].shape
+    states = np.empty((n_rows, n_cols))
+    for j in range(n_cols):
+        state = initial
+        if n_rows > 0:
+            states[0, j] = state
+        for t in range(1, n_rows):
+            state = rule(state, t, j, inputs)
+            states[t, j] = state
+    return states
+
+if numba is not None:
+    _state_machine_jit = numba.njit(_state_machine_loop)
+else:
+    _state_machine_jit = None
+
+# Compiled custom rules, so repeated calls do not recompile
+_jit_rules = {}
+
+def run_state_machine(rule, inputs, initial=0.0, use_numba=None):
+    """
+    Run an arbitrary path-dependent state rule over (time x ticker) arrays.
+    rule(state, t, j, inputs) -> new state, applied from row 1 on (row 0 = initial).
+    inputs: tuple of equally shaped 2-D float arrays.
+    use_numba: None = compile rule + driver with numba if installed, False = Python loop.
+    """
+    inputs = tuple(np.ascontiguousarray(np.asarray(x, dtype=float)) for x in inputs)
+    if use_numba is None:
+        use_numba = _state_machine_jit is not None
+    if use_numba:
+        if _state_machine_jit is None:
+            raise ImportError("numba is not installed; use use_numba=False for the Python loop.")
+        if not hasattr(rule, 'py_func'):  # not yet a numba dispatcher
+            if rule not in _jit_rules:
+                _jit_rules[rule] = numba.njit(rule)
+            rule = _jit_rules[rule]
+        return _state_machine_jit(rule, inputs, float(initial))
+    return _state_machine_loop(rule, inputs, float(initial))
+
+def compute_turtle_panel(close, config):
+    """
+    TurtleAgent.generate_signals for a whole universe in one call.
+    close: wide DataFrame (dates x tickers).
+    Returns: dict of wide DataFrames with the same names as the single-ticker columns.
+    """
+    close = close.astype(float)
+    returns = close.pct_change().fillna(0)
+
+    # 1. Indicators
+    sma = calculate_sma(close, config.SMA_WINDOW)
+    vol = calculate_rolling_volatility(returns, window=config.VOL_LOOKBACK)
+    upper = close.rolling(window=config.ENTRY_WINDOW).max().shift(1)
+    lower = close.rolling(window=config.EXIT_WINDOW).min().shift(1)
+
+    # 2. Signal Logic (event latch)
+    entry, exit_ = turtle_events(close.values, upper.values, lower.values, sma.values)
+    signal_state = pd.DataFrame(latch_signals(entry, exit_), index=close.index, columns=close.columns)
+
+    # 3-5. Volatility Sizing, Leverage cap, Lag (Trade T+1)
+    raw_leverage = (config.VOL_TARGET / vol).replace([np.inf, -np.inf], 0).fillna(0)
+    leverage = (raw_leverage * signal_state).clip(upper=config.MAX_LEVERAGE).shift(1).fillna(0)
+
+    return {
+        'returns': returns, 'sma_200': sma, 'vol': vol, 'upper_20': upper, 'lower_10': lower,
+        'signal_state': signal_state, 'raw_leverage': raw_leverage, 'leverage': leverage,
+    }
+
 class TurtleAgent:
     """
     Logic:
@@ -13,43 +137,9 @@ class TurtleAgent:
         self.df = df.copy()
 
     def generate_signals(self, config):
-        # 1. Indicators
-        self.df['sma_200'] = calculate_sma(self.df['Close'], config.SMA_WINDOW)
-        self.df['vol'] = calculate_rolling_volatility(self.df['returns'], window=config.VOL_LOOKBACK)
-        
-        # Donchian Channels
-        self.df['upper_20'] = self.df['Close'].rolling(window=config.ENTRY_WINDOW).max().shift(1)
-        self.df['lower_10'] = self.df['Close'].rolling(window=config.EXIT_WINDOW).min().shift(1)
-        
-        # 2. Signal Logic
-        signals = np.zeros(len(self.df))
-        state = 0 # 0=Cash, 1=Long
-        
-        close = self.df['Close'].values
-        upper = self.df['upper_20'].values
-        lower = self.df['lower_10'].values
-        sma = self.df['sma_200'].values
-        
-        for i in range(1, len(self.df)):
-            # Entry: Breakout AND Bull Regime
-            if close[i] > upper[i] and close[i] > sma[i]:
-                state = 1
-            # Exit: Breakdown OR Bear Regime (Hard Stop)
-            elif close[i] < lower[i] or close[i] < sma[i]:
-                state = 0
-            
-            signals[i] = state
-            
-        self.df['signal_state'] = signals
-
-        # 3. Volatility Sizing
-        self.df['raw_leverage'] = (config.VOL_TARGET / self.df['vol']).replace([np.inf, -np.inf], 0).fillna(0)
-        
-        # 4. Apply Leverage
-        self.df['leverage'] = self.df['raw_leverage'] * self.df['signal_state']
-        self.df['leverage'] = self.df['leverage'].clip(upper=config.MAX_LEVERAGE)
-        
-        # 5. Lag (Trade T+1)
-        self.df['leverage'] = self.df['leverage'].shift(1).fillna(0)
-        
-        return self.df
\ No newline at end of file
+        # Same computation as the universe version, on a one-column panel
+        panel = compute_turtle_panel(self.df[['Close']], config)
+        for name, values in panel.items():
+            if name != 'returns':  # keep the returns the data loader computed
+                self.df[name] = values['Close']
+        return self.df
@@ -0,0 +1,70 @@
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import config
+from analytics import trade_table
+from backtest import run_backtest
+
+
+def _loop_trades(leverage, equity):
+    """Trade PnLs of the original run_backtest bar loop (reference)."""
+    trades = []
+    in_trade = False
+    entry_idx = 0
+    for i in range(1, len(leverage)):
+        # Entry: Yesterday 0, Today > 0
+        if leverage[i-1] == 0 and leverage[i] > 0:
+            in_trade = True
+            entry_idx = i
+        # Exit: Yesterday > 0, Today 0 (or End of Data)
+        elif (leverage[i-1] > 0 and leverage[i] == 0) or (in_trade and i == len(leverage)-1):
+            in_trade = False
+            trades.append(equity[i] / equity[entry_idx] - 1)
+    return np.array(trades)
+
+
+def _frame(leverage, seed):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({'returns': rng.normal(0.0005, 0.02, len(leverage)), 'leverage': leverage},
+                        index=pd.bdate_range("2015-01-01", periods=len(leverage)))
+
+
+def _random_leverage(rng, n):
+    # Runs of random length, alternating flat / invested
+    lengths = rng.integers(1, 30, n)
+    invested = np.repeat(np.arange(len(lengths)) % 2 == 1, lengths)[:n]
+    if rng.random() < 0.5:
+        invested = ~invested  # start invested on bar 0 half of the time
+    return np.where(invested, rng.uniform(0.2, 1.5, n), 0.0)
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_trade_stats_match_bar_loop(seed):
+    rng = np.random.default_rng(seed)
+    df, metrics = run_backtest(_frame(_random_leverage(rng, 400), seed), config)
+    expected = _loop_trades(df['leverage'].values, df['strategy_equity'].values)
+
+    assert metrics['total_trades'] == len(expected)
+    expected_hit = np.sum(expected > 0) / len(expected) if len(expected) > 0 else 0.0
+    assert metrics['hit_rate'] == pytest.approx(expected_hit)
+    np.testing.assert_allclose(trade_table(df['leverage'], df['strategy_equity'])['pnl'], expected)
+
+
+@pytest.mark.parametrize("leverage", [
+    [1.0] * 10,                      # invested over the whole sample: no trade
+    [1.0] * 5 + [0.0] * 5,           # invested from bar 0, then flat: one trade
+    [0.0] * 5 + [1.0] * 5,           # open at the end: one trade
+    [0.0] * 9 + [1.0],               # opened on the last bar: no trade yet
+    [0.0] * 10,
+])
+def test_edge_runs_match_bar_loop(leverage):
+    df, metrics = run_backtest(_frame(np.array(leverage), 0), config)
+    expected = _loop_trades(df['leverage'].values, df['strategy_equity'].values)
+    assert metrics['total_trades'] == len(expected)
+    np.testing.assert_allclose(trade_table(df['leverage'], df['strategy_equity'])['pnl'], expected)
@@ -0,0 +1,46 @@
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import config
+from portfolio import run_portfolio_backtest
+
+
+def _trending_panel(n_rows=1200, n_names=20, delist_at=800, n_delisted=10, seed=0):
+    rng = np.random.default_rng(seed)
+    drift = np.where(np.arange(n_names) < n_delisted, 0.002, 0.0005)  # delisted names trend up (long)
+    close = pd.DataFrame(100 * np.exp(np.cumsum(rng.normal(drift, 0.01, (n_rows, n_names)), axis=0)),
+                         index=pd.bdate_range("2010-01-01", periods=n_rows),
+                         columns=[f"T{i}" for i in range(n_names)])
+    close.iloc[delist_at:, :n_delisted] = np.nan
+    return close
+
+
+def test_delisted_names_are_flattened():
+    close = _trending_panel()
+    result = run_portfolio_backtest(close, config)
+    weights, units = result['weights'], result['units']
+
+    # Long into the delisting, flat from the bar after the first NaN close (T+1 lag)
+    assert (weights.iloc[799, :10] > 0).any()
+    assert (weights.iloc[801:, :10] == 0).all().all()
+    assert (units.iloc[801:, :10] == 0).all().all()
+
+    # The freed unit budget goes to the live names: whole units again
+    live_units = units.iloc[801:, 10:].to_numpy()
+    np.testing.assert_allclose(live_units[live_units > 0], 1.0)
+
+
+def test_unlisted_names_do_not_trade():
+    close = _trending_panel()
+    close.iloc[:300, 15:] = np.nan  # listed late
+    result = run_portfolio_backtest(close, config)
+    weights = result['weights'].to_numpy()
+    listed = close.notna().to_numpy()
+    held_unlisted = weights[1:] * ~listed[:-1]  # weight held on day t was decided on day t-1
+    assert (held_unlisted == 0).all()
+    assert np.isfinite(result['portfolio']['strategy_equity']).all()